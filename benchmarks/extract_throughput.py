@@ -0,0 +1,62 @@
+"""
+Benchmark of the team fan-out throughput against the local replay server.
+
+Every team of constants/team_city_refdata.csv is served the ATL recorded
+pages with a fixed latency per request, optionally with injected errors, so
+the gamelog acquisition of a season can be measured for several numbers of
+workers on a machine with no network access.
+
+Usage:
+    python -m benchmarks.extract_throughput --latency 0.2 --workers 1 4 8
+"""
+import argparse
+import time
+
+from src.utils.basketball_reference import fan_out_teams
+from src.utils.http_client import get_http_client
+from tests.replay_server import ORIGINS, ReplayServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-type", type=str, default="gamelog")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-every", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests-per-second", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    client = get_http_client()
+
+    with ReplayServer(
+        latency=args.latency,
+        error_every=args.error_every,
+        fallback_team="ATL",
+        fallback_season=2024,
+    ) as server:
+        for origin in ORIGINS:
+            client.override_host(origin, server.url)
+
+        print("latency: %.3f s, error every %s requests" % (args.latency, args.error_every or "-"))
+        for workers in args.workers:
+            nb_requests = server.nb_requests
+            server.max_concurrency = 0
+
+            start = time.perf_counter()
+            team_df = fan_out_teams(
+                data_type=args.data_type,
+                season=2024,
+                max_workers=workers,
+                requests_per_second=args.requests_per_second,
+            )
+            seconds = time.perf_counter() - start
+
+            requests = server.nb_requests - nb_requests
+            print(
+                "workers: %2s  rows: %5s  requests: %4s  max concurrency: %2s  %7.2f s  %7.1f pages/s"
+                % (workers, len(team_df), requests, server.max_concurrency, seconds, requests / seconds)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark of the gamelog and schedule join of gamelog_schedule_unification.
+
+Builds synthetic gamelog seasons (30 teams, 82 games each) and their
+schedules, typed with their schemas as the unification reads them, then
+joins them on (id_season, tm, game_date) with the previous approach, a
+pd.merge followed by duplicated and drop_duplicates, and with the sort-merge
+join of src/utils/sorted_join.py, on the inputs in their natural order and
+shuffled, where it falls back to a hash join of the keys. Both joins are
+checked to return the same rows.
+
+Usage:
+    python -m benchmarks.gamelog_schedule_join --seasons 40
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.storage_formats import synthetic_gamelog
+from src.transform.gamelog_schedule_unification import SCHEDULE_COLUMNS
+from src.utils.game_keys import team_game_keys
+from src.utils.schemas import apply_schema
+from src.utils.sorted_join import sort_merge_left_join
+
+KEY_COLUMNS = ["id_season", "tm", "game_date"]
+
+
+def synthetic_schedule(gamelog_df, seed=0):
+    rng = np.random.default_rng(seed)
+    nb_rows = len(gamelog_df)
+    return gamelog_df[KEY_COLUMNS].assign(
+        time_start=rng.choice(["7:00p", "7:30p", "8:00p"], size=nb_rows),
+        overtime=rng.choice(["", "OT"], size=nb_rows, p=[0.95, 0.05]),
+        w_tot=rng.integers(0, 82, size=nb_rows),
+        l_tot=rng.integers(0, 82, size=nb_rows),
+        streak_w_l=rng.choice(["W 1", "L 1", "W 2"], size=nb_rows),
+    )
+
+
+def hash_merge_join(gamelog_df, schedule_df):
+    joined_df = pd.merge(gamelog_df, schedule_df, how="left", on=KEY_COLUMNS)
+    joined_df.duplicated(subset=KEY_COLUMNS, keep="first").sum()
+    return joined_df.drop_duplicates(subset=KEY_COLUMNS)
+
+
+def sort_merge_join(gamelog_df, schedule_df):
+    joined_df, _ = sort_merge_left_join(
+        gamelog_df,
+        team_game_keys(gamelog_df["id_season"], gamelog_df["tm"], gamelog_df["game_date"]),
+        schedule_df,
+        team_game_keys(schedule_df["id_season"], schedule_df["tm"], schedule_df["game_date"]),
+        right_columns=[column for column in SCHEDULE_COLUMNS if column not in KEY_COLUMNS],
+    )
+    return joined_df
+
+
+def best_of(function, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    gamelog_df = pd.concat(
+        [synthetic_gamelog(season) for season in range(2026 - args.seasons + 1, 2027)], ignore_index=True
+    )
+    schedule_df = synthetic_schedule(gamelog_df)
+    gamelog_df = apply_schema(gamelog_df, "gamelog")
+    schedule_df = apply_schema(schedule_df, "schedule", columns=SCHEDULE_COLUMNS)
+
+    shuffled_gamelog_df = gamelog_df.sample(frac=1, random_state=0)
+    shuffled_schedule_df = schedule_df.sample(frac=1, random_state=0)
+
+    hash_seconds, hash_df = best_of(hash_merge_join, args.repeat, gamelog_df, schedule_df)
+    sort_seconds, sort_df = best_of(sort_merge_join, args.repeat, gamelog_df, schedule_df)
+    shuffled_hash_seconds, shuffled_hash_df = best_of(
+        hash_merge_join, args.repeat, shuffled_gamelog_df, shuffled_schedule_df
+    )
+    shuffled_seconds, shuffled_df = best_of(sort_merge_join, args.repeat, shuffled_gamelog_df, shuffled_schedule_df)
+
+    pd.testing.assert_frame_equal(hash_df.reset_index(drop=True), sort_df, check_dtype=False)
+    pd.testing.assert_frame_equal(shuffled_hash_df.reset_index(drop=True), shuffled_df, check_dtype=False)
+
+    print("seasons:            %s (%s rows)" % (args.seasons, len(gamelog_df)))
+    print("pd.merge + dedup:   %8.3f s" % hash_seconds)
+    print("sort-merge sorted:  %8.3f s  (x%.1f)" % (sort_seconds, hash_seconds / sort_seconds))
+    print("pd.merge shuffled:  %8.3f s" % shuffled_hash_seconds)
+    print("sort-merge shuffled:%8.3f s  (x%.1f)" % (shuffled_seconds, shuffled_hash_seconds / shuffled_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark of the salary normalization on a multi-season salary frame.
+
+Compares the former per-row loop (three re.sub and three .loc writes per
+row) with normalize_player_salaries on synthetic salary rows of several
+seasons, about 500 rows per season as on ESPN.
+
+Usage:
+    python -m benchmarks.salary_normalization --seasons 10
+"""
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.exctract.player_salary_data_acquisition import normalize_player_salaries
+
+
+def legacy_normalize_player_salaries(player_salary_df):
+    """Normalization of player_salary_data_acquisition before vectorization, kept as baseline."""
+    player_salary_df = player_salary_df.reset_index(drop=True)
+    for i in range(len(player_salary_df)):
+        player_salary_df.loc[i, "name"] = re.sub(",.*", "", player_salary_df["NAME"][i])
+        player_salary_df.loc[i, "salary"] = re.sub(
+            r"\$", "", player_salary_df["SALARY"][i]
+        )
+        player_salary_df.loc[i, "salary"] = re.sub(
+            ",", "", player_salary_df["salary"][i]
+        )
+    player_salary_df["salary"] = pd.to_numeric(player_salary_df["salary"])
+    return player_salary_df
+
+
+def synthetic_salaries(nb_seasons, rows_per_season, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for season in range(2026 - nb_seasons, 2026):
+        salaries = rng.integers(50_000, 50_000_000, size=rows_per_season)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "RK": np.arange(1, rows_per_season + 1),
+                    "NAME": ["Player %s, PG" % i for i in range(rows_per_season)],
+                    "TEAM": "Atlanta Hawks",
+                    "SALARY": ["${:,}".format(salary) for salary in salaries],
+                    "year": season,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=10)
+    parser.add_argument("--rows-per-season", type=int, default=500)
+    args = parser.parse_args()
+
+    player_salary_df = synthetic_salaries(args.seasons, args.rows_per_season)
+
+    start = time.perf_counter()
+    legacy_df = legacy_normalize_player_salaries(player_salary_df.copy())
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized_df = normalize_player_salaries(player_salary_df)
+    vectorized_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(legacy_df, vectorized_df)
+
+    print("rows:            %s" % len(player_salary_df))
+    print("per-row loop:    %8.3f s" % legacy_seconds)
+    print("vectorized:      %8.3f s" % vectorized_seconds)
+    print("speedup:         %8.1fx" % (legacy_seconds / vectorized_seconds))
+
+
+if __name__ == "__main__":
+    main()
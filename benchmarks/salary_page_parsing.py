@@ -0,0 +1,68 @@
+"""
+Micro-benchmark of the ESPN salary page parsing.
+
+Compares the former two pass parsing (BeautifulSoup for the page count, then
+lxml with a try: int() per cell) with the single pass parse_salary_page, on
+the salary pages recorded in tests/fixtures/pages/espn.
+
+Usage:
+    python -m benchmarks.salary_page_parsing --repeat 50
+"""
+import argparse
+import glob
+import re
+import timeit
+
+import lxml.html as lh
+from bs4 import BeautifulSoup
+
+from src.exctract.player_salary_data_acquisition import parse_salary_page
+
+
+def legacy_parse_salary_page(content):
+    """Parsing of scrape_page before the single pass parser, kept as baseline."""
+    soup = BeautifulSoup(content, features="html.parser")
+
+    page_total = soup.find(class_="page-numbers").get_text()
+    page_total = re.sub(".*of", "", page_total).strip()
+    page_total = int(page_total)
+    doc = lh.fromstring(content)
+    tr_elements = doc.xpath("//tr")
+    col = []
+    for t in tr_elements[0]:
+        col.append((t.text_content(), []))
+    for T in tr_elements:
+        i = 0
+        for t in T.iterchildren():
+            data = t.text_content()
+            if i > 0:
+                try:
+                    data = int(data)
+                except:
+                    pass
+            col[i][1].append(data)
+            i += 1
+
+    return {title: column for (title, column) in col}, page_total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", default="tests/fixtures/pages/espn/salaries_*.html")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(args.pages)):
+        with open(path, "rb") as html:
+            pages.append(html.read())
+
+    for name, parse in [("legacy two pass", legacy_parse_salary_page), ("single pass lxml", parse_salary_page)]:
+        seconds = min(
+            timeit.repeat(lambda: [parse(page) for page in pages], number=1, repeat=args.repeat)
+        )
+        print("%-18s %8.3f ms/page" % (name, 1000 * seconds / len(pages)))
+
+
+if __name__ == "__main__":
+    main()
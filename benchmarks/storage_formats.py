@@ -0,0 +1,104 @@
+"""
+Benchmark of the multi-season reads of the unification stages, csv against Parquet.
+
+Writes synthetic gamelog seasons (30 teams, 82 games each, the gamelog
+columns) in both formats to a temporary folder, then reads every season back
+with read_frames as gamelog_schedule_unification does, then only three
+columns as the player unification reads the schedule, and with the gamelog
+schema. The memory of the frame read with the inferred dtypes is compared to the gamelog schema ones.
+
+Usage:
+    python -m benchmarks.storage_formats --seasons 40
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.storage import atomic_to_csv, atomic_to_parquet, read_frames
+from src.utils.teams import get_team_abbreviations
+
+TEAMS = get_team_abbreviations()[:30]
+
+
+def synthetic_gamelog(season, seed=0):
+    rng = np.random.default_rng(seed + season)
+    nb_rows = len(TEAMS) * 82
+    gamelog_df = pd.DataFrame(
+        {
+            "id_season": season,
+            "game_nb": np.tile(np.arange(1, 83), len(TEAMS)),
+            "game_date": np.tile(
+                pd.date_range(str(season - 1) + "-10-20", periods=82, freq="2D").strftime("%Y-%m-%d"),
+                len(TEAMS),
+            ),
+            "extdom": rng.choice(["@", ""], size=nb_rows),
+            "tm": np.repeat(TEAMS, 82),
+            "opp": rng.choice(TEAMS, size=nb_rows),
+            "results": rng.choice(["W", "L"], size=nb_rows),
+        }
+    )
+    for column in ["pts", "fg", "fga", "3p", "3pa", "ft", "fta", "orb", "trb", "ast", "stl", "blk", "tov", "pf"]:
+        for side in ["tm", "opp"]:
+            gamelog_df[column + "_" + side] = rng.integers(0, 130, size=nb_rows)
+    for column in ["fg_prct", "3p_prct", "ft_prct"]:
+        for side in ["tm", "opp"]:
+            gamelog_df[column + "_" + side] = rng.random(nb_rows).round(3)
+    return gamelog_df
+
+
+def folder_size(folder, extension):
+    return sum(
+        os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder) if name.endswith(extension)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as csv_folder, tempfile.TemporaryDirectory() as parquet_folder:
+        for season in range(2026 - args.seasons + 1, 2027):
+            gamelog_df = synthetic_gamelog(season)
+            atomic_to_csv(gamelog_df, os.path.join(csv_folder, "gamelog_%s_all.csv" % season), index=False)
+            atomic_to_parquet(gamelog_df, os.path.join(parquet_folder, "gamelog_%s_all.parquet" % season))
+
+        timings = {}
+        for name, folder in [("csv", csv_folder), ("parquet", parquet_folder)]:
+            # Warm up, pyarrow is imported on the first Parquet read
+            read_frames(folder, "gamelog_" + str(2026))
+
+            start = time.perf_counter()
+            gamelog_df = read_frames(folder, "gamelog")
+            timings[name] = time.perf_counter() - start
+
+            # The schedule read of the player unification only needs a few columns
+            start = time.perf_counter()
+            read_frames(folder, "gamelog", columns=["id_season", "tm", "game_date"])
+            timings[name + " projected"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        typed_df = read_frames(parquet_folder, "gamelog", schema="gamelog")
+        timings["parquet typed"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_frames(csv_folder, "gamelog", schema="gamelog")
+        timings["csv typed"] = time.perf_counter() - start
+
+        print("seasons:         %s (%s rows)" % (args.seasons, len(gamelog_df)))
+        print("csv read:        %8.3f s  %8.1f MB" % (timings["csv"], folder_size(csv_folder, ".csv") / 1e6))
+        print("parquet read:    %8.3f s  %8.1f MB" % (timings["parquet"], folder_size(parquet_folder, ".parquet") / 1e6))
+        print("csv 3 columns:   %8.3f s" % timings["csv projected"])
+        print("parquet 3 cols:  %8.3f s" % timings["parquet projected"])
+        print("parquet schema:  %8.3f s" % timings["parquet typed"])
+        print("csv schema:      %8.3f s" % timings["csv typed"])
+        print("memory inferred: %8.1f MB" % (gamelog_df.memory_usage(deep=True).sum() / 1e6))
+        print("memory schema:   %8.1f MB" % (typed_df.memory_usage(deep=True).sum() / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,19 @@
 import pandas as pd
-from typing import Text
+from typing import Optional, Text
 import yaml
 import argparse
 import os
 from pathlib import Path
 import sys
-from basketball_reference_webscrapper.webscrapping_basketball_reference import (
-    WebScrapBasketballReference,
-)
-from basketball_reference_webscrapper.data_models.feature_model import FeatureIn
-
+from src.utils.basketball_reference import fan_out_teams
+from src.utils.batch import parse_seasons, run_for_seasons
+from src.utils.checkpoint import get_checkpoint
+from src.utils.http_client import snapshot_archive_scope
+from src.utils.incremental import incremental_write
 from src.utils.logs import get_logger
+from src.utils.response_cache import webscrappe_nba_games_data
+from src.utils.schemas import validate_schema
+from src.utils.storage import file_extension, read_frame, write_frame
 
 logger = get_logger(
     "GAMELOG_DATA_ACQUISITION", log_level='INFO'
@@ -20,24 +23,82 @@ def gamelog_data_acquisition(
         data_type: str = 'gamelog',
         season: int = 2024,
         team: str ='all',
-        output_folder: Path = 'pipeline_output/gamelog/'
-        ) -> None:
+        output_folder: Optional[Path] = 'pipeline_output/gamelog/',
+        cache_dir: Path = None,
+        team_fan_out: bool = False,
+        team_workers: int = 4,
+        requests_per_second: float = 0.3,
+        incremental: bool = False,
+        archive_dir: Path = None,
+        replay: bool = False,
+        checkpoint_dir: Path = None,
+        resume: bool = False,
+        file_format: str = 'parquet'
+        ) -> pd.DataFrame:
     """
     Gamelog data acquisition.
     Args:
         data_type (str): Argument from basketball_reference_webscrapper. Type of data to pull from the package
         season (int): Argument from basketball_reference_webscrapper. Season to pull from the package
         team: Path (str): Argument from basketball_reference_webscrapper. Default is 'all'. Team to pull data from the package.
-        output_folder (Path): Path where to save the gamelog data pulled using the package.
+        output_folder (Path): Path where to save the gamelog data pulled using the package. None keeps the season in memory only.
+        cache_dir (Path): Folder of the scrapped data cache. Default is None, no cache.
+        team_fan_out (bool): Fetch the teams concurrently instead of calling the package. Default is False.
+        team_workers (int): Number of teams fetched in parallel when team_fan_out is True.
+        requests_per_second (float): Request budget of basketball-reference.com when team_fan_out is True.
+        incremental (bool): Only append the games newer than the last ones of the existing output. Default is False.
+        archive_dir (Path): Folder of the raw pages archive. Default is None, pages are not archived.
+        replay (bool): Read the pages from archive_dir instead of the network. Default is False.
+        checkpoint_dir (Path): Folder of the checkpoints of the teams and seasons. Default is None, no checkpoint.
+        resume (bool): Skip the season when complete, and the teams already checkpointed. Default is False.
+        file_format (str): 'parquet' or 'csv', format of the output. Default is 'parquet'.
+    Returns:
+        pd.DataFrame: Season scrapped.
     """
 
-    gamelog_df = WebScrapBasketballReference(
-        FeatureIn(
-            data_type=data_type,
-            season=season,
-            team=team,
-        )
-    ).webscrappe_nba_games_data()
+    name_and_path_file = (
+        str(output_folder)
+        +
+        '/'
+        + data_type
+        + "_"
+        + str(season)
+        + "_"
+        + team
+        + file_extension(file_format)
+    )
+
+    checkpoint = get_checkpoint(checkpoint_dir, data_type + "_" + str(season) + "_" + team, resume=resume)
+    if output_folder is not None and checkpoint is not None and checkpoint.is_complete() and os.path.exists(name_and_path_file):
+        logger.info("Season %s already complete, skipped", season)
+        return read_frame(name_and_path_file)
+
+    # The archive sits in the pooled HttpClient until the season is fetched
+    with snapshot_archive_scope(archive_dir, replay=replay):
+        # The package requests cannot be archived
+        if team_fan_out or archive_dir is not None:
+            gamelog_df = fan_out_teams(
+                data_type=data_type,
+                season=season,
+                team=team,
+                max_workers=team_workers,
+                requests_per_second=requests_per_second,
+                cache_dir=cache_dir,
+                checkpoint=checkpoint,
+            )
+        else:
+            gamelog_df = webscrappe_nba_games_data(
+                data_type=data_type,
+                season=season,
+                team=team,
+                cache_dir=cache_dir,
+            )
+
+    # The season is written as scrapped, but a drift of its values fails before the write
+    validate_schema(gamelog_df, data_type)
+
+    if output_folder is None:
+        return gamelog_df
 
     # ------------------------------------------
     # Saving final training dataset
@@ -48,21 +109,16 @@ def gamelog_data_acquisition(
     if not isExist:
         os.makedirs(folder)
 
-    name_and_path_file = (
-        str(folder)
-        +
-        '/'
-        + data_type
-        + "_"
-        + str(season)
-        + "_"
-        + team
-        + ".csv"
-    )
+    if incremental:
+        incremental_write(gamelog_df, name_and_path_file, data_type, completed_column=None)
+    else:
+        write_frame(gamelog_df, name_and_path_file)
 
-    gamelog_df.to_csv(name_and_path_file, index=False)
+    if checkpoint is not None:
+        checkpoint.mark_complete()
 
     logger.info("Gamelog Data Acquisition complete")
+    return gamelog_df
 
 
 def get_args():
@@ -108,11 +164,91 @@ def get_args():
         default=gamelog_data_acquisition_params["team"],
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        type=Path,
+        default=params["base"]["cache_dir"],
+    )
+
+    parser.add_argument(
+        "--team-fan-out",
+        dest="team_fan_out",
+        action=argparse.BooleanOptionalAction,
+        default=gamelog_data_acquisition_params["team_fan_out"],
+    )
+
+    parser.add_argument(
+        "--team-workers",
+        dest="team_workers",
+        type=int,
+        default=gamelog_data_acquisition_params["team_workers"],
+    )
+
+    parser.add_argument(
+        "--requests-per-second",
+        dest="requests_per_second",
+        type=float,
+        default=gamelog_data_acquisition_params["requests_per_second"],
+    )
+
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        action=argparse.BooleanOptionalAction,
+        default=gamelog_data_acquisition_params["incremental"],
+    )
+
+    parser.add_argument(
+        "--archive-dir",
+        dest="archive_dir",
+        type=Path,
+        default=params["base"]["archive_dir"],
+    )
+
+    parser.add_argument(
+        "--replay",
+        dest="replay",
+        action="store_true",
+        help="Read the pages from the archive instead of the network",
+    )
+
+    parser.add_argument(
+        "--checkpoint-dir",
+        dest="checkpoint_dir",
+        type=Path,
+        default=params["base"]["checkpoint_dir"],
+    )
+
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Resume an interrupted run from its checkpoints",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        dest="file_format",
+        type=str,
+        choices=["parquet", "csv"],
+        default=params["base"]["file_format"],
+    )
+
     parser.add_argument(
         "--season",
         dest="season",
-        type=int,
+        type=str,
+        nargs="+",
         default=global_params["season"],
+        help="Seasons or inclusive season ranges to pull, e.g. 2024 or 1990-2026",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        dest="max_workers",
+        type=int,
+        default=global_params["max_workers"],
     )
 
     args = parser.parse_args()
@@ -127,11 +263,23 @@ def main():
     """Run the Pre Train Multiple Models Pipeline."""
     args = get_args()
 
-    gamelog_data_acquisition(
+    run_for_seasons(
+        gamelog_data_acquisition,
+        seasons=parse_seasons(args.season),
+        max_workers=args.max_workers,
         data_type=args.data_type,
-        season=args.season,
         team=args.team,
         output_folder=args.output_folder,
+        cache_dir=args.cache_dir,
+        team_fan_out=args.team_fan_out,
+        team_workers=args.team_workers,
+        requests_per_second=args.requests_per_second,
+        incremental=args.incremental,
+        archive_dir=args.archive_dir,
+        replay=args.replay,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
+        file_format=args.file_format,
     )
 
 if __name__ == "__main__":
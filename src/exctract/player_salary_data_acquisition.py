@@ -1,5 +1,5 @@
 import pandas as pd
-from typing import Text
+from typing import Optional, Text
 import yaml
 import argparse
 import os
@@ -7,7 +7,6 @@ import os
 # WebScrapNbaSalary.py
 
 from urllib.request import urlopen
-from bs4 import BeautifulSoup
 import pandas as pd
 import requests
 import sys
@@ -16,63 +15,118 @@ from urllib.error import HTTPError
 import re
 import lxml.html as lh
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from src.utils.batch import parse_seasons, run_for_seasons
+from src.utils.checkpoint import Checkpoint, get_checkpoint
+from src.utils.http_client import get_http_client, snapshot_archive_scope
 from src.utils.logs import get_logger
+from src.utils.rate_limiter import get_host_rate_limiter
+from src.utils.response_cache import ResponseCache, season_ttl
+from src.utils.schemas import validate_schema
+from src.utils.storage import file_extension, read_frame, write_frame
 
 logger = get_logger(
     "PLAYER_SALARIES_DATA_ACQUISITION", log_level='INFO'
 )
 
+ESPN_SALARY_URL = "http://www.espn.com/nba/salaries/_/year/"
+
 
 def player_salary_data_acquisition(
         data_type: str = 'player_salary',
         season: int = 2024,
-        output_folder: Path = 'pipeline_output/player_salary/'
-        ) -> None:
+        output_folder: Optional[Path] = 'pipeline_output/player_salary/',
+        max_workers: int = 4,
+        requests_per_second: float = 1.0,
+        cache_dir: Path = None,
+        archive_dir: Path = None,
+        replay: bool = False,
+        checkpoint_dir: Path = None,
+        resume: bool = False,
+        file_format: str = 'parquet'
+        ) -> pd.DataFrame:
     """
-    Gamelog data acquisition.
+    Player salary data acquisition.
     Args:
-        data_type (str): Argument from basketball_reference_webscrapper. Type of data to pull from the package
-        season (int): Argument from basketball_reference_webscrapper. Season to pull from the package
-        output_folder (Path): Path where to save the gamelog data pulled using the package.
+        data_type (str): Type of data, prefix of the output file. Default is 'player_salary'.
+        season (int): Season of the ESPN salary pages to scrape.
+        output_folder (Path): Path where to save the player salary data scrapped from ESPN. None keeps the season in memory only.
+        max_workers (int): Number of salary pages fetched in parallel.
+        requests_per_second (float): Request budget allowed on the ESPN host.
+        cache_dir (Path): Folder of the scrapped pages cache. Default is None, no cache.
+        archive_dir (Path): Folder of the raw pages archive. Default is None, pages are not archived.
+        replay (bool): Read the pages from archive_dir instead of the network. Default is False.
+        checkpoint_dir (Path): Folder of the checkpoints of the pages and seasons. Default is None, no checkpoint.
+        resume (bool): Skip the season when complete, and the pages already checkpointed. Default is False.
+        file_format (str): 'parquet' or 'csv', format of the output. Default is 'parquet'.
+    Returns:
+        pd.DataFrame: Season scrapped.
     """
 
+    name_and_path_file = (
+        str(output_folder)
+        + data_type
+        + "_"
+        + str(season)
+        + file_extension(file_format)
+    )
+
+    checkpoint = get_checkpoint(checkpoint_dir, data_type + "_" + str(season), resume=resume)
+    if output_folder is not None and checkpoint is not None and checkpoint.is_complete() and os.path.exists(name_and_path_file):
+        logger.info("Season %s already complete, skipped", season)
+        return read_frame(name_and_path_file)
+
     # ------------------------------------------
     # Saving final training dataset
 
-    player_salary_df = []
-    url = "http://www.espn.com/nba/salaries/_/year/" + str(season) + "/seasontype/"
-    data, page_total = scrape_page(url)
-    player_salary_df.append(pd.DataFrame(data))
+    # The shared HttpClient waits for the ESPN budget before every request
+    rate_limiter = get_host_rate_limiter(
+        ESPN_SALARY_URL,
+        requests_per_second=requests_per_second,
+        burst=max_workers,
+    )
 
-    # Get Salary Data
-    for k in range(2, page_total + 1):
-        url = (
-            "http://www.espn.com/nba/salaries/_/year/" + str(season) + "/page/" + str(k)
+    # The archive sits in the pooled HttpClient until the season is fetched
+    with snapshot_archive_scope(archive_dir, replay=replay):
+        cache = ResponseCache(cache_dir) if cache_dir is not None else None
+        ttl = season_ttl(season)
+
+        # The first page gives the number of pages of the season
+        url = ESPN_SALARY_URL + str(season) + "/seasontype/"
+        if checkpoint is None:
+            data, page_total = scrape_page(url, cache=cache, ttl=ttl)
+        else:
+            data, page_total = checkpoint.run("page_1", lambda: scrape_page(url, cache=cache, ttl=ttl))
+
+        # Get Salary Data
+        player_salary_df = [pd.DataFrame(data)]
+        player_salary_df.extend(
+            pd.DataFrame(page)
+            for page in fetch_salary_pages(
+                season=season,
+                page_total=page_total,
+                max_workers=max_workers,
+                cache=cache,
+                ttl=ttl,
+                checkpoint=checkpoint,
+            )
         )
-        Dict = scrape_page(url)[0]
-        player_salary_df.append(pd.DataFrame(Dict))
-        logger.info("Execution page number: %s", k)
 
-        time.sleep(3)
+    rate_limiter.log_metrics(data_type + " " + str(season))
 
     player_salary_df = pd.concat(player_salary_df)
     player_salary_df["year"] = int(season)
-    player_salary_df = player_salary_df[player_salary_df["RK"] != "RK"]
     player_salary_df.reset_index(inplace=True, drop=True)
 
-    # Convert salary to numeric
-    for i in range(len(player_salary_df)):
-        player_salary_df.loc[i, "name"] = re.sub(",.*", "", player_salary_df["NAME"][i])
-        player_salary_df.loc[i, "salary"] = re.sub(
-            "\$", "", player_salary_df["SALARY"][i]
-        )
-        player_salary_df.loc[i, "salary"] = re.sub(
-            ",", "", player_salary_df["salary"][i]
-        )
+    player_salary_df = normalize_player_salaries(player_salary_df)
+
+    # The season is written as scrapped, but a drift of its values fails before the write
+    validate_schema(player_salary_df, data_type)
 
-    # Get Rid of text rows
-    player_salary_df["salary"] = pd.to_numeric(player_salary_df["salary"])
+    if output_folder is None:
+        return player_salary_df
 
     #################################################################
 
@@ -81,65 +135,136 @@ def player_salary_data_acquisition(
     if not isExist:
         os.makedirs(folder)
 
-    name_and_path_file = (
-        str(folder)
-        + data_type
-        + "_"
-        + str(season)
-        + ".csv"
-    )
+    write_frame(player_salary_df, name_and_path_file)
 
-    player_salary_df.to_csv(name_and_path_file, index=False)
+    if checkpoint is not None:
+        checkpoint.mark_complete()
 
     logger.info("Player Salary Data Acquisition complete")
+    return player_salary_df
+
+
+def normalize_player_salaries(player_salary_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the normalized name and numeric salary columns to scrapped salaries.
+
+    Vectorized over whole columns, so it works the same on one season or on
+    several seasons concatenated.
+
+    Args:
+        player_salary_df (pd.DataFrame): Salaries with the NAME ("Stephen Curry, PG")
+            and SALARY ("$37,457,154") columns scrapped from ESPN.
+    Returns:
+        pd.DataFrame: Salaries with the name and salary (Int64) columns added.
+    """
+    player_salary_df = player_salary_df.copy()
+
+    # Remove the position after the name
+    player_salary_df["name"] = player_salary_df["NAME"].astype(str).str.replace(",.*", "", regex=True)
+
+    # Convert salary to numeric, the blank salaries are missing
+    salary_text = player_salary_df["SALARY"].astype("string").str.replace(r"[$,\s]", "", regex=True).replace("", pd.NA)
+    salary = pd.to_numeric(salary_text, errors="coerce")
+    invalid = salary.isna() & salary_text.notna()
+
+    if invalid.any():
+        # A salary that is not a number is kept as text, the object column then fails
+        # validate_schema with the other schema errors instead of being silently dropped
+        player_salary_df["salary"] = salary.astype(object).mask(invalid, salary_text)
+    else:
+        player_salary_df["salary"] = salary.astype("Int64")
+
+    return player_salary_df
+
+
+def fetch_salary_pages(
+        season: int,
+        page_total: int,
+        max_workers: int = 4,
+        cache: ResponseCache = None,
+        ttl: float = None,
+        checkpoint: Checkpoint = None
+        ) -> list:
+    """
+    Fetch the salary pages 2 to page_total of a season concurrently.
+
+    Args:
+        season (int): Season of the salary pages.
+        page_total (int): Number of pages of the season, read from the first page.
+        max_workers (int): Number of pages fetched in parallel.
+        cache (ResponseCache): Cache of the pages, None to always request them.
+        ttl (float): TTL of the cached pages.
+        checkpoint (Checkpoint): Checkpoint of the season, the pages already fetched are read from it.
+    Returns:
+        list: Scrapped page dictionaries, ordered by page number.
+    """
+
+    def _fetch(page_number: int) -> dict:
+        url = ESPN_SALARY_URL + str(season) + "/page/" + str(page_number)
+        if checkpoint is None:
+            page = scrape_page(url, cache=cache, ttl=ttl)[0]
+        else:
+            page = checkpoint.run("page_" + str(page_number), lambda: scrape_page(url, cache=cache, ttl=ttl)[0])
+        logger.info("Execution page number: %s", page_number)
+        return page
+
+    page_numbers = range(2, page_total + 1)
+    if len(page_numbers) == 0:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(page_numbers)))) as executor:
+        # map keeps the pages in order whatever their completion order
+        return list(executor.map(_fetch, page_numbers))
+
+
+def scrape_page(url, cache=None, ttl=None):
+    if cache is not None:
+        content = cache.get(url, ttl=ttl)
+    else:
+        r = get_http_client().get(url)
+        r.raise_for_status()
+        content = r.content
+
+    return parse_salary_page(content)
+
+
+def parse_salary_page(content):
+    """
+    Parse an ESPN salary page in a single pass over one lxml tree.
 
+    The header rows repeated along the table are skipped while walking the
+    rows and the columns made only of digits, such as RK, are typed as int64.
 
-def scrape_page(url):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36",
-    }
-    r = requests.get(url, headers=headers)
+    Args:
+        content (bytes): Html of the salary page.
+    Returns:
+        dict: Column name to numpy array of the salary table.
+        int: Number of pages of the season.
+    """
+    doc = lh.fromstring(content)
 
     # Get number of pages
-    soup = BeautifulSoup(r.content, features="html.parser")
-
-    page_total = soup.find(class_="page-numbers").get_text()
-    page_total = re.sub(".*of", "", page_total).strip()
-    page_total = int(page_total)
-    # r = requests.get(url)
-    doc = lh.fromstring(r.content)
-    tr_elements = doc.xpath("//tr")
-    # Create empty list
-    col = []
-    i = 0
-    # For each row, store each first element (header) and an empty list
-    for t in tr_elements[0]:
-        i += 1
-        name = t.text_content()
-        col.append((name, []))
-    for j in range(len(tr_elements)):
-        # T is our j'th row
-        T = tr_elements[j]
-        # i is the index of our column
-        i = 0
-        # Iterate through each element of the row
-        for t in T.iterchildren():
-            data = t.text_content()
-            # Check if row is empty
-            if i > 0:
-                # Convert any numerical value to integers
-                try:
-                    data = int(data)
-                except:
-                    pass
-            # Append the data to the empty list of the i'th column
-            col[i][1].append(data)
-            # Increment i for the next column
-            i += 1
-
-    dict = {title: column for (title, column) in col}
-    return dict, page_total
+    page_total = doc.find_class("page-numbers")[0].text_content()
+    page_total = int(re.sub(".*of", "", page_total).strip())
+
+    tr_elements = doc.iter("tr")
+    header = [t.text_content() for t in next(tr_elements)]
+    columns = [[] for _ in header]
+
+    for tr in tr_elements:
+        cells = [t.text_content() for t in tr]
+        # Header rows are repeated every few rows
+        if cells[0] == header[0]:
+            continue
+        for column, cell in zip(columns, cells):
+            column.append(cell)
 
+    return {
+        title: np.array(column, dtype=np.int64)
+        if len(column) > 0 and all(cell.isdigit() for cell in column)
+        else np.array(column, dtype=object)
+        for title, column in zip(header, columns)
+    }, page_total
 
 
 def get_args():
@@ -178,11 +303,77 @@ def get_args():
         default=player_salary_data_acquisition_params["data_type"],
     )
 
+    parser.add_argument(
+        "--max-workers",
+        dest="max_workers",
+        type=int,
+        default=player_salary_data_acquisition_params["max_workers"],
+    )
+
+    parser.add_argument(
+        "--requests-per-second",
+        dest="requests_per_second",
+        type=float,
+        default=player_salary_data_acquisition_params["requests_per_second"],
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        type=Path,
+        default=params["base"]["cache_dir"],
+    )
+
+    parser.add_argument(
+        "--archive-dir",
+        dest="archive_dir",
+        type=Path,
+        default=params["base"]["archive_dir"],
+    )
+
+    parser.add_argument(
+        "--replay",
+        dest="replay",
+        action="store_true",
+        help="Read the pages from the archive instead of the network",
+    )
+
+    parser.add_argument(
+        "--checkpoint-dir",
+        dest="checkpoint_dir",
+        type=Path,
+        default=params["base"]["checkpoint_dir"],
+    )
+
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Resume an interrupted run from its checkpoints",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        dest="file_format",
+        type=str,
+        choices=["parquet", "csv"],
+        default=params["base"]["file_format"],
+    )
+
     parser.add_argument(
         "--season",
         dest="season",
-        type=int,
+        type=str,
+        nargs="+",
         default=global_params["season"],
+        help="Seasons or inclusive season ranges to pull, e.g. 2024 or 1990-2026",
+    )
+
+    parser.add_argument(
+        "--season-workers",
+        dest="season_workers",
+        type=int,
+        default=global_params["max_workers"],
     )
 
     args = parser.parse_args()
@@ -193,10 +384,20 @@ def main():
     """Run the Pre Train Multiple Models Pipeline."""
     args = get_args()
 
-    player_salary_data_acquisition(
+    # max_workers is the number of pages fetched in parallel within each season
+    run_for_seasons(
+        partial(player_salary_data_acquisition, max_workers=args.max_workers),
+        seasons=parse_seasons(args.season),
+        max_workers=args.season_workers,
         data_type=args.data_type,
-        season=args.season,
         output_folder=args.output_folder,
+        requests_per_second=args.requests_per_second,
+        cache_dir=args.cache_dir,
+        archive_dir=args.archive_dir,
+        replay=args.replay,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
+        file_format=args.file_format,
     )
 
 if __name__ == "__main__":
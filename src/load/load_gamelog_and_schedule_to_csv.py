@@ -1,17 +1,17 @@
 # https://sebrave.medium.com/how-to-spin-up-a-local-mysql-database-on-macos-a550918f092b
 # https://blog.devart.com/delete-duplicate-rows-in-mysql.html
 
-import pymysql
 import pandas as pd
 from typing import Text
 import yaml
 import argparse
 import os
-from pandas.io import sql
-from sqlalchemy import create_engine
+from src.utils.fingerprints import read_fingerprint
 from src.utils.logs import get_logger
+from src.utils.publish import publish
+from src.utils.storage import file_extension, read_frame
+from src.utils.warehouse import is_loaded, load_dataset
 import sys
-from sqlalchemy import text
 # importing os module for environment variables
 import os
 # importing necessary functions from dotenv library
@@ -39,23 +39,31 @@ def load_gamelog_and_schedule_to_csv(config_path: Text) -> pd.DataFrame:
     gamelog_schedule_output_path = config_params["load_gamelog_schedule_unified_to_csv"]["data_path"]
     gamelog_schedule_output_name = config_params["load_gamelog_schedule_unified_to_csv"]["file_name"]
 
-    input_name_and_path_file = str(gamelog_schedule_input_path) + '/' + gamelog_schedule_input_name + ".csv"
-    output_name_and_path_file = str(gamelog_schedule_output_path) + '/' + gamelog_schedule_output_name + ".csv"
-
-    nba_games_training_dataset = pd.read_csv(input_name_and_path_file)
-    nba_games_training_dataset = nba_games_training_dataset.reset_index(drop=True)
+    input_name_and_path_file = str(gamelog_schedule_input_path) + '/' + gamelog_schedule_input_name + file_extension(config_params["base"]["file_format"])
+    output_name_and_path_file = str(gamelog_schedule_output_path) + '/' + gamelog_schedule_output_name + file_extension(config_params["load_gamelog_schedule_unified_to_csv"]["file_format"])
 
     # Name of the flat files
     # nba_gamelog_schedule_dataset
-    isExist = os.path.exists(gamelog_schedule_output_path)
-    if not isExist:
-        os.makedirs(gamelog_schedule_output_path)
-
-    nba_games_training_dataset.to_csv(output_name_and_path_file, index=False)
+    # Hardlinked when the final format is the unified one, rewritten through a temporary file otherwise
+    nb_rows = publish(input_name_and_path_file, output_name_and_path_file, schema="gamelog_schedule_unified")
+
+    # Indexed table for the queries of the models, replaced by a full load, keyed on (id_season, tm, game_date)
+    # The unified dataset is only read when it changed since the last load
+    fingerprint = read_fingerprint(input_name_and_path_file)
+    if is_loaded(config_params["base"]["warehouse_path"], gamelog_schedule_output_name, fingerprint):
+        logger.info("%s already loaded in the warehouse", input_name_and_path_file)
+    else:
+        load_dataset(
+            read_frame(input_name_and_path_file, schema="gamelog_schedule_unified"),
+            config_params["base"]["warehouse_path"],
+            schema="gamelog_schedule_unified",
+            table=gamelog_schedule_output_name,
+            fingerprint=fingerprint,
+        )
 
     # NExt step will be to save it in S3
     # TODO Save to s3 bucket
-    logger.info("Shape of the data: " + str(nba_games_training_dataset.shape[0]))
+    logger.info("Shape of the data: " + str(nb_rows))
     logger.info("Load Gamelog and Schedule Data to Database complete")
 
 
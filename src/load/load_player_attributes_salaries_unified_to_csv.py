@@ -2,16 +2,16 @@
 # https://blog.devart.com/delete-duplicate-rows-in-mysql.html
 # https://numberly.tech/orchestrating-python-workflows-in-apache-airflow-fd8be71ad504
 
-import pymysql
 import pandas as pd
 from typing import Text
 import yaml
 import argparse
 import os
-from pandas.io import sql
-from sqlalchemy import create_engine
+from src.utils.fingerprints import read_fingerprint
 from src.utils.logs import get_logger
-from sqlalchemy import text
+from src.utils.publish import publish
+from src.utils.storage import file_extension, read_frame
+from src.utils.warehouse import is_loaded, load_dataset
 import os
 from dotenv import load_dotenv 
 
@@ -37,13 +37,27 @@ def load_player_attributes_salaries_unified_to_csv(config_path: Text) -> pd.Data
     player_attributes_salaries_output_path = config_params["load_player_attributes_salaries_unified_to_csv"]["data_path"]
     player_attributes_salaries_output_name = config_params["load_player_attributes_salaries_unified_to_csv"]["file_name"]
 
-    input_name_and_path_file = str(player_attributes_salaries_input_path) + '/' + player_attributes_salaries_input_name + ".csv"
-    output_name_and_path_file = str(player_attributes_salaries_output_path) + '/' + player_attributes_salaries_output_name + ".csv"
-    
-    player_attributes_salaries_dataset = pd.read_csv(input_name_and_path_file)
-    player_attributes_salaries_dataset = player_attributes_salaries_dataset.reset_index(drop=True)
+    input_name_and_path_file = str(player_attributes_salaries_input_path) + '/' + player_attributes_salaries_input_name + file_extension(config_params["base"]["file_format"])
+    output_name_and_path_file = str(player_attributes_salaries_output_path) + '/' + player_attributes_salaries_output_name + file_extension(config_params["load_player_attributes_salaries_unified_to_csv"]["file_format"])
 
-    player_attributes_salaries_dataset.to_csv(output_name_and_path_file, index=False)
+    # Hardlinked when the final format is the unified one, rewritten through a temporary file otherwise
+    nb_rows = publish(input_name_and_path_file, output_name_and_path_file, schema="player_attributes_salaries_unified")
+
+    # Indexed table for the queries of the models, replaced by a full load, keyed on (id_season, tm, Name)
+    # The unified dataset is only read when it changed since the last load
+    fingerprint = read_fingerprint(input_name_and_path_file)
+    if is_loaded(config_params["base"]["warehouse_path"], player_attributes_salaries_output_name, fingerprint):
+        logger.info("%s already loaded in the warehouse", input_name_and_path_file)
+    else:
+        load_dataset(
+            read_frame(input_name_and_path_file, schema="player_attributes_salaries_unified"),
+            config_params["base"]["warehouse_path"],
+            schema="player_attributes_salaries_unified",
+            table=player_attributes_salaries_output_name,
+            fingerprint=fingerprint,
+        )
+
+    logger.info("Shape of the data: " + str(nb_rows))
 
     # NExt step will be to save it in S3
     # TODO Save to s3 bucket
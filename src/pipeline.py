@@ -0,0 +1,375 @@
+"""Runs the extract, clean, unify and load stages of the in-season path in one process.
+
+The stages of dvc.yaml are separate ``python3 -m`` processes, each one
+writing its output to be re-parsed by the next one. This runner imports the
+stage functions and hands their DataFrames over in memory through a Dag,
+only writing the outputs of the stages listed in ``pipeline.materialize`` of
+params.yaml. The final datasets and the warehouse are always loaded.
+
+The four acquisitions are independent, so they run concurrently
+(``pipeline.max_workers``), and each transform starts as soon as its own
+inputs are done, e.g. the schedule cleaning while the salaries are still
+being fetched. The acquisitions of basketball-reference.com share its rate
+limiter, so running them together does not raise the request rate.
+"""
+
+import argparse
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import pandas as pd
+import yaml
+
+from src.exctract.gamelog_data_acquisition import gamelog_data_acquisition
+from src.exctract.player_attributes_data_acquisition import player_attributes_data_acquisition
+from src.exctract.player_salary_data_acquisition import player_salary_data_acquisition
+from src.exctract.schedule_data_acquisition import schedule_data_acquisition
+from src.transform.gamelog_cleaning_and_transformation import gamelog_cleaning_and_transformation
+from src.transform.gamelog_schedule_unification import gamelog_schedule_unification
+from src.transform.player_attributes_salaries_unification import player_attributes_salaries_unification
+from src.transform.schedule_cleaning_and_transformation import schedule_cleaning_and_transformation
+from src.utils.batch import parse_seasons
+from src.utils.dag import Dag
+from src.utils.logs import get_logger
+from src.utils.publish import publish
+from src.utils.schemas import apply_schema
+from src.utils.storage import file_extension, replace_seasons
+from src.utils.warehouse import load_dataset
+
+logger = get_logger(
+    "PIPELINE", log_level='INFO'
+)
+
+# Stages whose outputs can be written, the load stages always write theirs
+MATERIALIZABLE_STAGES = [
+    "gamelog_data_acquisition",
+    "schedule_data_acquisition",
+    "player_attributes_data_acquisition",
+    "player_salary_data_acquisition",
+    "gamelog_cleaning_and_transformation",
+    "schedule_cleaning_and_transformation",
+    "gamelog_schedule_unification",
+    "player_attributes_salaries_unification",
+]
+
+
+def _acquire(function: Callable, seasons: List[int], **kwargs) -> pd.DataFrame:
+    """Run an acquisition stage for every season, the seasons concatenated."""
+    season_dfs = [function(season=season, **kwargs) for season in seasons]
+    return pd.concat(season_dfs, ignore_index=True)
+
+
+def _clean(
+        function: Callable,
+        df: pd.DataFrame,
+        seasons: List[int],
+        file_name: str,
+        frame_argument: str,
+        **kwargs
+        ) -> pd.DataFrame:
+    """Run a cleaning stage for every season, as the season files are cleaned one by one."""
+    season_ids = pd.to_numeric(df["id_season"])
+    season_dfs = []
+    for season in seasons:
+        kwargs[frame_argument] = df[season_ids == season]
+        season_dfs.append(function(file_name=file_name.format(season=season), **kwargs))
+    return pd.concat(season_dfs, ignore_index=True)
+
+
+def _load(
+        df: pd.DataFrame,
+        unified_file: Optional[str],
+        final_file: str,
+        warehouse_path: str,
+        schema: str,
+        table: str,
+        seasons: List[int]
+        ) -> int:
+    """Write the final dataset of the unified seasons and replace them in the warehouse."""
+    df = apply_schema(df, schema)
+
+    if unified_file is not None:
+        publish(unified_file, final_file, schema=schema)
+    else:
+        Path(final_file).parent.mkdir(parents=True, exist_ok=True)
+        replace_seasons(df, final_file, seasons, schema=schema)
+
+    return load_dataset(df, warehouse_path, schema=schema, table=table, seasons=seasons)
+
+
+def build_pipeline(
+        params: dict,
+        seasons: List[int],
+        materialize: Iterable[str] = MATERIALIZABLE_STAGES,
+        replay: bool = False,
+        resume: bool = False
+        ) -> Dag:
+    """
+    Build the graph of the stages of params.yaml for some seasons.
+
+    Args:
+        params (dict): Content of params.yaml.
+        seasons (list): Seasons to pull, clean, unify and load.
+        materialize (list): Stages of MATERIALIZABLE_STAGES whose outputs are written. The cleaning
+            stages only produce files, they are not run when they are not materialized.
+        replay (bool): Read the pages from the archive instead of the network.
+        resume (bool): Resume an interrupted run from its checkpoints.
+    Returns:
+        Dag: Graph of the stages.
+    """
+    materialize = set(materialize)
+    unknown_stages = materialize - set(MATERIALIZABLE_STAGES)
+    if unknown_stages:
+        raise ValueError(
+            "materialize value provided is not supported: " + ", ".join(sorted(unknown_stages))
+            + ". Accepted values are: " + ", ".join("'" + stage + "'" for stage in MATERIALIZABLE_STAGES)
+        )
+
+    base = params["base"]
+    file_format = base["file_format"]
+
+    def _output(stage: str, key: str = "output_folder") -> Optional[str]:
+        return params[stage][key] if stage in materialize else None
+
+    dag = Dag()
+
+    # ------------------------------------------
+    # Extract
+    for stage, function in [
+        ("gamelog_data_acquisition", gamelog_data_acquisition),
+        ("schedule_data_acquisition", schedule_data_acquisition),
+    ]:
+        dag.add(
+            stage,
+            partial(
+                _acquire,
+                function,
+                seasons,
+                data_type=params[stage]["data_type"],
+                team=params[stage]["team"],
+                output_folder=_output(stage),
+                cache_dir=base["cache_dir"],
+                team_fan_out=params[stage]["team_fan_out"],
+                team_workers=params[stage]["team_workers"],
+                requests_per_second=params[stage]["requests_per_second"],
+                incremental=params[stage]["incremental"],
+                archive_dir=base["archive_dir"],
+                replay=replay,
+                checkpoint_dir=base["checkpoint_dir"],
+                resume=resume,
+                file_format=file_format,
+            ),
+        )
+
+    dag.add(
+        "player_attributes_data_acquisition",
+        partial(
+            _acquire,
+            player_attributes_data_acquisition,
+            seasons,
+            data_type=params["player_attributes_data_acquisition"]["data_type"],
+            team=params["player_attributes_data_acquisition"]["team"],
+            output_folder=_output("player_attributes_data_acquisition"),
+            cache_dir=base["cache_dir"],
+            team_fan_out=params["player_attributes_data_acquisition"]["team_fan_out"],
+            team_workers=params["player_attributes_data_acquisition"]["team_workers"],
+            requests_per_second=params["player_attributes_data_acquisition"]["requests_per_second"],
+            archive_dir=base["archive_dir"],
+            replay=replay,
+            checkpoint_dir=base["checkpoint_dir"],
+            resume=resume,
+            file_format=file_format,
+        ),
+    )
+
+    dag.add(
+        "player_salary_data_acquisition",
+        partial(
+            _acquire,
+            player_salary_data_acquisition,
+            seasons,
+            data_type=params["player_salary_data_acquisition"]["data_type"],
+            output_folder=_output("player_salary_data_acquisition"),
+            max_workers=params["player_salary_data_acquisition"]["max_workers"],
+            requests_per_second=params["player_salary_data_acquisition"]["requests_per_second"],
+            cache_dir=base["cache_dir"],
+            archive_dir=base["archive_dir"],
+            replay=replay,
+            checkpoint_dir=base["checkpoint_dir"],
+            resume=resume,
+            file_format=file_format,
+        ),
+    )
+
+    # ------------------------------------------
+    # Clean
+    for stage, function, acquisition_stage, frame_argument in [
+        ("gamelog_cleaning_and_transformation", gamelog_cleaning_and_transformation, "gamelog_data_acquisition", "gamelog_df"),
+        ("schedule_cleaning_and_transformation", schedule_cleaning_and_transformation, "schedule_data_acquisition", "schedule_df"),
+    ]:
+        if stage not in materialize:
+            continue
+        dag.add(
+            stage,
+            partial(
+                _clean,
+                function,
+                seasons=seasons,
+                file_name=params[acquisition_stage]["data_type"] + "_{season}_" + params[acquisition_stage]["team"],
+                frame_argument=frame_argument,
+                output_folder=params[stage]["output_folder"],
+                file_format=file_format,
+            ),
+            inputs=[acquisition_stage],
+        )
+
+    # ------------------------------------------
+    # Unify
+    dag.add(
+        "gamelog_schedule_unification",
+        lambda gamelog_df, schedule_df: gamelog_schedule_unification(
+            unified_file_path=_output("gamelog_schedule_unification", "data_path"),
+            unified_file_name=params["gamelog_schedule_unification"]["file_name"],
+            file_format=file_format,
+            seasons=seasons,
+            gamelog_df=gamelog_df,
+            schedule_df=schedule_df,
+        ),
+        inputs=["gamelog_data_acquisition", "schedule_data_acquisition"],
+    )
+
+    dag.add(
+        "player_attributes_salaries_unification",
+        lambda schedule_df, players_attributes_df, players_salary_df: player_attributes_salaries_unification(
+            output_dest_file_path=_output("player_attributes_salaries_unification", "data_path"),
+            output_file_name=params["player_attributes_salaries_unification"]["file_name"],
+            file_format=file_format,
+            seasons=seasons,
+            schedule_df=schedule_df,
+            players_attributes_df=players_attributes_df,
+            players_salary_df=players_salary_df,
+        ),
+        inputs=["schedule_data_acquisition", "player_attributes_data_acquisition", "player_salary_data_acquisition"],
+    )
+
+    # ------------------------------------------
+    # Load
+    for stage, unification_stage, schema in [
+        ("load_gamelog_schedule_unified_to_csv", "gamelog_schedule_unification", "gamelog_schedule_unified"),
+        ("load_player_attributes_salaries_unified_to_csv", "player_attributes_salaries_unification", "player_attributes_salaries_unified"),
+    ]:
+        unified_folder = _output(unification_stage, "data_path")
+        dag.add(
+            stage,
+            partial(
+                _load,
+                # The final file is published from the unified file when it is written
+                unified_file=(
+                    None if unified_folder is None
+                    else str(unified_folder) + '/' + params[unification_stage]["file_name"] + file_extension(file_format)
+                ),
+                final_file=(
+                    str(params[stage]["data_path"]) + '/' + params[stage]["file_name"] + file_extension(params[stage]["file_format"])
+                ),
+                warehouse_path=base["warehouse_path"],
+                schema=schema,
+                table=params[stage]["file_name"],
+                seasons=seasons,
+            ),
+            inputs=[unification_stage],
+        )
+
+    return dag
+
+
+def get_args():
+    """
+    Parse command line arguments and return the parsed arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--params-file",
+        type=Path,
+        default="params.yaml",
+    )
+
+    args, _ = parser.parse_known_args()
+    params = yaml.safe_load(args.params_file.open())
+
+    parser.add_argument(
+        "--season",
+        dest="season",
+        type=str,
+        nargs="+",
+        default=params["global_params"]["season"],
+        help="Seasons or inclusive season ranges to run, e.g. 2026 or 2024-2026",
+    )
+
+    parser.add_argument(
+        "--materialize",
+        dest="materialize",
+        type=str,
+        nargs="*",
+        choices=MATERIALIZABLE_STAGES,
+        default=params["pipeline"]["materialize"],
+        help="Stages whose outputs are written, the others only hand their frames over in memory",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        dest="max_workers",
+        type=int,
+        default=params["pipeline"]["max_workers"],
+        help="Maximum number of stages run at the same time, 1 to run them one after the other",
+    )
+
+    parser.add_argument(
+        "--targets",
+        dest="targets",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Stages to run with the stages they depend on, default to every stage",
+    )
+
+    parser.add_argument(
+        "--replay",
+        dest="replay",
+        action="store_true",
+        help="Read the pages from the archive instead of the network",
+    )
+
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Resume an interrupted run from its checkpoints",
+    )
+
+    args = parser.parse_args()
+    args.params = params
+
+    return args
+
+
+def main():
+    """Run the in-season pipeline in one process."""
+    args = get_args()
+
+    dag = build_pipeline(
+        args.params,
+        seasons=parse_seasons(args.season),
+        materialize=args.materialize,
+        replay=args.replay,
+        resume=args.resume,
+    )
+    dag.run(targets=args.targets, max_workers=args.max_workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ import yaml
 import argparse
 import os
 import glob
-from typing import Union
+from typing import Optional, Union
 from pathlib import Path
 import sys
+from src.utils.game_keys import gamelog_game_keys, with_game_id
 from src.utils.logs import get_logger
+from src.utils.partitions import write_partitions
+from src.utils.schemas import apply_schema
+from src.utils.storage import file_extension, read_frame, write_frame
 
 logger = get_logger(
     "GAMELOG_CLEANING_AND_TRANSFORMATION", log_level='INFO'
@@ -17,8 +21,10 @@ logger = get_logger(
 def gamelog_cleaning_and_transformation(
         file_name: str = 'gamelog_2023_all',
         input_folder: Path = 'pipeline_output/gamelog/',
-        output_folder: Path = 'pipeline_output/gamelog_cleaned/'
-        ) -> None:
+        output_folder: Optional[Path] = 'pipeline_output/gamelog_cleaned/',
+        file_format: str = 'parquet',
+        gamelog_df: Optional[pd.DataFrame] = None
+        ) -> pd.DataFrame:
     """
     Unification of gamelogs and schdules dataframes.
 
@@ -26,13 +32,21 @@ def gamelog_cleaning_and_transformation(
         data_type (str): Argument from basketball_reference_webscrapper. Type of data to pull from the package
         season (int): Argument from basketball_reference_webscrapper. Season to pull from the package
         team: Path (str): Argument from basketball_reference_webscrapper. Default is 'all'. Team to pull data from the package.
-        output_folder (Path): Path where to save the gamelog data pulled using the package.
+        output_folder (Path): Root folder of the cleaned dataset, partitioned as id_season=YYYY/tm=XXX.
+            None keeps the cleaned season in memory only.
+        file_format (str): 'parquet' or 'csv', format of the input and partition files. Default is 'parquet'.
+        gamelog_df (pd.DataFrame): Gamelog of the season handed over by the acquisition, instead of reading file_name.
+    Returns:
+        pd.DataFrame: Cleaned season.
     """
 
     # ------------------------------------------
     # Read the data
-    file_path_name = str(input_folder) + '/' +str(file_name) +  ".csv"
-    gamelog_df = pd.read_csv(file_path_name)
+    if gamelog_df is None:
+        file_path_name = str(input_folder) + '/' +str(file_name) + file_extension(file_format)
+        gamelog_df = read_frame(file_path_name, schema="gamelog")
+    else:
+        gamelog_df = apply_schema(gamelog_df, "gamelog")
     gamelog_df = gamelog_df.reset_index(drop=True)
 
     # ----------------------------------------------
@@ -58,15 +72,14 @@ def gamelog_cleaning_and_transformation(
         'ext',
         'dom')
     
+    #-------------------------------------------
+    # Unique game key creation, the readable id is only built for the csv export
+    gamelog_df['game_key'] = gamelog_game_keys(gamelog_df)
+
     gamelog_df['game_date'] = gamelog_df['game_date'].astype(str).str[:10]
 
-    #-------------------------------------------
-    # Unique id creation
-    gamelog_df['id'] = np.where(
-        gamelog_df['extdom']=='dom',
-        gamelog_df['game_date'] + '_' + gamelog_df['opp'] + '_' + gamelog_df['tm'],
-        gamelog_df['game_date'] + '_' + gamelog_df['tm'] + '_' + gamelog_df['opp']
-    )
+    if output_folder is None:
+        return gamelog_df
 
     # ------------------------------------------
     # Saving final training dataset
@@ -75,11 +88,16 @@ def gamelog_cleaning_and_transformation(
     if not isExist:
         os.makedirs(output_folder)
 
-    name_and_path_file = str(output_folder)+ '/' + file_name + ".csv"
+    # Partitioned by season and team, the readers only open the partitions they need
+    write_partitions(gamelog_df, output_folder, file_format=file_format, schema="gamelog_cleaned")
 
-    gamelog_df.to_csv(name_and_path_file, index=False)
+    # The season is also exported as one csv file, the S3 deliverable
+    write_frame(
+        with_game_id(gamelog_df), str(output_folder)+ '/' + file_name + file_extension("csv"), schema="gamelog_cleaned"
+    )
 
     logger.info("Gamelog cleaning and transformation complete")
+    return gamelog_df
 
 def get_args():
     """
@@ -133,6 +151,14 @@ def get_args():
         default=file_name,
     )
 
+    parser.add_argument(
+        "--file-format",
+        dest="file_format",
+        type=str,
+        choices=["parquet", "csv"],
+        default=params["base"]["file_format"],
+    )
+
     args = parser.parse_args()
 
     args.output_folder.parent.mkdir(
@@ -148,7 +174,8 @@ def main():
     gamelog_cleaning_and_transformation(
         file_name=args.file_name,
         input_folder=args.input_folder,
-        output_folder=args.output_folder
+        output_folder=args.output_folder,
+        file_format=args.file_format,
     )
 
 if __name__ == "__main__":
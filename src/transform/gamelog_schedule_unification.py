@@ -4,55 +4,59 @@ from typing import Text
 import yaml
 import argparse
 import os
-import glob
-from typing import Union
+from typing import Callable, List, Optional, Union
 from pathlib import Path
 import sys
+from src.utils import game_keys, partitions, schemas, sorted_join, storage, teams
+from src.utils.batch import parse_seasons
+from src.utils.game_keys import game_ids, gamelog_game_keys, team_game_keys
 from src.utils.logs import get_logger
+from src.utils.partitions import dataset_seasons, read_dataset
+from src.utils.schemas import apply_schema
+from src.utils.season_results import SeasonResults, source_fingerprint
+from src.utils.sorted_join import sort_merge_left_join
+from src.utils.storage import file_extension, replace_seasons, write_frame
+from src.utils.streaming import KeySet, replace_season_chunks, season_chunks, write_frame_chunks
 
 logger = get_logger(
     "GAMELOG_SCHEDULE_UNIFICATION", log_level='INFO'
 )
 
-def gamelog_schedule_unification(
-        gamelog_data_path: Path ='pipeline_output/gamelog/',
-        gamelog_name_pattern: str = 'gamelog',
-        schedule_data_path: Path ='pipeline_output/schedule/',
-        schedule_name_pattern: str = 'schedule',
-        unified_file_path: Path ='pipeline_output/unified/',
-        unified_file_name: str = 'nba_games_training_dataset'
-        ) -> None:
+# Columns of the schedules joined to the gamelogs, the only ones read
+SCHEDULE_COLUMNS = [
+    "id_season",
+    "tm",
+    "game_date",
+    "time_start",
+    "overtime",
+    "w_tot",
+    "l_tot",
+    "streak_w_l",
+]
+
+# Modules and reference data of the unified rows, a change to any of them unifies every season again
+UNIFICATION_SOURCES = [
+    __file__,
+    game_keys.__file__,
+    sorted_join.__file__,
+    schemas.__file__,
+    teams.__file__,
+    teams.TEAM_CITY_REFDATA_PATH,
+    partitions.__file__,
+    storage.__file__,
+]
+
+def unify_gamelog_schedule(gamelog_df: pd.DataFrame, schedule_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Unification of gamelogs and schdules dataframes.
+    Join the gamelogs and the schedules of the same seasons.
 
     Args:
-        gamelog_data_path: Path where to read the gamelog dataframe.
-        gamelog_name_pattern (str): gamelog name pattern to read mutliple season gamelog
-        schedule_data_path: Path where to read the schedule dataframe.
-        schedule_name_pattern (str): schedule name pattern to read mutliple season schedule
-        unified_file_path (Path): Path where to save the unified dataframe.
-        unified_file_name (str): Name of the unfied dataframe
+        gamelog_df (pd.DataFrame): Gamelogs, typed with the gamelog schema.
+        schedule_df (pd.DataFrame): Schedules, typed with the schedule schema.
+    Returns:
+        pd.DataFrame: Unified rows, one per game of each team, sorted by season, team and date when the inputs are.
     """
 
-    # ------------------------------------------
-    # Read the data
-
-    gamelog_df = pd.concat(
-        map(
-            pd.read_csv,
-            glob.glob(os.path.join(gamelog_data_path, gamelog_name_pattern +  "_*.csv")),
-        )
-    )
-    gamelog_df = gamelog_df.reset_index(drop=True)
-
-    schedule_df = pd.concat(
-        map(
-            pd.read_csv,
-            glob.glob(os.path.join(schedule_data_path, schedule_name_pattern +  "_*.csv")),
-        )
-    )
-    schedule_df = schedule_df.reset_index(drop=True)
-
     # ----------------------------------------------
     # SCHEDULES_DF - Re format date
     schedule_df["game_date"] = pd.to_datetime(schedule_df["game_date"])
@@ -62,34 +66,19 @@ def gamelog_schedule_unification(
     gamelog_df["game_date"] = pd.to_datetime(gamelog_df["game_date"])
 
     # ----------------------------------------------
-    # Join the two dataframes
-    nba_games_training_dataset = pd.merge(
+    # Join the two dataframes, read sorted on (id_season, tm, game_date) so they are merged in one pass
+    nba_games_training_dataset, nb_duplicated_rows = sort_merge_left_join(
         gamelog_df,
-        schedule_df[
-            [
-                "id_season",
-                "tm",
-                "game_date",
-                "time_start",
-                "overtime",
-                "w_tot",
-                "l_tot",
-                "streak_w_l",
-            ]
-        ],
-        how="left",
-        left_on=["id_season", "tm", "game_date"],
-        right_on=["id_season", "tm", "game_date"],
+        team_game_keys(gamelog_df["id_season"], gamelog_df["tm"], gamelog_df["game_date"]),
+        schedule_df,
+        team_game_keys(schedule_df["id_season"], schedule_df["tm"], schedule_df["game_date"]),
+        right_columns=[column for column in SCHEDULE_COLUMNS if column not in ["id_season", "tm", "game_date"]],
     )
 
     #-------------------------------------------
-    # Check for Duplciate and raise errors
-    nb_duplicated_rows = nba_games_training_dataset.duplicated(subset=["id_season", "tm", "game_date"], keep='first').sum()
-
+    # The duplicates on (id_season, tm, game_date) are dropped by the join, the first row is kept
     if nb_duplicated_rows > 0:
-        logger.info('DUPLICATED ROWS IN THE DATAFRAME')
-
-    nba_games_training_dataset = nba_games_training_dataset.drop_duplicates(subset=["id_season", "tm", "game_date"])
+        logger.info('DUPLICATED ROWS IN THE DATAFRAME, %s rows dropped', nb_duplicated_rows)
 
     #-------------------------------------------
     # Ext Dom Process
@@ -99,15 +88,161 @@ def gamelog_schedule_unification(
         'ext',
         'dom')
     
+    #-------------------------------------------
+    # Unique game key creation, with its readable id so the final dataset is the unified file as is
+    nba_games_training_dataset['game_key'] = gamelog_game_keys(nba_games_training_dataset)
+    nba_games_training_dataset['id'] = game_ids(nba_games_training_dataset['game_key'])
+
     nba_games_training_dataset['game_date'] = nba_games_training_dataset['game_date'].astype(str).str[:10]
 
-    #-------------------------------------------
-    # Unique id creation
-    nba_games_training_dataset['id'] = np.where(
-        nba_games_training_dataset['extdom']=='dom',
-        nba_games_training_dataset['game_date'] + '_' + nba_games_training_dataset['opp'] + '_' + nba_games_training_dataset['tm'],
-        nba_games_training_dataset['game_date'] + '_' + nba_games_training_dataset['tm'] + '_' + nba_games_training_dataset['opp']
-    )
+    return nba_games_training_dataset
+
+
+def _stream_gamelog_schedule_unification(
+        read_gamelog: Callable[[List[int]], pd.DataFrame],
+        read_schedule: Callable[[List[int]], pd.DataFrame],
+        gamelog_data_path: Path,
+        gamelog_name_pattern: str,
+        schedule_data_path: Path,
+        schedule_name_pattern: str,
+        unified_file_path: Path,
+        unified_file_name: str,
+        file_format: str,
+        seasons: Optional[List[int]],
+        teams: Optional[List[str]],
+        season_results: Optional[SeasonResults],
+        chunk_size: int
+        ) -> None:
+    """Unify and write the seasons chunk by chunk, see gamelog_schedule_unification."""
+
+    def _unify(chunk: List[int]) -> pd.DataFrame:
+        return unify_gamelog_schedule(read_gamelog(chunk), read_schedule(chunk))
+
+    if season_results is None:
+        all_seasons = seasons if seasons is not None else dataset_seasons(gamelog_data_path, gamelog_name_pattern)
+        chunks = (_unify(chunk) for chunk in season_chunks(all_seasons, chunk_size))
+    else:
+        season_results.update(
+            _unify,
+            inputs=[(gamelog_data_path, gamelog_name_pattern), (schedule_data_path, schedule_name_pattern)],
+            seasons=seasons,
+            version=source_fingerprint(*UNIFICATION_SOURCES),
+            chunk_size=chunk_size,
+        )
+        all_seasons = seasons if seasons is not None else season_results.read_manifest()
+        chunks = (season_results.read(chunk) for chunk in season_chunks(all_seasons, chunk_size))
+
+    # The duplicates are checked against the rows of every chunk written before
+    key_set = KeySet(["id_season", "tm", "game_date"])
+    chunks = (key_set.drop_duplicates(apply_schema(chunk, "gamelog_schedule_unified")) for chunk in chunks)
+
+    os.makedirs(unified_file_path, exist_ok=True)
+    name_and_path_file = str(unified_file_path)+ '/' + unified_file_name + file_extension(file_format)
+
+    if seasons is None and teams is None:
+        write_frame_chunks(chunks, name_and_path_file, schema="gamelog_schedule_unified")
+    else:
+        replace_season_chunks(chunks, name_and_path_file, seasons, schema="gamelog_schedule_unified", teams=teams)
+
+    logger.info("Gamelog & Schedule Unification complete, %s rows streamed", len(key_set))
+
+
+def gamelog_schedule_unification(
+        gamelog_data_path: Path ='pipeline_output/gamelog/',
+        gamelog_name_pattern: str = 'gamelog',
+        schedule_data_path: Path ='pipeline_output/schedule/',
+        schedule_name_pattern: str = 'schedule',
+        unified_file_path: Optional[Path] ='pipeline_output/unified/',
+        unified_file_name: str = 'nba_games_training_dataset',
+        file_format: str = 'parquet',
+        seasons: Optional[List[int]] = None,
+        teams: Optional[List[str]] = None,
+        gamelog_df: Optional[pd.DataFrame] = None,
+        schedule_df: Optional[pd.DataFrame] = None,
+        season_results_dir: Optional[Path] = None,
+        chunk_size: Optional[int] = None
+        ) -> Optional[pd.DataFrame]:
+    """
+    Unification of gamelogs and schdules dataframes.
+
+    Args:
+        gamelog_data_path: Path where to read the gamelog dataframe.
+        gamelog_name_pattern (str): gamelog name pattern to read mutliple season gamelog
+        schedule_data_path: Path where to read the schedule dataframe.
+        schedule_name_pattern (str): schedule name pattern to read mutliple season schedule
+        unified_file_path (Path): Path where to save the unified dataframe. None keeps it in memory only.
+        unified_file_name (str): Name of the unfied dataframe
+        file_format (str): 'parquet' or 'csv', format of the unified dataframe. Default is 'parquet'.
+        seasons (list): Seasons to unify, the other seasons files or partitions are not read and the rows
+            of the other seasons of the unified dataframe are kept. Default is None, every season.
+        teams (list): Teams to unify, the other teams partitions are not read and the rows of the other teams
+            of the unified dataframe are kept. Default is None, every team.
+        gamelog_df (pd.DataFrame): Gamelog handed over by the acquisition, instead of reading gamelog_data_path.
+        schedule_df (pd.DataFrame): Schedule handed over by the acquisition, instead of reading schedule_data_path.
+        season_results_dir (Path): Folder of the unified seasons and of the fingerprints of their inputs. Only the
+            seasons whose inputs changed are unified again. Default is None, every season is unified.
+        chunk_size (int): Number of seasons read and unified at a time, the unified file is written chunk by
+            chunk so the memory does not grow with the history. Default is None, every season at once.
+    Returns:
+        pd.DataFrame: Unified dataframe of the seasons, None when it is streamed by chunk_size.
+    """
+
+    # ------------------------------------------
+    # Read the data
+
+    def _read_gamelog(read_seasons: Optional[List[int]]) -> pd.DataFrame:
+        return read_dataset(gamelog_data_path, gamelog_name_pattern, seasons=read_seasons, teams=teams, schema="gamelog")
+
+    def _read_schedule(read_seasons: Optional[List[int]]) -> pd.DataFrame:
+        return read_dataset(
+            schedule_data_path, schedule_name_pattern, seasons=read_seasons, teams=teams, columns=SCHEDULE_COLUMNS, schema="schedule"
+        )
+
+    if chunk_size is not None and gamelog_df is None and schedule_df is None and unified_file_path is not None:
+        return _stream_gamelog_schedule_unification(
+            _read_gamelog,
+            _read_schedule,
+            gamelog_data_path=gamelog_data_path,
+            gamelog_name_pattern=gamelog_name_pattern,
+            schedule_data_path=schedule_data_path,
+            schedule_name_pattern=schedule_name_pattern,
+            unified_file_path=unified_file_path,
+            unified_file_name=unified_file_name,
+            file_format=file_format,
+            seasons=seasons,
+            teams=teams,
+            season_results=(
+                None if season_results_dir is None or teams is not None
+                else SeasonResults(season_results_dir, unified_file_name, schema="gamelog_schedule_unified", file_format=file_format)
+            ),
+            chunk_size=chunk_size,
+        )
+
+    if gamelog_df is not None or schedule_df is not None:
+        nba_games_training_dataset = unify_gamelog_schedule(
+            _read_gamelog(seasons) if gamelog_df is None else apply_schema(gamelog_df, "gamelog"),
+            (
+                _read_schedule(seasons) if schedule_df is None
+                else apply_schema(schedule_df[SCHEDULE_COLUMNS], "schedule", columns=SCHEDULE_COLUMNS)
+            ),
+        )
+    elif season_results_dir is None or teams is not None:
+        nba_games_training_dataset = unify_gamelog_schedule(_read_gamelog(seasons), _read_schedule(seasons))
+    else:
+        # Only the seasons whose gamelog or schedule changed are read and unified again
+        season_results = SeasonResults(
+            season_results_dir, unified_file_name, schema="gamelog_schedule_unified", file_format=file_format
+        )
+        season_results.update(
+            lambda changed_seasons: unify_gamelog_schedule(_read_gamelog(changed_seasons), _read_schedule(changed_seasons)),
+            inputs=[(gamelog_data_path, gamelog_name_pattern), (schedule_data_path, schedule_name_pattern)],
+            seasons=seasons,
+            version=source_fingerprint(*UNIFICATION_SOURCES),
+        )
+        nba_games_training_dataset = season_results.read(seasons)
+
+    if unified_file_path is None:
+        return nba_games_training_dataset
 
     # ------------------------------------------
     # Saving final training dataset
@@ -116,11 +251,16 @@ def gamelog_schedule_unification(
     if not isExist:
         os.makedirs(unified_file_path)
 
-    name_and_path_file = str(unified_file_path)+ '/' + unified_file_name + ".csv"
+    name_and_path_file = str(unified_file_path)+ '/' + unified_file_name + file_extension(file_format)
 
-    nba_games_training_dataset.to_csv(name_and_path_file, index=False)
+    if seasons is None and teams is None:
+        write_frame(nba_games_training_dataset, name_and_path_file, schema="gamelog_schedule_unified")
+    else:
+        # Only the rows of the seasons and teams unified are replaced
+        replace_seasons(nba_games_training_dataset, name_and_path_file, seasons, schema="gamelog_schedule_unified", teams=teams)
 
     logger.info("Gamelog & Schedule Unification complete")
+    return nba_games_training_dataset
 
 def get_args():
     """
@@ -189,6 +329,48 @@ def get_args():
         default=schedule_data_acquisition["data_type"],
     )
 
+    parser.add_argument(
+        "--file-format",
+        dest="file_format",
+        type=str,
+        choices=["parquet", "csv"],
+        default=params["base"]["file_format"],
+    )
+
+    parser.add_argument(
+        "--seasons",
+        dest="seasons",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Seasons or inclusive season ranges to unify, e.g. 2024-2026, default to every season",
+    )
+
+    parser.add_argument(
+        "--season-results-dir",
+        dest="season_results_dir",
+        type=Path,
+        default=params["base"]["season_results_dir"],
+        help="Folder of the unified seasons, only the seasons whose inputs changed are unified again",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=gamelog_schedule_unification_params["chunk_size"],
+        help="Number of seasons unified at a time, the unified file is written chunk by chunk",
+    )
+
+    parser.add_argument(
+        "--teams",
+        dest="teams",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Teams to unify, e.g. BOS, default to every team",
+    )
+
     args = parser.parse_args()
 
     args.unified_file_path.parent.mkdir(
@@ -208,6 +390,11 @@ def main():
         schedule_name_pattern=args.schedule_name_pattern,
         unified_file_path=args.unified_file_path,
         unified_file_name=args.unified_file_name,
+        file_format=args.file_format,
+        seasons=parse_seasons(args.seasons) if args.seasons else None,
+        teams=args.teams,
+        season_results_dir=args.season_results_dir,
+        chunk_size=args.chunk_size,
     )
 
 if __name__ == "__main__":
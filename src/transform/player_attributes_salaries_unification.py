@@ -4,68 +4,53 @@ from typing import Text
 import yaml
 import argparse
 import os
-import glob
-from typing import Union
+from typing import Callable, List, Optional, Union
 from pathlib import Path
 
+from src.utils import partitions, schemas, storage, teams
+from src.utils.batch import parse_seasons
 from src.utils.logs import get_logger
+from src.utils.partitions import dataset_seasons, read_dataset
+from src.utils.schemas import apply_schema
+from src.utils.season_results import SeasonResults, source_fingerprint
+from src.utils.storage import file_extension, replace_seasons, write_frame
+from src.utils.streaming import KeySet, replace_season_chunks, season_chunks, write_frame_chunks
 
 logger = get_logger(
     "PLAYER_ATTRIBUTES_SALARIES_UNIFICATION", log_level='INFO'
 )
 
+# Columns of the attributes and of the salaries used by the unification, the only ones read
+PLAYER_ATTRIBUTES_COLUMNS = ["id_season", "tm", "Name", "Position", "Ht", "Wt", "BirthDate", "Experience"]
 
-def player_attributes_salaries_unification(
-        schedule_data_path: Path ='pipeline_output/schedule/',
-        schedule_name_pattern: str = 'schedule',
-        player_attributes_data_path: Path ='pipeline_output/player_attributes/',
-        player_attributes_name_pattern: str = 'player_attributes',
-        player_salary_data_path: Path ='pipeline_output/player_salary/',
-        player_salary_name_pattern: str = 'player_salary',
-        output_dest_file_path: Path ='pipeline_output/unified/',
-        output_file_name: str = 'player_attributes_salaries_dataset'
-        ) -> None:
-    """
-    Unification of gamelogs and schdules dataframes.
-
-    Args:
-        schedule_data_path: Path where to read the schedule dataframe.
-        schedule_name_pattern (str):  schedule name pattern to read mutliple files
-        player_attributes_data_path (Path): Path where to read the player attributs dataframe.
-        player_attributes_name_pattern (str): player_attributes name pattern to read mutliple files
-        player_salary_data_path (Path): Path where to read the gamelog dataframe.
-        player_salary_name_pattern (str):  player_salary name pattern to read mutliple files
-        output_dest_file_path (Path): Path where to save the final processed dataframe.
-        output_file_name (str): Name of the final processed dataframe
-    """
+PLAYER_SALARY_COLUMNS = ["name", "year", "salary"]
 
-    # ------------------------------------------
-    # Read the data
+# Modules and reference data of the unified rows, a change to any of them unifies every season again
+UNIFICATION_SOURCES = [
+    __file__,
+    schemas.__file__,
+    teams.__file__,
+    teams.TEAM_CITY_REFDATA_PATH,
+    partitions.__file__,
+    storage.__file__,
+]
 
-    schedule_df = pd.concat(
-        map(
-            pd.read_csv,
-            glob.glob(os.path.join(schedule_data_path, schedule_name_pattern +  "_*.csv")),
-        )
-    )
-    schedule_df = schedule_df.reset_index(drop=True)
 
-    players_attributes_df = pd.concat(
-        map(
-            pd.read_csv,
-            glob.glob(os.path.join(player_attributes_data_path, player_attributes_name_pattern +  "_*.csv")),
-        )
-    )
-    players_attributes_df = players_attributes_df.reset_index(drop=True)
-
-    players_salary_df = pd.concat(
-        map(
-            pd.read_csv,
-            glob.glob(os.path.join(player_salary_data_path, player_salary_name_pattern +  "_*.csv")),
-        )
-    )
-    players_salary_df = players_salary_df.reset_index(drop=True)
+def unify_player_attributes_salaries(
+        schedule_df: pd.DataFrame,
+        players_attributes_df: pd.DataFrame,
+        players_salary_df: pd.DataFrame
+        ) -> pd.DataFrame:
+    """
+    Join the attributes and the salaries of the players of the same seasons.
 
+    Args:
+        schedule_df (pd.DataFrame): id_season and game_date of the schedules, for the start date of the seasons.
+        players_attributes_df (pd.DataFrame): Player attributes, typed with the player_attributes schema.
+        players_salary_df (pd.DataFrame): Player salaries, typed with the player_salary schema.
+    Returns:
+        pd.DataFrame: Unified rows, one per player of each team.
+    """
 
     # Name cleaning from both player attributes and player salary
     players_attributes_df["Name"] = players_attributes_df["Name"].str.replace(
@@ -147,7 +132,7 @@ def player_attributes_salaries_unification(
     # Add Salary
     player_info = pd.merge(
         players_attributes_df,
-        players_salary_df[["name", "year", "salary"]],
+        players_salary_df[PLAYER_SALARY_COLUMNS],
         how="left",
         left_on=["Name", "id_season"],
         right_on=["name", "year"],
@@ -178,6 +163,206 @@ def player_attributes_salaries_unification(
 
     player_info = player_info.drop_duplicates(subset=["id_season", "tm", "Name"])
 
+    return player_info
+
+
+def _stream_player_attributes_salaries_unification(
+        read_schedule: Callable[[List[int]], pd.DataFrame],
+        read_players_attributes: Callable[[List[int]], pd.DataFrame],
+        read_players_salary: Callable[[List[int]], pd.DataFrame],
+        schedule_data_path: Path,
+        schedule_name_pattern: str,
+        player_attributes_data_path: Path,
+        player_attributes_name_pattern: str,
+        player_salary_data_path: Path,
+        player_salary_name_pattern: str,
+        output_dest_file_path: Path,
+        output_file_name: str,
+        file_format: str,
+        seasons: Optional[List[int]],
+        teams: Optional[List[str]],
+        season_results: Optional[SeasonResults],
+        chunk_size: int
+        ) -> None:
+    """Unify and write the seasons chunk by chunk, see player_attributes_salaries_unification."""
+
+    def _unify(chunk: List[int]) -> pd.DataFrame:
+        return unify_player_attributes_salaries(read_schedule(chunk), read_players_attributes(chunk), read_players_salary(chunk))
+
+    if season_results is None:
+        all_seasons = (
+            seasons if seasons is not None else dataset_seasons(player_attributes_data_path, player_attributes_name_pattern)
+        )
+        chunks = (_unify(chunk) for chunk in season_chunks(all_seasons, chunk_size))
+    else:
+        season_results.update(
+            _unify,
+            inputs=[
+                (schedule_data_path, schedule_name_pattern),
+                (player_attributes_data_path, player_attributes_name_pattern),
+                (player_salary_data_path, player_salary_name_pattern),
+            ],
+            seasons=seasons,
+            version=source_fingerprint(*UNIFICATION_SOURCES),
+            chunk_size=chunk_size,
+        )
+        all_seasons = seasons if seasons is not None else season_results.read_manifest()
+        chunks = (season_results.read(chunk) for chunk in season_chunks(all_seasons, chunk_size))
+
+    # The duplicates are checked against the rows of every chunk written before
+    key_set = KeySet(["id_season", "tm", "Name"])
+    chunks = (key_set.drop_duplicates(apply_schema(chunk, "player_attributes_salaries_unified")) for chunk in chunks)
+
+    os.makedirs(output_dest_file_path, exist_ok=True)
+    name_and_path_file = str(output_dest_file_path) + '/' + output_file_name + file_extension(file_format)
+
+    if seasons is None and teams is None:
+        write_frame_chunks(chunks, name_and_path_file, schema="player_attributes_salaries_unified")
+    else:
+        replace_season_chunks(chunks, name_and_path_file, seasons, schema="player_attributes_salaries_unified", teams=teams)
+
+    logger.info("Player Attributes & Salaries Unification complete, %s rows streamed", len(key_set))
+
+
+def player_attributes_salaries_unification(
+        schedule_data_path: Path ='pipeline_output/schedule/',
+        schedule_name_pattern: str = 'schedule',
+        player_attributes_data_path: Path ='pipeline_output/player_attributes/',
+        player_attributes_name_pattern: str = 'player_attributes',
+        player_salary_data_path: Path ='pipeline_output/player_salary/',
+        player_salary_name_pattern: str = 'player_salary',
+        output_dest_file_path: Optional[Path] ='pipeline_output/unified/',
+        output_file_name: str = 'player_attributes_salaries_dataset',
+        file_format: str = 'parquet',
+        seasons: Optional[List[int]] = None,
+        teams: Optional[List[str]] = None,
+        schedule_df: Optional[pd.DataFrame] = None,
+        players_attributes_df: Optional[pd.DataFrame] = None,
+        players_salary_df: Optional[pd.DataFrame] = None,
+        season_results_dir: Optional[Path] = None,
+        chunk_size: Optional[int] = None
+        ) -> Optional[pd.DataFrame]:
+    """
+    Unification of gamelogs and schdules dataframes.
+
+    Args:
+        schedule_data_path: Path where to read the schedule dataframe.
+        schedule_name_pattern (str):  schedule name pattern to read mutliple files
+        player_attributes_data_path (Path): Path where to read the player attributs dataframe.
+        player_attributes_name_pattern (str): player_attributes name pattern to read mutliple files
+        player_salary_data_path (Path): Path where to read the gamelog dataframe.
+        player_salary_name_pattern (str):  player_salary name pattern to read mutliple files
+        output_dest_file_path (Path): Path where to save the final processed dataframe. None keeps it in memory only.
+        output_file_name (str): Name of the final processed dataframe
+        file_format (str): 'parquet' or 'csv', format of the final processed dataframe. Default is 'parquet'.
+        seasons (list): Seasons to unify, the other seasons files or partitions are not read and the rows
+            of the other seasons of the final processed dataframe are kept. Default is None, every season.
+        teams (list): Teams of the players to unify, the rows of the other teams of the unified dataframe
+            are kept. Default is None, every team.
+        schedule_df (pd.DataFrame): Schedule handed over by the acquisition, instead of reading schedule_data_path.
+        players_attributes_df (pd.DataFrame): Player attributes handed over by the acquisition.
+        players_salary_df (pd.DataFrame): Player salaries handed over by the acquisition.
+        season_results_dir (Path): Folder of the unified seasons and of the fingerprints of their inputs. Only the
+            seasons whose inputs changed are unified again. Default is None, every season is unified.
+        chunk_size (int): Number of seasons read and unified at a time, the final processed dataframe is written
+            chunk by chunk so the memory does not grow with the history. Default is None, every season at once.
+    Returns:
+        pd.DataFrame: Final processed dataframe of the seasons, None when it is streamed by chunk_size.
+    """
+
+    # ------------------------------------------
+    # Read the data
+
+    # Only the season start dates are needed from the schedules
+    def _read_schedule(read_seasons: Optional[List[int]]) -> pd.DataFrame:
+        return read_dataset(
+            schedule_data_path, schedule_name_pattern, seasons=read_seasons, columns=["id_season", "game_date"], schema="schedule"
+        )
+
+    def _read_players_attributes(read_seasons: Optional[List[int]]) -> pd.DataFrame:
+        return read_dataset(
+            player_attributes_data_path,
+            player_attributes_name_pattern,
+            seasons=read_seasons,
+            teams=teams,
+            columns=PLAYER_ATTRIBUTES_COLUMNS,
+            schema="player_attributes",
+        )
+
+    # The salaries have no team abbreviation, they are matched on the players kept
+    def _read_players_salary(read_seasons: Optional[List[int]]) -> pd.DataFrame:
+        return read_dataset(
+            player_salary_data_path, player_salary_name_pattern, seasons=read_seasons, columns=PLAYER_SALARY_COLUMNS, schema="player_salary"
+        )
+
+    if (
+            chunk_size is not None and output_dest_file_path is not None
+            and schedule_df is None and players_attributes_df is None and players_salary_df is None
+    ):
+        return _stream_player_attributes_salaries_unification(
+            _read_schedule,
+            _read_players_attributes,
+            _read_players_salary,
+            schedule_data_path=schedule_data_path,
+            schedule_name_pattern=schedule_name_pattern,
+            player_attributes_data_path=player_attributes_data_path,
+            player_attributes_name_pattern=player_attributes_name_pattern,
+            player_salary_data_path=player_salary_data_path,
+            player_salary_name_pattern=player_salary_name_pattern,
+            output_dest_file_path=output_dest_file_path,
+            output_file_name=output_file_name,
+            file_format=file_format,
+            seasons=seasons,
+            teams=teams,
+            season_results=(
+                None if season_results_dir is None or teams is not None
+                else SeasonResults(
+                    season_results_dir, output_file_name, schema="player_attributes_salaries_unified", file_format=file_format
+                )
+            ),
+            chunk_size=chunk_size,
+        )
+
+    if schedule_df is not None or players_attributes_df is not None or players_salary_df is not None:
+        player_info = unify_player_attributes_salaries(
+            _read_schedule(seasons) if schedule_df is None else apply_schema(
+                schedule_df[["id_season", "game_date"]], "schedule", columns=["id_season", "game_date"]
+            ),
+            _read_players_attributes(seasons) if players_attributes_df is None else apply_schema(
+                players_attributes_df[PLAYER_ATTRIBUTES_COLUMNS], "player_attributes", columns=PLAYER_ATTRIBUTES_COLUMNS
+            ),
+            _read_players_salary(seasons) if players_salary_df is None else apply_schema(
+                players_salary_df[PLAYER_SALARY_COLUMNS], "player_salary", columns=PLAYER_SALARY_COLUMNS
+            ),
+        )
+    elif season_results_dir is None or teams is not None:
+        player_info = unify_player_attributes_salaries(
+            _read_schedule(seasons), _read_players_attributes(seasons), _read_players_salary(seasons)
+        )
+    else:
+        # Only the seasons whose schedule, attributes or salaries changed are read and unified again
+        season_results = SeasonResults(
+            season_results_dir, output_file_name, schema="player_attributes_salaries_unified", file_format=file_format
+        )
+        season_results.update(
+            lambda changed_seasons: unify_player_attributes_salaries(
+                _read_schedule(changed_seasons),
+                _read_players_attributes(changed_seasons),
+                _read_players_salary(changed_seasons),
+            ),
+            inputs=[
+                (schedule_data_path, schedule_name_pattern),
+                (player_attributes_data_path, player_attributes_name_pattern),
+                (player_salary_data_path, player_salary_name_pattern),
+            ],
+            seasons=seasons,
+            version=source_fingerprint(*UNIFICATION_SOURCES),
+        )
+        player_info = season_results.read(seasons)
+
+    if output_dest_file_path is None:
+        return player_info
+
     # ------------------------------------------
     # Saving final training dataset
 
@@ -185,11 +370,16 @@ def player_attributes_salaries_unification(
     if not isExist:
         os.makedirs(output_dest_file_path)
 
-    name_and_path_file = str(output_dest_file_path) + '/' + output_file_name + ".csv"
+    name_and_path_file = str(output_dest_file_path) + '/' + output_file_name + file_extension(file_format)
 
-    player_info.to_csv(name_and_path_file, index=False)
+    if seasons is None and teams is None:
+        write_frame(player_info, name_and_path_file, schema="player_attributes_salaries_unified")
+    else:
+        # Only the rows of the seasons and teams unified are replaced
+        replace_seasons(player_info, name_and_path_file, seasons, schema="player_attributes_salaries_unified", teams=teams)
 
     logger.info("Player Atributes & Salaries Unification complete")
+    return player_info
 
 def get_args():
     """
@@ -274,6 +464,48 @@ def get_args():
         default=schedule_data_acquisition["data_type"],
     )
 
+    parser.add_argument(
+        "--file-format",
+        dest="file_format",
+        type=str,
+        choices=["parquet", "csv"],
+        default=params["base"]["file_format"],
+    )
+
+    parser.add_argument(
+        "--seasons",
+        dest="seasons",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Seasons or inclusive season ranges to unify, e.g. 2024-2026, default to every season",
+    )
+
+    parser.add_argument(
+        "--season-results-dir",
+        dest="season_results_dir",
+        type=Path,
+        default=params["base"]["season_results_dir"],
+        help="Folder of the unified seasons, only the seasons whose inputs changed are unified again",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=player_attributes_salaries_unification["chunk_size"],
+        help="Number of seasons unified at a time, the final file is written chunk by chunk",
+    )
+
+    parser.add_argument(
+        "--teams",
+        dest="teams",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Teams of the players to unify, e.g. BOS, default to every team",
+    )
+
     args = parser.parse_args()
 
     args.output_dest_file_path.parent.mkdir(
@@ -294,7 +526,12 @@ def main():
         player_salary_data_path=args.player_salary_data_path,
         player_salary_name_pattern=args.player_salary_name_pattern,
         output_dest_file_path=args.output_dest_file_path,
-        output_file_name=args.output_file_name
+        output_file_name=args.output_file_name,
+        file_format=args.file_format,
+        seasons=parse_seasons(args.seasons) if args.seasons else None,
+        teams=args.teams,
+        season_results_dir=args.season_results_dir,
+        chunk_size=args.chunk_size,
     )
 
 if __name__ == "__main__":
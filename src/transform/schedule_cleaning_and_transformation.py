@@ -1,12 +1,15 @@
 import pandas as pd
 import numpy as np
-from typing import Text
+from typing import Optional, Text
 import yaml
 import argparse
 import os
 from pathlib import Path
 
 from src.utils.logs import get_logger
+from src.utils.partitions import write_partitions
+from src.utils.schemas import apply_schema
+from src.utils.storage import file_extension, read_frame, write_frame
 
 logger = get_logger(
     "SCHEDULE_CLEANING_AND_TRANSFORMATION", log_level='INFO'
@@ -15,8 +18,10 @@ logger = get_logger(
 def schedule_cleaning_and_transformation(
         file_name: str = 'schedule_2023_all',
         input_folder: Path = 'pipeline_output/schedule/',
-        output_folder: Path = 'pipeline_output/schedule_cleaned/'
-        ) -> None:
+        output_folder: Optional[Path] = 'pipeline_output/schedule_cleaned/',
+        file_format: str = 'parquet',
+        schedule_df: Optional[pd.DataFrame] = None
+        ) -> pd.DataFrame:
     """
     Unification of gamelogs and schdules dataframes.
 
@@ -24,13 +29,21 @@ def schedule_cleaning_and_transformation(
         data_type (str): Argument from basketball_reference_webscrapper. Type of data to pull from the package
         season (int): Argument from basketball_reference_webscrapper. Season to pull from the package
         team: Path (str): Argument from basketball_reference_webscrapper. Default is 'all'. Team to pull data from the package.
-        output_folder (Path): Path where to save the gamelog data pulled using the package.
+        output_folder (Path): Root folder of the cleaned dataset, partitioned as id_season=YYYY/tm=XXX.
+            None keeps the cleaned season in memory only.
+        file_format (str): 'parquet' or 'csv', format of the input and partition files. Default is 'parquet'.
+        schedule_df (pd.DataFrame): Schedule of the season handed over by the acquisition, instead of reading file_name.
+    Returns:
+        pd.DataFrame: Cleaned season.
     """
 
     # ------------------------------------------
     # Read the data
-    file_path_name = str(input_folder) + '/' +str(file_name) +  ".csv"
-    schedule_df = pd.read_csv(file_path_name)
+    if schedule_df is None:
+        file_path_name = str(input_folder) + '/' +str(file_name) + file_extension(file_format)
+        schedule_df = read_frame(file_path_name, schema="schedule")
+    else:
+        schedule_df = apply_schema(schedule_df, "schedule")
     schedule_df = schedule_df.reset_index(drop=True)
 
     # ----------------------------------------------
@@ -58,6 +71,9 @@ def schedule_cleaning_and_transformation(
     
     schedule_df['game_date'] = schedule_df['game_date'].astype(str).str[:10]
 
+    if output_folder is None:
+        return schedule_df
+
     # ------------------------------------------
     # Saving final training dataset
 
@@ -65,11 +81,14 @@ def schedule_cleaning_and_transformation(
     if not isExist:
         os.makedirs(output_folder)
 
-    name_and_path_file = str(output_folder)+ '/' + file_name + ".csv"
+    # Partitioned by season and team, the readers only open the partitions they need
+    write_partitions(schedule_df, output_folder, file_format=file_format, schema="schedule_cleaned")
 
-    schedule_df.to_csv(name_and_path_file, index=False)
+    # The season is also exported as one csv file, the S3 deliverable
+    write_frame(schedule_df, str(output_folder)+ '/' + file_name + file_extension("csv"), schema="schedule_cleaned")
 
     logger.info("Schedule cleaning and transformation complete")
+    return schedule_df
 
 def get_args():
     """
@@ -123,6 +142,14 @@ def get_args():
         default=file_name,
     )
 
+    parser.add_argument(
+        "--file-format",
+        dest="file_format",
+        type=str,
+        choices=["parquet", "csv"],
+        default=params["base"]["file_format"],
+    )
+
     args = parser.parse_args()
 
     args.output_folder.parent.mkdir(
@@ -138,7 +165,8 @@ def main():
     schedule_cleaning_and_transformation(
         file_name=args.file_name,
         input_folder=args.input_folder,
-        output_folder=args.output_folder
+        output_folder=args.output_folder,
+        file_format=args.file_format,
     )
 
 if __name__ == "__main__":
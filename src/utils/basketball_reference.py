@@ -0,0 +1,275 @@
+"""Provides a per-team scrapper of basketball-reference.com team pages.
+
+The pages are parsed as basketball_reference_webscrapper does, using the
+package params (urls, table rows and columns), but every team is fetched on
+its own through the shared pooled HttpClient, so the teams of a season can be
+fetched concurrently under one per-host rate limiter instead of one after the
+other with a fixed sleep.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib.resources import as_file, files
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+import requests
+import yaml
+from bs4 import BeautifulSoup
+
+from src.utils.checkpoint import Checkpoint
+from src.utils.http_client import get_http_client
+from src.utils.logs import get_logger
+from src.utils.rate_limiter import get_host_rate_limiter
+from src.utils.response_cache import ResponseCache, season_ttl
+from src.utils.teams import get_team_abbreviations, team_played
+
+logger = get_logger(
+    "BASKETBALL_REFERENCE", log_level='INFO'
+)
+
+DATA_TYPES = ["gamelog", "schedule", "player_attributes"]
+
+# First season of the package, the earlier pages are not supported
+FIRST_SEASON = 1999
+
+
+def get_webscrapper_config() -> dict:
+    """Read the params of basketball_reference_webscrapper (urls, rows and columns per data type)."""
+    ref = files("basketball_reference_webscrapper") / "params.yaml"
+    with as_file(ref) as path:
+        with open(path, encoding="utf-8") as conf_file:
+            return yaml.safe_load(conf_file)
+
+
+def validate_request(data_type: str, season: int, team: Union[str, List[str]]) -> None:
+    """
+    Check the data type, season and teams to scrape the way basketball_reference_webscrapper does.
+
+    Args:
+        data_type (str): 'gamelog', 'schedule' or 'player_attributes'.
+        season (int): Season to pull.
+        team (str or list): 'all', a team abbreviation or a list of team abbreviations.
+    Raises:
+        ValueError: When one of them is not supported, before any request.
+    """
+    if data_type not in DATA_TYPES:
+        raise ValueError(
+            "data_type value provided is not supported.\
+            Accepted values are: 'gamelog', 'schedule', 'player_attributes'."
+        )
+
+    if not isinstance(season, int) or isinstance(season, bool) or season < FIRST_SEASON:
+        raise ValueError(
+            "season value provided is not supported, it should be an int value between "
+            + str(FIRST_SEASON) + " and current NBA season."
+        )
+
+    teams = team if isinstance(team, list) else [team]
+    if not all(isinstance(team_abbrev, str) for team_abbrev in teams):
+        raise ValueError("team args should be a string or a list of string.")
+    unknown_teams = set(teams) - set(get_team_abbreviations()) - ({"all"} if isinstance(team, str) else set())
+    if unknown_teams:
+        raise ValueError(
+            "team arg provided is not accepted: " + ", ".join(sorted(unknown_teams))
+            + ". Value needs to be 'all' or a NBA team abbreviation such as BOS for Boston Celtics."
+        )
+
+
+def _missing_team_page(data_type: str, season: int, team: str, url: str, response) -> pd.DataFrame:
+    """Skip the page of a team that did not play the season, a missing page of any other team is an error."""
+    if team_played(team, season):
+        raise requests.HTTPError(
+            "Team " + team + ": no " + data_type + " page for season " + str(season) + " at " + url, response=response
+        )
+    logger.warning("Team %s: did not play season %s, no %s page", team, season, data_type)
+    return pd.DataFrame()
+
+
+def get_team_url(config: dict, data_type: str, season: int, team: str) -> str:
+    """Build the basketball-reference url of a team season page."""
+    url = config[data_type]["url"] + team + "/" + str(season)
+
+    if data_type == "gamelog":
+        return url + "/" + data_type
+    if data_type == "schedule":
+        return url + "_games.html"
+    if data_type == "player_attributes":
+        return url + ".html"
+
+    raise ValueError(
+        "data_type value provided is not supported.\
+        Accepted values are: 'gamelog', 'schedule', 'player_attributes'."
+    )
+
+
+def parse_team_page(content: bytes, config: dict, data_type: str, season: int, team: str) -> pd.DataFrame:
+    """
+    Parse a team season page the way basketball_reference_webscrapper does.
+
+    Returns:
+        pd.DataFrame: Rows of the page with the package list_columns, id_season and tm.
+    """
+    soup = BeautifulSoup(content, "html.parser")
+
+    if data_type == "player_attributes":
+        rows = soup.findAll("table")[config[data_type]["beautifulsoup_tr_index"]]
+        rows = rows.find_all("tr")
+    else:
+        rows = soup.findAll("tr")[config[data_type]["beautifulsoup_tr_index"]:]
+
+    rows_data = [[td.getText() for td in row.findAll("td")] for row in rows]
+
+    if len(rows_data) == 0:
+        return pd.DataFrame()
+
+    team_df = pd.DataFrame(rows_data)
+    team_df.columns = config[data_type]["list_columns"]
+    team_df = team_df.dropna()
+    team_df.loc[:, "id_season"] = season
+    team_df.loc[:, "tm"] = team
+
+    return team_df
+
+
+def scrape_team_data(
+        data_type: str,
+        season: int,
+        team: str,
+        config: Optional[dict] = None,
+        cache: Optional[ResponseCache] = None
+        ) -> pd.DataFrame:
+    """
+    Scrape the data of one team and one season.
+
+    A 404 gives an empty dataframe for a team that did not play the season,
+    as the package does. Any other failure, a 404 of a team that played the
+    season included, e.g. a page missing from a replayed archive, is raised
+    so that the season fails instead of being written with teams missing.
+
+    Args:
+        data_type (str): 'gamelog', 'schedule' or 'player_attributes'.
+        season (int): Season to pull.
+        team (str): Team abbreviation.
+        config (dict): Package params, read when not given.
+        cache (ResponseCache): Cache of the pages, None to always request them.
+    Returns:
+        pd.DataFrame
+    Raises:
+        CircuitOpenError: When the circuit of basketball-reference.com is open.
+        requests.HTTPError: When the page answers with an error, e.g. a 429, a 5xx or a 404 of a team that played.
+        ValueError: When the data type, season or team is not supported.
+    """
+    validate_request(data_type, season, team)
+    config = config or get_webscrapper_config()
+    url = get_team_url(config, data_type, season, team)
+
+    if cache is not None:
+        try:
+            content = cache.get(url, ttl=season_ttl(season))
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            return _missing_team_page(data_type, season, team, url, e.response)
+    else:
+        response = get_http_client().get(url, headers={"Referer": "https://www.basketball-reference.com/"})
+        logger.info("Team %s: Status Code = %s", team, response.status_code)
+        if response.status_code == 404:
+            return _missing_team_page(data_type, season, team, url, response)
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                "Team " + team + ": got status " + str(response.status_code) + " for " + url, response=response
+            )
+        content = response.content
+
+    return parse_team_page(content, config, data_type, season, team)
+
+
+def fan_out_teams(
+        data_type: str,
+        season: int,
+        team: Union[str, List[str]] = 'all',
+        max_workers: int = 4,
+        requests_per_second: float = 0.3,
+        cache_dir: Optional[Union[str, Path]] = None,
+        checkpoint: Optional[Checkpoint] = None
+        ) -> pd.DataFrame:
+    """
+    Scrape every team of a season concurrently under the shared rate limiter.
+
+    Args:
+        data_type (str): 'gamelog', 'schedule' or 'player_attributes'.
+        season (int): Season to pull.
+        team (str or list): 'all' for every team of constants/team_city_refdata.csv that played the season,
+            a team or a list of teams.
+        max_workers (int): Number of teams fetched in parallel.
+        requests_per_second (float): Request budget of basketball-reference.com, shared by every worker.
+        cache_dir (Path): Folder of the pages cache, None to always request the pages.
+        checkpoint (Checkpoint): Checkpoint of the season, the teams already scrapped are read from it.
+    Returns:
+        pd.DataFrame: Rows of every team, concatenated in the team reference data order.
+    Raises:
+        ValueError: When the data type, season or team is not supported.
+    """
+    validate_request(data_type, season, team)
+    config = get_webscrapper_config()
+    cache = ResponseCache(cache_dir) if cache_dir is not None else None
+
+    if isinstance(team, list):
+        teams = team
+    elif team == 'all':
+        # The teams that did not play the season have no page, they are not requested
+        teams = get_team_abbreviations(season)
+    else:
+        teams = [team]
+
+    # The shared HttpClient waits for the basketball-reference budget before every request
+    rate_limiter = get_host_rate_limiter(
+        config[data_type]["url"],
+        requests_per_second=requests_per_second,
+        burst=max_workers,
+    )
+
+    def _scrape(team_abbrev: str):
+        start = time.perf_counter()
+        if checkpoint is None:
+            team_df = scrape_team_data(data_type, season, team_abbrev, config=config, cache=cache)
+        else:
+            # The teams without a page give an empty frame, they are not checkpointed so a resumed run retries them
+            team_df = checkpoint.run(
+                "team_" + team_abbrev,
+                lambda: scrape_team_data(data_type, season, team_abbrev, config=config, cache=cache),
+                keep=lambda df: not df.empty,
+            )
+        return team_df, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(teams)))) as executor:
+        # map keeps the reference data order whatever the completion order
+        results = list(executor.map(_scrape, teams))
+    total_seconds = time.perf_counter() - start
+
+    for team_abbrev, (team_df, seconds) in zip(teams, results):
+        logger.info("Team %s: %s rows in %.2f s", team_abbrev, len(team_df), seconds)
+
+    latencies = sorted((seconds, team_abbrev) for team_abbrev, (_, seconds) in zip(teams, results))
+    if latencies:
+        logger.info(
+            "%s %s: %s teams in %.2f s, median team latency %.2f s, slowest %s in %.2f s",
+            data_type,
+            season,
+            len(teams),
+            total_seconds,
+            latencies[len(latencies) // 2][0],
+            latencies[-1][1],
+            latencies[-1][0],
+        )
+    rate_limiter.log_metrics(data_type + " " + str(season))
+
+    team_dfs = [team_df for team_df, _ in results if not team_df.empty]
+    if len(team_dfs) == 0:
+        logger.warning("No data was scraped for any team. Returning empty DataFrame with expected columns.")
+        return pd.DataFrame(columns=config[data_type]["list_columns_to_select"])
+
+    return pd.concat(team_dfs, axis=0)[config[data_type]["list_columns_to_select"]]
@@ -0,0 +1,83 @@
+"""Provides helpers to run a pipeline stage over several seasons in one process."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Union
+
+from src.utils.logs import get_logger
+
+logger = get_logger(
+    "BATCH", log_level='INFO'
+)
+
+
+def parse_seasons(values: Union[int, str, Iterable[Union[int, str]]]) -> List[int]:
+    """
+    Parse a list of seasons and season ranges.
+
+    Accepted values are seasons (2024) and inclusive ranges ("1990-2026"),
+    given alone or in a list, as passed on the command line.
+
+    Returns:
+        list: Sorted and deduplicated seasons.
+    """
+    if isinstance(values, (int, str)):
+        values = [values]
+
+    seasons = set()
+    for value in values:
+        value = str(value).strip()
+        if "-" in value:
+            first, last = (int(bound) for bound in value.split("-", 1))
+            if first > last:
+                raise ValueError("season range " + value + " should be increasing, e.g. 1990-2026")
+            seasons.update(range(first, last + 1))
+        else:
+            seasons.add(int(value))
+
+    return sorted(seasons)
+
+
+def run_for_seasons(
+        function: Callable,
+        seasons: Iterable[int],
+        max_workers: int = 4,
+        **kwargs
+        ) -> None:
+    """
+    Run ``function(season=season, **kwargs)`` for every season on a bounded thread pool.
+
+    The acquisition stages are I/O bound, so threads share one interpreter,
+    one import of the dependencies and one read of params.yaml. Every season
+    is attempted even if another one fails.
+
+    Args:
+        function (Callable): Stage function taking a season argument, or a functools.partial of it.
+        seasons (list): Seasons to run.
+        max_workers (int): Maximum number of seasons run at the same time.
+        **kwargs: Other arguments of the stage function.
+    Raises:
+        RuntimeError: When at least one season failed, after every season ran.
+    """
+    seasons = list(seasons)
+    failed_seasons = []
+    # functools.partial objects have no __name__
+    name = getattr(function, "__name__", None) or function.func.__name__
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(seasons)))) as executor:
+        futures = {
+            executor.submit(function, season=season, **kwargs): season
+            for season in seasons
+        }
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                future.result()
+                logger.info("%s complete for season %s", name, season)
+            except Exception:
+                logger.exception("%s failed for season %s", name, season)
+                failed_seasons.append(season)
+
+    if failed_seasons:
+        raise RuntimeError(
+            name + " failed for seasons: " + ", ".join(str(season) for season in sorted(failed_seasons))
+        )
@@ -0,0 +1,110 @@
+"""Provides checkpoints of the units of work (pages, teams) of an acquisition stage.
+
+Each stage season gets a folder under ``<checkpoint_dir>`` where every unit
+fetched is pickled as soon as it is done, and a ``complete`` marker once the
+season output is written. A run restarted with ``resume`` skips the seasons
+already complete and only fetches the units missing from the others, instead
+of starting the whole backfill over.
+"""
+
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from src.utils.logs import get_logger
+
+logger = get_logger(
+    "CHECKPOINT", log_level='INFO'
+)
+
+COMPLETE_MARKER = "complete"
+
+
+class Checkpoint:
+    """Record of the completed units of one stage season."""
+
+    def __init__(self, checkpoint_dir: Union[str, Path], name: str, resume: bool = False) -> None:
+        """
+        Args:
+            checkpoint_dir (Path): Folder of the checkpoints of every stage.
+            name (str): Name of the stage season, e.g. "player_salary_2019".
+            resume (bool): Keep the checkpoints of a previous run, otherwise they are cleared.
+        """
+        self.folder = Path(checkpoint_dir) / name
+        self.name = name
+
+        if not resume:
+            self.clear()
+
+    def _unit_path(self, unit: str) -> Path:
+        return self.folder / "units" / (re.sub(r"[^\w.-]", "_", unit) + ".pkl")
+
+    def is_done(self, unit: str) -> bool:
+        return self._unit_path(unit).exists()
+
+    def load(self, unit: str) -> Any:
+        with open(self._unit_path(unit), "rb") as unit_file:
+            return pickle.load(unit_file)
+
+    def save(self, unit: str, result: Any) -> None:
+        """Pickle the result of a unit through a temporary file, so a crash never leaves a truncated unit."""
+        unit_path = self._unit_path(unit)
+        unit_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=unit_path.parent, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                pickle.dump(result, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, unit_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def run(self, unit: str, fetch: Callable[[], Any], keep: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Get the result of a unit from its checkpoint, or fetch and checkpoint it.
+
+        Args:
+            unit (str): Name of the unit, e.g. "page_9" or "team_ATL".
+            fetch (Callable): Function fetching the unit.
+            keep (Callable): Tells whether a result should be checkpointed, e.g. not
+                the empty frames of failed requests. Default keeps every result.
+        Returns:
+            Result of the unit.
+        """
+        if self.is_done(unit):
+            logger.info("%s: %s read from checkpoint", self.name, unit)
+            return self.load(unit)
+
+        result = fetch()
+        if keep is None or keep(result):
+            self.save(unit, result)
+        return result
+
+    def is_complete(self) -> bool:
+        return (self.folder / COMPLETE_MARKER).exists()
+
+    def mark_complete(self) -> None:
+        """Record that the season output is written, its units are not needed anymore."""
+        shutil.rmtree(self.folder / "units", ignore_errors=True)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        (self.folder / COMPLETE_MARKER).touch()
+
+    def clear(self) -> None:
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def get_checkpoint(
+        checkpoint_dir: Optional[Union[str, Path]],
+        name: str,
+        resume: bool = False
+        ) -> Optional[Checkpoint]:
+    """Get the Checkpoint of a stage season, None when checkpoint_dir is None."""
+    if checkpoint_dir is None:
+        return None
+    return Checkpoint(checkpoint_dir, name, resume=resume)
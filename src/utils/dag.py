@@ -0,0 +1,151 @@
+"""Provides an in-process runner of a graph of pipeline stages.
+
+Every task is a function called with the results of its input tasks, in an
+order where each task runs after its inputs. The stages then hand their
+DataFrames to each other in memory, in one interpreter, instead of writing
+them to files re-parsed by the next ``python3 -m`` process. The result of a
+task is released as soon as every task reading it has run.
+
+The tasks run on a thread pool: every task starts as soon as its own inputs
+are done, so independent branches such as the acquisitions of the different
+sites overlap and a run takes about the time of its slowest branch.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.logs import get_logger
+
+logger = get_logger(
+    "DAG", log_level='INFO'
+)
+
+
+class Dag:
+    """Graph of tasks, each one called with the results of its inputs."""
+
+    def __init__(self) -> None:
+        self.functions: Dict[str, Callable] = {}
+        self.inputs: Dict[str, List[str]] = {}
+
+    def add(self, name: str, function: Callable, inputs: Iterable[str] = ()) -> None:
+        """
+        Add a task to the graph.
+
+        Args:
+            name (str): Name of the task, e.g. "gamelog_cleaning_and_transformation".
+            function (Callable): Called with the results of the input tasks, in the order of inputs.
+            inputs (list): Names of the tasks whose results the function takes.
+        """
+        if name in self.functions:
+            raise ValueError("task " + name + " is already in the graph")
+        self.functions[name] = function
+        self.inputs[name] = list(inputs)
+
+    def order(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Get the tasks to run for the targets, every task after its inputs.
+
+        Args:
+            targets (list): Tasks to run with the tasks they depend on. Default is None, every task.
+        Returns:
+            list: Names of the tasks in the order of the graph.
+        Raises:
+            ValueError: When a task is unknown or the graph has a cycle.
+        """
+        ordered = []
+        visiting = set()
+
+        def _visit(name: str) -> None:
+            if name in ordered:
+                return
+            if name not in self.functions:
+                raise ValueError("task " + name + " is not in the graph")
+            if name in visiting:
+                raise ValueError("the graph has a cycle through task " + name)
+            visiting.add(name)
+            for input_name in self.inputs[name]:
+                _visit(input_name)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in (self.functions if targets is None else targets):
+            _visit(name)
+        return ordered
+
+    def _run_task(self, name: str, inputs: List[Any]) -> tuple:
+        start = time.perf_counter()
+        result = self.functions[name](*inputs)
+        return result, time.perf_counter() - start
+
+    def run(self, targets: Optional[Iterable[str]] = None, max_workers: int = 1) -> Dict[str, Any]:
+        """
+        Run the tasks of the targets in one process, each one as soon as its inputs are done.
+
+        Every task that does not depend on a failed task is still run, as
+        run_for_seasons attempts every season.
+
+        Args:
+            targets (list): Tasks to run with the tasks they depend on. Default is None, every task.
+            max_workers (int): Maximum number of tasks run at the same time. Default is 1, one task after the other.
+        Returns:
+            dict: Results of the tasks no other task of the run reads, by task name.
+        Raises:
+            RuntimeError: When at least one task failed, after every other task ran.
+        """
+        tasks = self.order(targets)
+        readers = {name: sum(name in self.inputs[task] for task in tasks) for name in tasks}
+        results: Dict[str, Any] = {}
+        done = set()
+        failed_tasks = []
+        pending = list(tasks)
+        running = {}
+        task_seconds = 0.0
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+            while pending or running:
+                # The ready tasks are submitted in the graph order
+                for name in [name for name in pending if all(input_name in done for input_name in self.inputs[name])]:
+                    pending.remove(name)
+                    inputs = [results[input_name] for input_name in self.inputs[name]]
+                    running[executor.submit(self._run_task, name, inputs)] = name
+
+                if not running:
+                    # The pending tasks depend on a failed task
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name], seconds = future.result()
+                    except Exception:
+                        logger.exception("%s failed", name)
+                        failed_tasks.append(name)
+                        continue
+
+                    task_seconds += seconds
+                    done.add(name)
+                    logger.info("%s complete in %.2f s", name, seconds)
+
+                    for input_name in set(self.inputs[name]):
+                        readers[input_name] -= 1
+                        if readers[input_name] == 0:
+                            # The frame is not needed anymore, release it before the next stage
+                            del results[input_name]
+
+        logger.info(
+            "%s tasks complete in %.2f s, %.2f s of task time",
+            len(done),
+            time.perf_counter() - start,
+            task_seconds,
+        )
+
+        if failed_tasks:
+            raise RuntimeError(
+                "tasks failed: " + ", ".join(failed_tasks)
+                + (", not run: " + ", ".join(pending) if pending else "")
+            )
+        return results
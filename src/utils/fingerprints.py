@@ -0,0 +1,117 @@
+"""Provides the content fingerprints of the pipeline datasets.
+
+Every output file has a sidecar manifest, ``<file>.fingerprint.json``, with
+a hash of its rows that does not depend on their order or dtypes. A stage
+compares it with the hash of the rows it is about to write to leave an
+unchanged file as is, and the season results compare the fingerprints of
+their inputs to skip the seasons whose inputs did not change.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+FINGERPRINT_SUFFIX = ".fingerprint.json"
+
+
+def _canonical_column(column: pd.Series) -> pd.Series:
+    """Render a column as strings that do not depend on its dtype, e.g. 1, 1.0 and "1" give "1"."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype(object)
+
+    if pd.api.types.is_bool_dtype(column):
+        return column.astype(str)
+
+    if pd.api.types.is_numeric_dtype(column):
+        values = column.astype("float64")
+        canonical = values.astype(str)
+        integral = values.notna() & np.isfinite(values) & (values == values.round())
+        canonical[integral] = values[integral].astype("int64").astype(str)
+        canonical[values.isna()] = ""
+        return canonical
+
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.dt.strftime("%Y-%m-%d %H:%M:%S").str.replace(" 00:00:00", "", regex=False).fillna("")
+
+    return column.where(column.notna(), "").astype(str)
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Compute a canonical content hash of a dataframe.
+
+    Columns and rows are sorted and every value is rendered as a string
+    independent of its dtype, so the same data gives the same hash whatever
+    the row order or the dtypes it was read with.
+
+    Returns:
+        str: sha256 hex digest.
+    """
+    df = df.reset_index(drop=True)
+    columns = sorted(str(column) for column in df.columns)
+    canonical = pd.DataFrame(
+        {str(column): _canonical_column(df[column]) for column in df.columns},
+        index=df.index,
+    )[columns]
+    canonical = canonical.sort_values(columns, kind="stable").reset_index(drop=True) if columns else canonical
+
+    digest = hashlib.sha256(json.dumps(columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(canonical, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def frame_row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash every row of a dataframe from its canonical values, whatever the order and dtypes of the columns."""
+    columns = sorted(str(column) for column in df.columns)
+    canonical = pd.DataFrame(
+        {str(column): _canonical_column(df[column]) for column in df.columns},
+        index=df.index,
+    )[columns]
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def fingerprint_path(path: Union[str, Path]) -> Path:
+    """Get the sidecar manifest of an output file."""
+    return Path(str(path) + FINGERPRINT_SUFFIX)
+
+
+def read_fingerprint(path: Union[str, Path]) -> Optional[str]:
+    """Read the fingerprint stored for an output file, None when there is none."""
+    manifest_path = fingerprint_path(path)
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text())["fingerprint"]
+
+
+def write_fingerprint(path: Path, fingerprint: str, nb_rows: int, columns: List[str]) -> None:
+    """Write the sidecar manifest of an output file atomically."""
+    manifest = {
+        "fingerprint": fingerprint,
+        "rows": nb_rows,
+        "columns": [str(column) for column in columns],
+    }
+    manifest_path = fingerprint_path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=manifest_path.parent, prefix="." + manifest_path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(manifest, tmp_file, indent=2)
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """Fingerprint of a dataset file from its manifest, or from its size and mtime when it has none."""
+    fingerprint = read_fingerprint(path)
+    if fingerprint is None:
+        stat = os.stat(path)
+        fingerprint = str(stat.st_size) + ":" + str(stat.st_mtime_ns)
+    return fingerprint
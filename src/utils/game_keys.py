@@ -0,0 +1,147 @@
+"""Provides the integer keys of the NBA games.
+
+A game is identified by its date and its home and away teams. Its key packs
+the days since 1970-01-01 and a 15 bits code of each team abbreviation into
+one int64, ``days << 30 | home << 15 | away``, so the two rows of a game
+share a key that is 8 bytes to store, hash and join instead of a string
+such as "2023-10-27_CHO_ATL". The team codes are computed from the three
+letters of the abbreviations, not from their position in the reference
+data, so adding a team to constants/team_city_refdata.csv keeps the keys.
+
+The readable id, "<date>_<away>_<home>", is only built from the keys when a
+dataset is exported.
+"""
+
+import numpy as np
+import pandas as pd
+
+TEAM_BITS = 15
+
+TEAM_MASK = (1 << TEAM_BITS) - 1
+
+# Abbreviations of up to three letters, A is 1 so that "A" and "AA" differ
+LETTER_BASE = 27
+
+
+def _team_code(abbreviation: str) -> int:
+    if not (1 <= len(abbreviation) <= 3 and abbreviation.isascii() and abbreviation.isalpha()):
+        raise ValueError("team abbreviation " + repr(abbreviation) + " cannot be encoded in a game key")
+    code = 0
+    for letter in abbreviation.upper():
+        code = code * LETTER_BASE + ord(letter) - ord("A") + 1
+    return code
+
+
+def _team_abbreviation(code: int) -> str:
+    letters = []
+    while code > 0:
+        code, letter = divmod(code, LETTER_BASE)
+        letters.append(chr(ord("A") + letter - 1))
+    return "".join(reversed(letters))
+
+
+def _team_codes(teams: pd.Series) -> np.ndarray:
+    """Code of every team, computed once per category. Missing teams get -1."""
+    teams = teams.astype("category")
+    category_codes = np.array([_team_code(str(team)) for team in teams.cat.categories] + [-1], dtype=np.int64)
+    # The -1 code of the missing teams takes the last value
+    return category_codes[teams.cat.codes.to_numpy()]
+
+
+def _to_datetime(game_date: pd.Series) -> pd.Series:
+    """Parse the dates, the typed datetimes are kept as they are."""
+    if pd.api.types.is_datetime64_any_dtype(game_date):
+        return game_date
+    return pd.to_datetime(game_date)
+
+
+def game_keys(game_date: pd.Series, home: pd.Series, away: pd.Series) -> pd.Series:
+    """
+    Compute the integer key of every game.
+
+    Args:
+        game_date (pd.Series): Dates of the games, datetimes or ISO strings.
+        home (pd.Series): Abbreviations of the home teams.
+        away (pd.Series): Abbreviations of the away teams.
+    Returns:
+        pd.Series: Int64 keys, missing when the date or a team is missing.
+    """
+    dates = _to_datetime(game_date)
+    days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    home_codes = _team_codes(home)
+    away_codes = _team_codes(away)
+
+    keys = (days << (2 * TEAM_BITS)) | (home_codes << TEAM_BITS) | away_codes
+    missing = dates.isna().to_numpy() | (home_codes < 0) | (away_codes < 0)
+    return pd.Series(pd.arrays.IntegerArray(keys, missing), index=game_date.index, name="game_key")
+
+
+def team_game_keys(id_season: pd.Series, tm: pd.Series, game_date: pd.Series) -> np.ndarray:
+    """
+    Compute the key of every game of a team, ordered as (id_season, tm, game_date).
+
+    The key packs ``id_season << 47 | tm << 32 | days``, the days shifted by 2**31
+    to keep the dates before 1970 in order, so sorting the keys sorts the rows
+    by season, team and date.
+
+    Args:
+        id_season (pd.Series): Seasons of the games.
+        tm (pd.Series): Abbreviations of the teams.
+        game_date (pd.Series): Dates of the games, datetimes or ISO strings.
+    Returns:
+        np.ndarray: int64 keys, -1 when the season, the team or the date is missing.
+    """
+    seasons = pd.to_numeric(id_season).astype("Int64").to_numpy(dtype=np.int64, na_value=-1)
+    team_codes = _team_codes(tm)
+    dates = _to_datetime(game_date)
+    days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64) + (1 << 31)
+
+    keys = (seasons << 47) | (team_codes << 32) | days
+    keys[(seasons < 0) | (team_codes < 0) | dates.isna().to_numpy()] = -1
+    return keys
+
+
+def gamelog_game_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Compute the game key of the rows of a gamelog, from the point of view of the team ``tm``.
+
+    Args:
+        df (pd.DataFrame): Rows with game_date, tm, opp and extdom, 'dom' when tm plays at home.
+    Returns:
+        pd.Series: Int64 keys, the same for the two rows of a game.
+    """
+    at_home = (df["extdom"] == "dom").to_numpy()
+    tm = df["tm"].astype(object)
+    opp = df["opp"].astype(object)
+    return game_keys(df["game_date"], tm.where(at_home, opp), opp.where(at_home, tm))
+
+
+def game_ids(keys: pd.Series) -> pd.Series:
+    """
+    Build the readable ids "<date>_<away>_<home>" of game keys.
+
+    The ids are built once per distinct game, the two rows of a game share it.
+
+    Args:
+        keys (pd.Series): Game keys.
+    Returns:
+        pd.Series: Ids as strings, missing for the missing keys.
+    """
+    codes, unique_keys = pd.factorize(keys, use_na_sentinel=True)
+    unique_keys = np.asarray(unique_keys, dtype=np.int64)
+
+    dates = pd.Series(
+        (unique_keys >> (2 * TEAM_BITS)).astype("datetime64[D]")
+    ).dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    homes = [_team_abbreviation(code) for code in (unique_keys >> TEAM_BITS) & TEAM_MASK]
+    aways = [_team_abbreviation(code) for code in unique_keys & TEAM_MASK]
+    unique_ids = np.array(
+        [date + "_" + away + "_" + home for date, home, away in zip(dates, homes, aways)] + [None], dtype=object
+    )
+    # The missing keys have the -1 code, which takes the last value
+    return pd.Series(unique_ids[codes], index=keys.index, name="id")
+
+
+def with_game_id(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the readable id of the game_key column, e.g. for a csv deliverable."""
+    return df.assign(id=game_ids(df["game_key"]))
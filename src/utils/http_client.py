@@ -0,0 +1,364 @@
+"""Provides the pooled HTTP client shared by the extract modules."""
+
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from src.utils.logs import get_logger
+from src.utils.rate_limiter import AdaptiveRateLimiter, find_host_rate_limiter, parse_retry_after
+from src.utils.snapshot_archive import SnapshotArchive
+
+logger = get_logger(
+    "HTTP_CLIENT", log_level='INFO'
+)
+
+# ACCEPT_ENCODING advertises brotli only when a brotli decoder is installed
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+# (connect timeout, read timeout) in seconds
+DEFAULT_TIMEOUT = (5.0, 60.0)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class HookedRetry(Retry):
+    """urllib3 Retry calling ``on_retry`` every time a request is retried."""
+
+    def __init__(self, *args, on_retry: Optional[Callable] = None, **kwargs) -> None:
+        self.on_retry = on_retry
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kw) -> "HookedRetry":
+        kw.setdefault("on_retry", self.on_retry)
+        return super().new(**kw)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new_retry = super().increment(
+            method=method,
+            url=url,
+            response=response,
+            error=error,
+            _pool=_pool,
+            _stacktrace=_stacktrace,
+        )
+
+        if self.on_retry is not None:
+            self.on_retry(
+                method=method,
+                url=url,
+                response=response,
+                error=error,
+                retry=new_retry,
+            )
+
+        return new_retry
+
+
+def log_retry(method=None, url=None, response=None, error=None, retry=None) -> None:
+    """Default retry hook, log the reason of the retry."""
+    reason = response.status if response is not None else repr(error)
+    logger.warning("Retrying %s %s (%s), %s retries left", method, url, reason, retry.total)
+
+
+class HttpClient:
+    """
+    HTTP client reusing keep-alive connections across requests.
+
+    Every request goes through a requests.Session whose connection pools
+    are kept alive between pages, with gzip/brotli negotiation, a default
+    timeout and retries with exponential backoff on connection errors and
+    on the status codes of RETRY_STATUS_CODES.
+
+    The requests of a host with a registered rate limiter are retried by
+    the client instead of urllib3: every attempt, retries included, waits
+    for a token of the limiter and raises CircuitOpenError when the circuit
+    of the host is open, and every response is recorded by the limiter to
+    adapt its rate.
+
+    With a SnapshotArchive, every page fetched is archived, or in replay mode
+    every page is read from the archive without any network access.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        status_forcelist: Tuple[int, ...] = RETRY_STATUS_CODES,
+        pool_maxsize: int = 10,
+        on_retry: Optional[Callable] = log_retry,
+    ) -> None:
+        """
+        Args:
+            headers (dict): Headers sent with every request, on top of DEFAULT_HEADERS.
+            timeout (float or tuple): Default (connect, read) timeout of the requests.
+            max_retries (int): Number of retries before giving up on a request.
+            backoff_factor (float): Backoff factor between two retries, see urllib3 Retry.
+            status_forcelist (tuple): Status codes triggering a retry.
+            pool_maxsize (int): Number of connections kept alive per host.
+            on_retry (Callable): Hook called with method, url, response, error and retry on every retry.
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = status_forcelist
+        self.on_retry = on_retry
+        self.archive: Optional[SnapshotArchive] = None
+        self.replay = False
+        self.host_overrides: Dict[str, str] = {}
+        self._archive_lock = threading.Lock()
+        self._archive_users = 0
+        self._archive_key: Optional[Tuple[Path, bool]] = None
+
+        self.retry = HookedRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            on_retry=on_retry,
+        )
+        self.session = self._new_session(self.retry, headers, pool_maxsize)
+        # Single attempt per request, the retries of the throttled hosts go through their rate limiter in get
+        self.throttled_session = self._new_session(Retry(0, read=False), headers, pool_maxsize)
+
+    @staticmethod
+    def _new_session(retry: Retry, headers: Optional[Dict[str, str]], pool_maxsize: int) -> requests.Session:
+        adapter = HTTPAdapter(
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        session.headers.update(headers or {})
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the pooled session.
+
+        Args:
+            url (str): Url to request.
+            **kwargs: Extra arguments of requests.Session.get, timeout defaults to the client one.
+        Returns:
+            requests.Response
+        Raises:
+            CircuitOpenError: When the circuit of the rate limiter of the host is open.
+        """
+        if self.replay:
+            return self._replay(url)
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        rate_limiter = find_host_rate_limiter(url)
+        if rate_limiter is None:
+            response = self.session.get(self._resolve(url), **kwargs)
+        else:
+            response = self._throttled_get(url, rate_limiter, **kwargs)
+
+        if self.archive is not None and response.status_code == 200:
+            self.archive.store(url, response.content)
+
+        return response
+
+    def _throttled_get(self, url: str, rate_limiter: AdaptiveRateLimiter, **kwargs) -> requests.Response:
+        """
+        Send a GET request, every attempt waiting for a token of the rate limiter of the host.
+
+        Raises:
+            CircuitOpenError: When the circuit of the host is open, before any attempt is sent.
+        """
+        attempt = 0
+        while True:
+            rate_limiter.acquire()
+            retries_left = self.max_retries - attempt - 1
+            try:
+                response = self.throttled_session.get(self._resolve(url), **kwargs)
+            except requests.RequestException as error:
+                # Timeouts included, so that a probe of a half open circuit that times out opens it again
+                rate_limiter.record(None)
+                if retries_left < 0:
+                    raise
+                self._call_on_retry(url, response=None, error=error, retries_left=retries_left)
+            else:
+                # A Retry-After delay holds the next acquire of every request of the host
+                rate_limiter.record(
+                    response.status_code,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+                if response.status_code not in self.status_forcelist or retries_left < 0:
+                    return response
+                self._call_on_retry(url, response=response.raw, error=None, retries_left=retries_left)
+                response.close()
+
+            if attempt > 0:
+                time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+            attempt += 1
+
+    def _call_on_retry(self, url: str, response, error, retries_left: int) -> None:
+        if self.on_retry is not None:
+            self.on_retry(
+                method="GET",
+                url=url,
+                response=response,
+                error=error,
+                retry=self.retry.new(total=retries_left),
+            )
+
+    def override_host(self, origin: str, target: Optional[str]) -> None:
+        """
+        Send the requests of ``origin`` to ``target``, e.g. a local stand-in server.
+
+        Urls keep their origin for the rate limiters, the cache and the archive.
+
+        Args:
+            origin (str): Scheme and host to override, such as "https://www.basketball-reference.com".
+            target (str): Scheme and host to send the requests to, None to remove the override.
+        """
+        if target is None:
+            self.host_overrides.pop(origin, None)
+        else:
+            self.host_overrides[origin] = target
+
+    def _resolve(self, url: str) -> str:
+        for origin, target in self.host_overrides.items():
+            if url.startswith(origin):
+                return target + url[len(origin):]
+        return url
+
+    def use_archive(self, archive: Optional[SnapshotArchive], replay: bool = False) -> None:
+        """
+        Archive the pages fetched, or replay them from the archive.
+
+        Args:
+            archive (SnapshotArchive): Archive of the pages, None to stop archiving.
+            replay (bool): Read the pages from the archive instead of the network.
+        """
+        if replay and archive is None:
+            raise ValueError("replay mode needs an archive to read the pages from")
+        self.archive = archive
+        self.replay = replay
+
+    def open_archive(self, archive_dir: Union[str, Path], replay: bool = False) -> None:
+        """
+        Archive or replay the pages until the matching close_archive.
+
+        The callers asking for the same archive at the same time, e.g. the seasons
+        or the stages run concurrently, share it, and the client is restored when
+        the last one closes it.
+
+        Args:
+            archive_dir (Path): Folder of the SnapshotArchive.
+            replay (bool): Read the pages from the archive instead of the network.
+        Raises:
+            ValueError: When another archive, or the same one in another mode, is in use.
+        """
+        key = (Path(archive_dir).resolve(), replay)
+        with self._archive_lock:
+            if self._archive_users == 0:
+                self.use_archive(SnapshotArchive(archive_dir), replay=replay)
+                self._archive_key = key
+            elif self._archive_key != key:
+                raise ValueError(
+                    "the HttpClient already uses the archive " + str(self._archive_key[0])
+                    + (" in replay mode" if self._archive_key[1] else "")
+                )
+            self._archive_users += 1
+
+    def close_archive(self) -> None:
+        """Release an archive opened by open_archive, the last release stops archiving."""
+        with self._archive_lock:
+            self._archive_users -= 1
+            if self._archive_users == 0:
+                self.use_archive(None)
+                self._archive_key = None
+
+    def _replay(self, url: str) -> requests.Response:
+        content = self.archive.load(url)
+
+        response = requests.Response()
+        response.url = url
+        response.headers = CaseInsensitiveDict()
+        response.encoding = None
+
+        if content is None:
+            logger.warning("%s not found in the archive", url)
+            response.status_code = 404
+            response.reason = "Not Archived"
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = content
+
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+        self.throttled_session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_SHARED_HTTP_CLIENT: Optional[HttpClient] = None
+_SHARED_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the HttpClient shared by every extract module of the process."""
+    global _SHARED_HTTP_CLIENT
+
+    with _SHARED_HTTP_CLIENT_LOCK:
+        if _SHARED_HTTP_CLIENT is None:
+            _SHARED_HTTP_CLIENT = HttpClient()
+        return _SHARED_HTTP_CLIENT
+
+
+@contextmanager
+def snapshot_archive_scope(archive_dir=None, replay: bool = False) -> Iterator[None]:
+    """
+    Archive the pages fetched by the shared HttpClient inside the block, or replay them.
+
+    The client is restored when the block exits, so the archive or the replay
+    mode never carries over to the stages run later in the same process.
+
+    Args:
+        archive_dir (Path): Folder of the SnapshotArchive, None to keep the archive of an enclosing block, if any.
+        replay (bool): Read the pages from the archive instead of the network.
+    Raises:
+        ValueError: When replay is asked without an archive_dir, or another archive is in use.
+    """
+    if archive_dir is None:
+        if replay:
+            raise ValueError("replay mode needs an archive_dir to read the pages from")
+        yield
+        return
+
+    client = get_http_client()
+    client.open_archive(archive_dir, replay=replay)
+    try:
+        yield
+    finally:
+        client.close_archive()
@@ -0,0 +1,99 @@
+"""Provides the incremental update of the in-season gamelog and schedule outputs."""
+
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from src.utils.logs import get_logger
+from src.utils.schemas import apply_schema
+from src.utils.storage import read_frame, write_frame
+
+logger = get_logger(
+    "INCREMENTAL_ACQUISITION", log_level='INFO'
+)
+
+
+def merge_new_games(
+        existing_df: pd.DataFrame,
+        fetched_df: pd.DataFrame,
+        completed_column: Optional[str] = None
+        ) -> pd.DataFrame:
+    """
+    Keep the existing rows up to the last completed game of each team and append the newer fetched games.
+
+    Args:
+        existing_df (pd.DataFrame): Current output, with the dtypes of its schema.
+        fetched_df (pd.DataFrame): Season freshly scrapped, with the dtypes of its schema.
+        completed_column (str): Column missing for the games not played yet, such as
+            the schedule w_l. None when every row is a played game (gamelog).
+    Returns:
+        pd.DataFrame: Existing rows followed by the new games.
+    """
+    existing_dates = pd.to_datetime(existing_df["game_date"])
+    fetched_dates = pd.to_datetime(fetched_df["game_date"])
+
+    completed = existing_df[completed_column].notna() if completed_column else pd.Series(True, index=existing_df.index)
+
+    # Teams as plain values, a categorical tm would group every team of its categories
+    existing_teams = existing_df["tm"].astype(object)
+    fetched_teams = fetched_df["tm"].astype(object)
+
+    # Max game_date per tm of the completed games already saved
+    last_game_date = existing_dates[completed].groupby(existing_teams[completed]).max()
+
+    existing_cutoff = existing_teams.map(last_game_date)
+    fetched_cutoff = fetched_teams.map(last_game_date)
+
+    kept_df = existing_df[existing_dates <= existing_cutoff]
+    new_df = fetched_df[fetched_cutoff.isna() | (fetched_dates > fetched_cutoff)]
+
+    return pd.concat([kept_df, new_df], ignore_index=True)
+
+
+def incremental_write(
+        fetched_df: pd.DataFrame,
+        path: Union[str, Path],
+        schema: str,
+        completed_column: Optional[str] = None
+        ) -> None:
+    """
+    Update ``path`` with the games of ``fetched_df`` newer than the ones already saved.
+
+    The fetched and existing rows are cast to the schema of the dataset, so
+    the games not played yet are missing values and the file has the same
+    dtypes after every update. The file is only rewritten when there are new
+    games, and fully refreshed when the columns changed.
+
+    Args:
+        fetched_df (pd.DataFrame): Season freshly scrapped.
+        path (Path): Output file of the season, '.parquet' or '.csv'.
+        schema (str): Dataset of src/utils/schemas.py, e.g. 'schedule'.
+        completed_column (str): Column missing for the games not played yet, None for gamelogs.
+    Raises:
+        SchemaError: When the fetched or existing rows do not match the schema, nothing is written.
+    """
+    fetched_df = apply_schema(fetched_df.reset_index(drop=True), schema, columns=list(fetched_df.columns))
+
+    if not Path(path).exists():
+        logger.info("No previous output, full refresh of %s", path)
+        write_frame(fetched_df, path)
+        return
+
+    existing_df = read_frame(path)
+
+    if list(existing_df.columns) != list(fetched_df.columns):
+        logger.warning("Schema change detected, full refresh of %s", path)
+        write_frame(fetched_df, path)
+        return
+
+    existing_df = apply_schema(existing_df, schema, columns=list(existing_df.columns))
+    updated_df = merge_new_games(existing_df, fetched_df, completed_column=completed_column)
+    # The categoricals of both sides are concatenated as objects
+    updated_df = apply_schema(updated_df, schema, columns=list(updated_df.columns))
+
+    if not write_frame(updated_df, path):
+        logger.info("No new games, %s left untouched", path)
+        return
+
+    logger.info("%s updated, %s rows instead of %s", path, len(updated_df), len(existing_df))
@@ -0,0 +1,300 @@
+"""Provides the Hive-partitioned datasets and the pruning of their seasons and teams.
+
+The cleaned datasets are Hive-partitioned (``id_season=2024/tm=BOS/part-0.parquet``)
+so the readers only open the partitions of the seasons and teams they need.
+The datasets stored as one file per season are pruned by the season in
+their file names instead.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.fingerprints import file_fingerprint, fingerprint_path
+from src.utils.logs import get_logger
+from src.utils.schemas import apply_schema
+from src.utils.storage import (
+    DEFAULT_FILE_FORMAT,
+    FILE_EXTENSIONS,
+    file_extension,
+    find_dataset_files,
+    parse_text_columns,
+    read_csv_frame,
+    read_frames,
+    table_to_frame,
+    write_frame,
+)
+
+logger = get_logger(
+    "PARTITIONS", log_level='INFO'
+)
+
+PARTITION_COLUMNS = ["id_season", "tm"]
+
+PARTITION_FILE_NAME = "part-0"
+
+
+def _partition_value(value) -> str:
+    # Seasons read as float from a column with missing values keep their integer name
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def write_partitions(
+        df: pd.DataFrame,
+        folder: Union[str, Path],
+        partition_cols: List[str] = PARTITION_COLUMNS,
+        file_format: str = DEFAULT_FILE_FORMAT,
+        schema: Optional[str] = None
+        ) -> int:
+    """
+    Write a dataframe as a Hive-partitioned dataset, ``<folder>/id_season=2024/tm=BOS/part-0.parquet``.
+
+    Every partition is written with write_frame, so the unchanged partitions
+    keep their bytes. The partition columns are stored in the directory names
+    only. The partitions of the first level values of ``df`` (e.g. its
+    seasons) that are not in ``df`` anymore are removed, the other first
+    level values are left untouched.
+
+    Args:
+        df (pd.DataFrame): Dataframe to write.
+        folder (Path): Root folder of the dataset.
+        partition_cols (list): Columns to partition by, from the outermost directory.
+        file_format (str): 'parquet' or 'csv', format of the partition files.
+        schema (str): Dataset of src/utils/schemas.py the dataframe is cast to before being written.
+    Returns:
+        int: Number of partitions written, the unchanged ones excluded.
+    Raises:
+        SchemaError: When the dataframe does not match the schema, nothing is written.
+    """
+    folder = Path(folder)
+    if schema is not None:
+        df = apply_schema(df, schema)
+    extension = file_extension(file_format)
+    nb_written = 0
+
+    nb_missing = df[partition_cols].isna().any(axis=1).sum()
+    if nb_missing > 0:
+        logger.warning("%s rows without %s are not written", nb_missing, " or ".join(partition_cols))
+    partition_dirs = set()
+
+    # observed: the categorical teams would give a partition per team of the reference data
+    for values, partition_df in df.groupby(partition_cols, sort=True, observed=True):
+        values = values if isinstance(values, tuple) else (values,)
+        partition_dir = folder.joinpath(
+            *(column + "=" + _partition_value(value) for column, value in zip(partition_cols, values))
+        )
+        partition_dirs.add(partition_dir)
+
+        # A partition previously written in the other format would be read twice
+        for other_extension in FILE_EXTENSIONS.values():
+            if other_extension != extension:
+                other_path = partition_dir / (PARTITION_FILE_NAME + other_extension)
+                other_path.unlink(missing_ok=True)
+                fingerprint_path(other_path).unlink(missing_ok=True)
+
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        nb_written += write_frame(
+            partition_df.drop(columns=partition_cols),
+            partition_dir / (PARTITION_FILE_NAME + extension),
+        )
+
+    if len(partition_cols) > 1:
+        for top_dir in {folder / partition_dir.relative_to(folder).parts[0] for partition_dir in partition_dirs}:
+            for stale_dir in sorted(top_dir.glob("/".join(["*"] * (len(partition_cols) - 1)))):
+                if stale_dir.is_dir() and stale_dir not in partition_dirs:
+                    logger.info("Removing the stale partition %s", stale_dir)
+                    shutil.rmtree(stale_dir)
+
+    logger.info("%s: %s partitions, %s written", folder, len(partition_dirs), nb_written)
+    return nb_written
+
+
+def _find_partitions(folder: Path, filters: Dict[str, set]) -> List[tuple]:
+    """List the (partition file, {column: value}) of a dataset, pruning the directories excluded by the filters."""
+    partitions = []
+    for entry in sorted(folder.iterdir()):
+        if entry.is_dir() and "=" in entry.name:
+            column, value = entry.name.split("=", 1)
+            if column in filters and value not in filters[column]:
+                continue
+            partitions += [
+                (file_path, {column: value, **values})
+                for file_path, values in _find_partitions(entry, filters)
+            ]
+    # The partition directories hold one file, Parquet preferred
+    for file_format in ["parquet", "csv"]:
+        file_path = folder / (PARTITION_FILE_NAME + file_extension(file_format))
+        if file_path.exists():
+            partitions.append((file_path, {}))
+            break
+    return partitions
+
+
+def is_partitioned(folder: Union[str, Path]) -> bool:
+    """Tell whether a folder holds a Hive-partitioned dataset."""
+    folder = Path(folder)
+    return folder.is_dir() and any(entry.is_dir() and "=" in entry.name for entry in folder.iterdir())
+
+
+def read_partitions(
+        folder: Union[str, Path],
+        filters: Optional[Dict[str, Iterable]] = None,
+        columns: Optional[List[str]] = None,
+        schema: Optional[str] = None
+        ) -> pd.DataFrame:
+    """
+    Read a Hive-partitioned dataset, only opening the partitions kept by the filters.
+
+    Args:
+        folder (Path): Root folder of the dataset.
+        filters (dict): Values to keep per partition column, e.g.
+            {"id_season": [2024, 2025], "tm": ["BOS"]}. None or a missing column keeps every value.
+        columns (list): Columns to read, partition columns included, None for every column.
+        schema (str): Dataset of src/utils/schemas.py to type the columns with, None to infer the dtypes.
+    Returns:
+        pd.DataFrame: Rows of the partitions, with the partition columns typed as pd.read_csv would.
+    Raises:
+        SchemaError: When a partition does not match the schema.
+    """
+    filters = {
+        column: {_partition_value(value) for value in values}
+        for column, values in (filters or {}).items()
+        if values is not None
+    }
+    partitions = _find_partitions(Path(folder), filters)
+    if len(partitions) == 0:
+        raise FileNotFoundError("No partition of " + str(folder) + " matches " + str(filters))
+
+    partition_cols = list(partitions[0][1])
+    file_columns = None if columns is None else [column for column in columns if column not in partition_cols]
+
+    def _read_partition(partition: tuple) -> Union[pa.Table, pd.DataFrame]:
+        file_path, values = partition
+        if file_path.suffix != FILE_EXTENSIONS["parquet"]:
+            return read_csv_frame(file_path, columns=file_columns, schema=schema).assign(**values)
+        table = pq.read_table(file_path, columns=file_columns)
+        for column, value in values.items():
+            table = table.append_column(column, pa.array([value] * table.num_rows, pa.string()))
+        return table
+
+    tables = []
+    frames = []
+    for partition in map(_read_partition, partitions):
+        if isinstance(partition, pa.Table):
+            tables.append(partition)
+        else:
+            frames.append(partition)
+
+    if tables:
+        # One conversion to pandas for every partition instead of one per file
+        frames.append(
+            table_to_frame(pa.concat_tables(tables, promote_options="default"), schema=schema)
+        )
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    # The partition values are text in the directory names
+    df[partition_cols] = parse_text_columns(df[partition_cols].copy())
+    if columns is not None:
+        df = df[columns]
+    if schema is not None:
+        df = apply_schema(df, schema, columns=columns)
+    return df
+
+
+def read_dataset(
+        path: Union[str, Path],
+        name_pattern: str,
+        seasons: Optional[Iterable[int]] = None,
+        teams: Optional[Iterable[str]] = None,
+        columns: Optional[List[str]] = None,
+        schema: Optional[str] = None
+        ) -> pd.DataFrame:
+    """
+    Read the seasons and teams of a dataset, partitioned or stored as one file per season.
+
+    A Hive-partitioned dataset only opens the partitions of the seasons and
+    teams, the season files of ``<name_pattern>_<season>`` are pruned by name
+    and filtered on their ``tm`` column.
+
+    Args:
+        path (Path): Root folder of a partitioned dataset, or folder of the season files.
+        name_pattern (str): Prefix of the season files, e.g. 'gamelog'.
+        seasons (list): Seasons to read, None for every season.
+        teams (list): Teams to read, None for every team.
+        columns (list): Columns to read, None for every column.
+        schema (str): Dataset of src/utils/schemas.py to type the columns with, None to infer the dtypes.
+    Returns:
+        pd.DataFrame
+    Raises:
+        SchemaError: When a file does not match the schema.
+    """
+    if is_partitioned(path):
+        return read_partitions(path, filters={"id_season": seasons, "tm": teams}, columns=columns, schema=schema)
+
+    df = read_frames(path, name_pattern, columns=columns, seasons=seasons, schema=schema)
+    if teams is not None and "tm" in df.columns:
+        df = df[df["tm"].isin(list(teams))].reset_index(drop=True)
+    return df
+
+
+def _season_files(
+        path: Union[str, Path],
+        name_pattern: str,
+        seasons: Optional[Iterable[int]] = None
+        ) -> Dict[int, List[tuple]]:
+    """List the (name, file path) of every season of a dataset, partitioned or stored as one file per season."""
+    season_files: Dict[int, List[tuple]] = {}
+
+    if is_partitioned(path):
+        filters = {} if seasons is None else {"id_season": {str(season) for season in seasons}}
+        for file_path, values in _find_partitions(Path(path), filters):
+            if "id_season" in values:
+                season_files.setdefault(int(values["id_season"]), []).append(
+                    (str(Path(file_path).relative_to(path)), file_path)
+                )
+    else:
+        season_pattern = re.compile(re.escape(name_pattern) + r"_(\d+)[_.]")
+        for file_path in find_dataset_files(path, name_pattern, seasons=seasons):
+            match = season_pattern.match(os.path.basename(file_path))
+            if match is not None:
+                season_files.setdefault(int(match.group(1)), []).append((os.path.basename(file_path), file_path))
+
+    return season_files
+
+
+def dataset_seasons(path: Union[str, Path], name_pattern: str) -> List[int]:
+    """List the seasons of a dataset from its file or partition names, without reading them."""
+    return sorted(_season_files(path, name_pattern))
+
+
+def season_fingerprints(
+        path: Union[str, Path],
+        name_pattern: str,
+        seasons: Optional[Iterable[int]] = None
+        ) -> Dict[int, str]:
+    """
+    Fingerprint every season of a dataset from the manifests of its files, without reading them.
+
+    Args:
+        path (Path): Root folder of a partitioned dataset, or folder of the season files.
+        name_pattern (str): Prefix of the season files, e.g. 'gamelog'.
+        seasons (list): Seasons to fingerprint, None for every season.
+    Returns:
+        dict: sha256 hex digest of the files of each season, by season.
+    """
+    return {
+        season: hashlib.sha256(
+            json.dumps(sorted((name, file_fingerprint(file_path)) for name, file_path in files)).encode("utf-8")
+        ).hexdigest()
+        for season, files in sorted(_season_files(path, name_pattern, seasons=seasons).items())
+    }
@@ -0,0 +1,95 @@
+"""Provides the publication of the final datasets.
+
+A final dataset is the unified file published under its final name. A file
+of the same format is hardlinked, a change of format is the only case where
+the dataset is read and rewritten. The unified files carry every column of
+the final datasets, the readable game id included, so the pipeline with the
+default params.yaml, where the final format is the unified one, only links.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from src.utils.fingerprints import fingerprint_path
+from src.utils.logs import get_logger
+from src.utils.storage import count_rows, read_frame, write_frame
+
+logger = get_logger(
+    "PUBLISH", log_level='INFO'
+)
+
+
+def _link_or_copy(source: Path, destination: Path) -> str:
+    """Hardlink ``source`` to a temporary name renamed over ``destination``, or copy it across devices."""
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix="." + destination.name + ".", suffix=".tmp")
+    os.close(fd)
+    os.remove(tmp_path)
+    try:
+        try:
+            os.link(source, tmp_path)
+            method = "hardlink"
+        except OSError:
+            # Another file system, or no hardlink support. copyfile copies in the kernel where available
+            shutil.copyfile(source, tmp_path)
+            method = "copy"
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return method
+
+
+def publish(
+        source: Union[str, Path],
+        destination: Union[str, Path],
+        schema: Optional[str] = None
+        ) -> int:
+    """
+    Publish a dataset file to ``destination`` atomically, without parsing it when its format does not change.
+
+    A file of the same format is hardlinked (copied across file systems) to a
+    temporary name renamed over ``destination``, which takes the same time
+    whatever its size. As every output is written through a temporary file
+    renamed over the previous one, the source is never modified in place
+    and the published link keeps its content. Only a change of format
+    reads and rewrites the dataset. The rows of the published
+    file are checked against the source from the file metadata.
+
+    Args:
+        source (Path): Dataset file to publish.
+        destination (Path): Published file, its extension gives its format.
+        schema (str): Dataset of src/utils/schemas.py, used when the format changes.
+    Returns:
+        int: Number of rows published.
+    Raises:
+        RuntimeError: When the published file does not have the rows of the source.
+    """
+    source, destination = Path(source), Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    if destination.exists() and os.path.samefile(source, destination):
+        method = "unchanged"
+    elif source.suffix == destination.suffix:
+        method = _link_or_copy(source, destination)
+        # The fingerprint manifest goes with the file, so the unchanged file is detected downstream
+        if fingerprint_path(source).exists():
+            _link_or_copy(fingerprint_path(source), fingerprint_path(destination))
+        else:
+            fingerprint_path(destination).unlink(missing_ok=True)
+    else:
+        write_frame(read_frame(source, schema=schema), destination, schema=schema)
+        method = "rewrite"
+
+    nb_rows = count_rows(destination)
+    nb_source_rows = count_rows(source)
+    if nb_rows != nb_source_rows:
+        raise RuntimeError(
+            str(destination) + " has " + str(nb_rows) + " rows, " + str(source) + " has " + str(nb_source_rows)
+        )
+
+    logger.info("%s published to %s (%s), %s rows", source, destination, method, nb_rows)
+    return nb_rows
@@ -0,0 +1,388 @@
+"""Provides rate limiters to throttle the requests sent to the scrapped websites."""
+
+import datetime
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from src.utils.logs import get_logger
+
+logger = get_logger(
+    "RATE_LIMITER", log_level='INFO'
+)
+
+# Circuit breaker states of the AdaptiveRateLimiter
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# Tolerance on the token count, so that float rounding of the refill never blocks a request
+_TOKEN_EPSILON = 1e-9
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket.
+
+    Tokens are refilled continuously at ``rate`` tokens per second, up to
+    ``capacity`` tokens. Each request consumes one token, so the long run
+    throughput never exceeds ``rate`` requests per second whatever the number
+    of workers sharing the bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        capacity: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            rate (float): Number of tokens added to the bucket per second.
+            capacity (int): Maximum number of tokens, i.e. the allowed burst.
+            clock (Callable): Monotonic clock, overridable for tests.
+            sleep (Callable): Sleep function, overridable for tests.
+        """
+        if rate <= 0:
+            raise ValueError("rate should be a strictly positive number of requests per second")
+        if capacity < 1:
+            raise ValueError("capacity should be at least 1")
+
+        self.rate = float(rate)
+        self.capacity = int(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, capacity: int) -> None:
+        """Update the budget of the bucket, keeping the tokens already earned."""
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+            self.capacity = int(capacity)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._last_refill)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until ``tokens`` tokens are available and consume them.
+
+        Returns:
+            float: Number of seconds spent waiting for the tokens.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens - _TOKEN_EPSILON:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header, given in seconds or as an HTTP date.
+
+    Returns:
+        float: Number of seconds to wait, None when the header is missing or invalid.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=datetime.timezone.utc)
+
+    now = time.time() if now is None else now
+    return max(0.0, retry_date.timestamp() - now)
+
+
+class AdaptiveRateLimiter(TokenBucketRateLimiter):
+    """Token bucket adapting its rate to the health of the host.
+
+    The rate starts from the configured one and grows by ``growth`` of it
+    after every ``healthy_window`` consecutive healthy responses, up to
+    ``max_rate_factor`` times the configured rate. A 429, or any response
+    with a Retry-After header, halves the rate, down to ``min_rate_factor``
+    times the configured rate, and holds every request until the Retry-After
+    delay is over.
+
+    After ``failure_threshold`` consecutive failures (429, 5xx or connection
+    errors) the circuit opens: requests raise CircuitOpenError during
+    ``reset_timeout`` seconds, then the circuit is half open. A single probe
+    request is let through while the other requests keep raising
+    CircuitOpenError, and the response of the probe closes the circuit, or
+    opens it again when it is a failure. A probe whose response is never
+    recorded is replaced by another one after ``reset_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        capacity: int = 1,
+        max_rate_factor: float = 2.0,
+        min_rate_factor: float = 1 / 16,
+        growth: float = 0.1,
+        healthy_window: int = 10,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            rate (float): Configured number of requests per second, the starting rate.
+            capacity (int): Maximum number of tokens, i.e. the allowed burst.
+            max_rate_factor (float): Maximum rate, as a multiple of the configured rate.
+            min_rate_factor (float): Minimum rate, as a multiple of the configured rate.
+            growth (float): Rate increase after healthy_window healthy responses, as a fraction of the configured rate.
+            healthy_window (int): Number of consecutive healthy responses before growing the rate.
+            failure_threshold (int): Number of consecutive failures opening the circuit.
+            reset_timeout (float): Seconds during which the circuit stays open.
+            clock (Callable): Monotonic clock, overridable for tests.
+            sleep (Callable): Sleep function, overridable for tests.
+        """
+        super().__init__(rate=rate, capacity=capacity, clock=clock, sleep=sleep)
+        self.base_rate = float(rate)
+        self.max_rate_factor = max_rate_factor
+        self.min_rate_factor = min_rate_factor
+        self.growth = growth
+        self.healthy_window = healthy_window
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self._held_until = 0.0
+        self._healthy_streak = 0
+        self._consecutive_failures = 0
+
+        self._nb_requests = 0
+        self._first_request_at: Optional[float] = None
+        self._last_request_at: Optional[float] = None
+        self._waited = 0.0
+        self._nb_successes = 0
+        self._nb_throttled = 0
+        self._nb_failures = 0
+        self._nb_circuit_opened = 0
+
+    def configure(self, rate: float, capacity: int) -> None:
+        """Update the configured budget, restarting the adaptation from ``rate``."""
+        super().configure(rate=rate, capacity=capacity)
+        with self._lock:
+            self.base_rate = float(rate)
+            self._healthy_streak = 0
+
+    @property
+    def max_rate(self) -> float:
+        return self.base_rate * self.max_rate_factor
+
+    @property
+    def min_rate(self) -> float:
+        return self.base_rate * self.min_rate_factor
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until ``tokens`` tokens are available and consume them.
+
+        Returns:
+            float: Number of seconds spent waiting for the tokens.
+        Raises:
+            CircuitOpenError: When the circuit of the host is open.
+        """
+        waited = 0.0
+        probe = False
+        while True:
+            with self._lock:
+                now = self._clock()
+                if self.state == OPEN:
+                    if now - self._opened_at < self.reset_timeout:
+                        raise CircuitOpenError(
+                            "circuit open for %.0f more seconds" % (self.reset_timeout - (now - self._opened_at))
+                        )
+                    self.state = HALF_OPEN
+                    logger.info("Circuit half open, probing the host")
+
+                if self.state == HALF_OPEN and not probe:
+                    if self._probe_started_at is not None and now - self._probe_started_at < self.reset_timeout:
+                        raise CircuitOpenError("circuit half open, waiting for the response of the probe request")
+                    # This request is the probe, the others fail until its response is recorded
+                    probe = True
+                    self._probe_started_at = now
+
+                self._refill()
+                if now >= self._held_until and self._tokens >= tokens - _TOKEN_EPSILON:
+                    self._tokens -= tokens
+                    self._nb_requests += tokens
+                    self._waited += waited
+                    if self._first_request_at is None:
+                        self._first_request_at = now
+                    self._last_request_at = now
+                    return waited
+                wait = max(self._held_until - now, (tokens - self._tokens) / self.rate)
+            self._sleep(wait)
+            waited += wait
+
+    def record(self, status_code: Optional[int], retry_after: Optional[float] = None) -> None:
+        """
+        Adapt the rate to the outcome of a request.
+
+        Args:
+            status_code (int): Status code of the response, None for a connection error.
+            retry_after (float): Seconds of the Retry-After header of the response, if any.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill()
+
+            if status_code == 429 or retry_after is not None:
+                self._nb_throttled += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                if retry_after is not None:
+                    self._held_until = max(self._held_until, now + retry_after)
+                logger.warning("Throttled (status %s), rate lowered to %.3f requests/s", status_code, self.rate)
+
+            if status_code is None or status_code == 429 or status_code >= 500:
+                self._nb_failures += 1
+                self._healthy_streak = 0
+                self._consecutive_failures += 1
+                if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                    self._open_circuit(now)
+                return
+
+            self._nb_successes += 1
+            self._consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._probe_started_at = None
+                logger.info("Circuit closed")
+
+            self._healthy_streak += 1
+            if self._healthy_streak >= self.healthy_window:
+                self._healthy_streak = 0
+                self.rate = min(self.max_rate, self.rate + self.growth * self.base_rate)
+
+    def _open_circuit(self, now: float) -> None:
+        if self.state != OPEN:
+            self._nb_circuit_opened += 1
+            logger.error(
+                "Circuit opened after %s consecutive failures, retrying in %.0f s",
+                self._consecutive_failures,
+                self.reset_timeout,
+            )
+        self.state = OPEN
+        self._opened_at = now
+        self._probe_started_at = None
+        self._consecutive_failures = 0
+
+    def metrics(self) -> dict:
+        """
+        Get the counters of the limiter.
+
+        Returns:
+            dict: Number of requests, achieved requests/s between the first
+            and the last request, current and configured rates, seconds spent
+            waiting, healthy/throttled/failed responses and circuit state.
+        """
+        with self._lock:
+            elapsed = (
+                self._last_request_at - self._first_request_at
+                if self._first_request_at is not None
+                else 0.0
+            )
+            return {
+                "requests": self._nb_requests,
+                "achieved_rate": (self._nb_requests - 1) / elapsed if elapsed > 0 else None,
+                "rate": self.rate,
+                "base_rate": self.base_rate,
+                "waited_seconds": self._waited,
+                "successes": self._nb_successes,
+                "throttled": self._nb_throttled,
+                "failures": self._nb_failures,
+                "circuit_opened": self._nb_circuit_opened,
+                "state": self.state,
+            }
+
+    def log_metrics(self, name: str) -> None:
+        """Log the metrics of the limiter under ``name``."""
+        metrics = self.metrics()
+        logger.info(
+            "%s: %s requests, achieved %s requests/s (current rate %.3f, configured %.3f), "
+            "waited %.2f s, %s throttled, %s failed, circuit %s",
+            name,
+            metrics["requests"],
+            "%.3f" % metrics["achieved_rate"] if metrics["achieved_rate"] is not None else "-",
+            metrics["rate"],
+            metrics["base_rate"],
+            metrics["waited_seconds"],
+            metrics["throttled"],
+            metrics["failures"],
+            metrics["state"],
+        )
+
+
+_HOST_RATE_LIMITERS: Dict[str, AdaptiveRateLimiter] = {}
+_HOST_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_host_rate_limiter(
+    url: str,
+    requests_per_second: float = 1.0,
+    burst: int = 1,
+) -> AdaptiveRateLimiter:
+    """Get the rate limiter shared by every request sent to the host of ``url``.
+
+    The first call for a given host creates the limiter, later calls return the
+    same instance (updated with the budget given) so that every worker and every
+    module of the process draws from the same per-host budget and the rate
+    adapts to every response of the host.
+
+    Args:
+        url (str): Any url of the host to throttle.
+        requests_per_second (float): Configured request budget of the host, the starting rate.
+        burst (int): Number of requests allowed to be sent back to back.
+    Returns:
+        AdaptiveRateLimiter shared for the host.
+    """
+    host = urlparse(url).netloc or url
+
+    with _HOST_RATE_LIMITERS_LOCK:
+        if host not in _HOST_RATE_LIMITERS:
+            _HOST_RATE_LIMITERS[host] = AdaptiveRateLimiter(
+                rate=requests_per_second, capacity=burst
+            )
+        limiter = _HOST_RATE_LIMITERS[host]
+
+    if (limiter.base_rate, limiter.capacity) != (requests_per_second, burst):
+        limiter.configure(rate=requests_per_second, capacity=burst)
+
+    return limiter
+
+
+def find_host_rate_limiter(url: str) -> Optional[AdaptiveRateLimiter]:
+    """Get the rate limiter configured for the host of ``url``, None when the host is not throttled."""
+    with _HOST_RATE_LIMITERS_LOCK:
+        return _HOST_RATE_LIMITERS.get(urlparse(url).netloc or url)
@@ -0,0 +1,258 @@
+"""Provides an on-disk cache of the scrapped pages and dataframes.
+
+Page bodies are stored content-addressed (sha256 of the body) under
+``<cache_dir>/blobs`` and indexed by url under ``<cache_dir>/index``, with the
+ETag and Last-Modified validators returned by the server. A cached entry is
+served from disk while it is fresh and revalidated with a conditional request
+once its TTL is expired.
+
+Finished seasons never change, their entries are immutable. The current
+season only gets a short TTL.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import pandas as pd
+from basketball_reference_webscrapper.webscrapping_basketball_reference import (
+    WebScrapBasketballReference,
+)
+from basketball_reference_webscrapper.data_models.feature_model import FeatureIn
+
+from src.utils.http_client import HttpClient, get_http_client
+from src.utils.logs import get_logger
+
+logger = get_logger(
+    "RESPONSE_CACHE", log_level='INFO'
+)
+
+# TTL value of the entries that never expire
+IMMUTABLE = None
+
+# TTL in seconds of the current season entries
+CURRENT_SEASON_TTL = 6 * 3600
+
+
+def current_nba_season(today: Optional[datetime.date] = None) -> int:
+    """
+    Get the current NBA season, named after the year it ends.
+
+    The regular season starts in October, so October 2025 belongs to the 2026 season.
+    """
+    today = today or datetime.date.today()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def season_ttl(season: int, today: Optional[datetime.date] = None) -> Optional[float]:
+    """
+    Get the TTL policy of a season.
+
+    Returns:
+        IMMUTABLE for a finished season, CURRENT_SEASON_TTL otherwise.
+    """
+    if int(season) < current_nba_season(today):
+        return IMMUTABLE
+    return CURRENT_SEASON_TTL
+
+
+def _atomic_write_bytes(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _is_fresh(stored_at: float, ttl: Optional[float]) -> bool:
+    return ttl is IMMUTABLE or (time.time() - stored_at) < ttl
+
+
+class ResponseCache:
+    """On-disk cache of HTTP GET responses with conditional revalidation."""
+
+    def __init__(self, cache_dir: Union[str, Path], client: Optional[HttpClient] = None) -> None:
+        """
+        Args:
+            cache_dir (Path): Folder of the cache.
+            client (HttpClient): Client used on cache misses, default to the shared one.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.client = client
+
+    def _index_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / "index" / (key + ".json")
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.cache_dir / "blobs" / digest[:2] / digest
+
+    def _read_entry(self, url: str) -> Optional[dict]:
+        index_path = self._index_path(url)
+        if not index_path.exists():
+            return None
+        entry = json.loads(index_path.read_text())
+        if not self._blob_path(entry["sha256"]).exists():
+            return None
+        return entry
+
+    def _write_entry(self, url: str, entry: dict) -> None:
+        _atomic_write_bytes(self._index_path(url), json.dumps(entry).encode("utf-8"))
+
+    @staticmethod
+    def _archived(client: HttpClient, url: str, content: bytes, fetched_at: float) -> bytes:
+        """Archive a page served from disk, the client only archives the pages it fetches."""
+        if client.archive is not None:
+            client.archive.store(url, content, fetched_at=fetched_at)
+        return content
+
+    def get(self, url: str, ttl: Optional[float] = CURRENT_SEASON_TTL) -> bytes:
+        """
+        Get the body of ``url``, from disk when possible.
+
+        Args:
+            url (str): Url to request.
+            ttl (float): Seconds during which the entry is served without revalidation, IMMUTABLE to never revalidate.
+        Returns:
+            bytes: Body of the response.
+        """
+        client = self.client or get_http_client()
+
+        # A replay reads the archive only, a page cached but never archived is not served
+        if client.replay:
+            response = client.get(url)
+            response.raise_for_status()
+            return response.content
+
+        entry = self._read_entry(url)
+
+        if entry is not None and _is_fresh(entry["stored_at"], ttl):
+            return self._archived(client, url, self._blob_path(entry["sha256"]).read_bytes(), entry["stored_at"])
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = client.get(url, headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            logger.info("Revalidated %s", url)
+            entry["stored_at"] = time.time()
+            self._write_entry(url, entry)
+            return self._archived(client, url, self._blob_path(entry["sha256"]).read_bytes(), entry["stored_at"])
+
+        response.raise_for_status()
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            _atomic_write_bytes(blob_path, content)
+
+        self._write_entry(
+            url,
+            {
+                "url": url,
+                "sha256": digest,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "stored_at": time.time(),
+            },
+        )
+
+        return content
+
+    def get_frame(
+        self,
+        key: str,
+        fetch: Callable[[], pd.DataFrame],
+        ttl: Optional[float] = CURRENT_SEASON_TTL,
+    ) -> pd.DataFrame:
+        """
+        Get a dataframe from the cache, calling ``fetch`` when missing or expired.
+
+        Used to cache the output of scrappers whose HTTP requests cannot be
+        intercepted, such as basketball_reference_webscrapper.
+
+        Args:
+            key (str): Name of the cached dataframe.
+            fetch (Callable): Function building the dataframe.
+            ttl (float): Seconds during which the dataframe is served, IMMUTABLE to never refresh.
+        Returns:
+            pd.DataFrame
+        """
+        frame_path = self.cache_dir / "frames" / (key + ".pkl")
+
+        if frame_path.exists() and _is_fresh(frame_path.stat().st_mtime, ttl):
+            logger.info("Read %s from cache", key)
+            return pd.read_pickle(frame_path)
+
+        frame = fetch()
+
+        # The scrapper returns an empty dataframe when every request failed
+        if frame.empty:
+            return frame
+
+        frame_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=frame_path.parent, prefix=".tmp_")
+        os.close(fd)
+        try:
+            frame.to_pickle(tmp_path)
+            os.replace(tmp_path, frame_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return frame
+
+
+def webscrappe_nba_games_data(
+        data_type: str,
+        season: int,
+        team: str = 'all',
+        cache_dir: Optional[Union[str, Path]] = None
+        ) -> pd.DataFrame:
+    """
+    Call WebScrapBasketballReference.webscrappe_nba_games_data through the cache.
+
+    Args:
+        data_type (str): Argument from basketball_reference_webscrapper. Type of data to pull from the package
+        season (int): Argument from basketball_reference_webscrapper. Season to pull from the package
+        team (str): Argument from basketball_reference_webscrapper. Team to pull data from the package.
+        cache_dir (Path): Folder of the cache, None to always call the package.
+    Returns:
+        pd.DataFrame: Data returned by the package.
+    """
+    def fetch() -> pd.DataFrame:
+        return WebScrapBasketballReference(
+            FeatureIn(
+                data_type=data_type,
+                season=season,
+                team=team,
+            )
+        ).webscrappe_nba_games_data()
+
+    if cache_dir is None:
+        return fetch()
+
+    team_key = "-".join(team) if isinstance(team, list) else team
+
+    return ResponseCache(cache_dir).get_frame(
+        key=data_type + "_" + str(season) + "_" + team_key,
+        fetch=fetch,
+        ttl=season_ttl(season),
+    )
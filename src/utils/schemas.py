@@ -0,0 +1,282 @@
+"""Provides the registry of the columns and dtypes of the pipeline datasets.
+
+Every dataset read or written by the stages is typed through its schema:
+teams are categoricals of constants/team_city_refdata.csv, integers are
+downcast to nullable pandas integers, dates are parsed and the low
+cardinality text columns are categoricals. A multi-season frame then takes
+a fraction of the memory of the object columns inferred by pd.read_csv, and
+a season whose values cannot be cast to the schema raises a SchemaError
+instead of silently turning a whole column into strings.
+
+The extract outputs keep the values as scrapped, their schema is checked
+before they are written and applied when the transforms read them.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from src.utils.logs import get_logger
+from src.utils.teams import get_team_abbreviations
+
+logger = get_logger(
+    "SCHEMAS", log_level='INFO'
+)
+
+# dtypes of the registry besides the pandas ones
+TEAM = "team"
+CATEGORY = "category"
+DATE = "datetime64[ns]"
+
+DtypeSpec = Union[str, pd.CategoricalDtype]
+
+
+class SchemaError(ValueError):
+    """A dataset does not match its schema, e.g. a season with text in a numeric column."""
+
+
+@lru_cache(maxsize=None)
+def team_dtype() -> pd.CategoricalDtype:
+    """Categorical of the team abbreviations of the reference data."""
+    return pd.CategoricalDtype(get_team_abbreviations())
+
+
+BOX_SCORE_COLUMNS = ["pts", "fg", "fga", "3p", "3pa", "ft", "fta", "orb", "trb", "ast", "stl", "blk", "tov", "pf"]
+
+PERCENTAGE_COLUMNS = ["fg_prct", "3p_prct", "ft_prct"]
+
+
+def _box_score_schema(side: str) -> Dict[str, DtypeSpec]:
+    schema = {column + "_" + side: "Int16" for column in BOX_SCORE_COLUMNS}
+    schema.update({column + "_" + side: "float64" for column in PERCENTAGE_COLUMNS})
+    return schema
+
+
+GAMELOG_SCHEMA: Dict[str, DtypeSpec] = {
+    "id_season": "Int16",
+    "game_nb": "Int16",
+    "game_date": DATE,
+    # "@" away, empty at home
+    "extdom": CATEGORY,
+    "tm": TEAM,
+    "opp": TEAM,
+    "results": pd.CategoricalDtype(["L", "W"]),
+    **_box_score_schema("tm"),
+    **_box_score_schema("opp"),
+}
+
+SCHEDULE_SCHEMA: Dict[str, DtypeSpec] = {
+    "id_season": "Int16",
+    "tm": TEAM,
+    "game_date": DATE,
+    "time_start": CATEGORY,
+    "extdom": CATEGORY,
+    # Full team names on the schedule pages
+    "opponent": CATEGORY,
+    "w_l": pd.CategoricalDtype(["L", "W"]),
+    "overtime": CATEGORY,
+    "pts_tm": "Int16",
+    "pts_opp": "Int16",
+    "w_tot": "Int16",
+    "l_tot": "Int16",
+    "streak_w_l": CATEGORY,
+}
+
+PLAYER_ATTRIBUTES_SCHEMA: Dict[str, DtypeSpec] = {
+    "id_season": "Int16",
+    "tm": TEAM,
+    "Name": "object",
+    "Position": CATEGORY,
+    "Ht": CATEGORY,
+    "Wt": "Int16",
+    "BirthDate": DATE,
+    "Nationality": CATEGORY,
+    # "R" for the rookies
+    "Experience": CATEGORY,
+    "College": CATEGORY,
+}
+
+PLAYER_SALARY_SCHEMA: Dict[str, DtypeSpec] = {
+    "RK": "Int16",
+    "NAME": "object",
+    "TEAM": CATEGORY,
+    "SALARY": "object",
+    "year": "Int16",
+    "name": "object",
+    "salary": "Int32",
+}
+
+EXTDOM_DTYPE = pd.CategoricalDtype(["dom", "ext"])
+
+SCHEMAS: Dict[str, Dict[str, DtypeSpec]] = {
+    "gamelog": GAMELOG_SCHEMA,
+    "schedule": SCHEDULE_SCHEMA,
+    "player_attributes": PLAYER_ATTRIBUTES_SCHEMA,
+    "player_salary": PLAYER_SALARY_SCHEMA,
+    "gamelog_cleaned": {**GAMELOG_SCHEMA, "extdom": EXTDOM_DTYPE, "game_key": "Int64"},
+    "schedule_cleaned": {**SCHEDULE_SCHEMA, "extdom": EXTDOM_DTYPE},
+    "gamelog_schedule_unified": {
+        **GAMELOG_SCHEMA,
+        "extdom": EXTDOM_DTYPE,
+        "time_start": CATEGORY,
+        "overtime": CATEGORY,
+        "w_tot": "Int16",
+        "l_tot": "Int16",
+        "streak_w_l": CATEGORY,
+        "game_key": "Int64",
+    },
+    "player_attributes_salaries_unified": {
+        "id_season": "Int16",
+        "tm": TEAM,
+        "Name": "object",
+        "Position": CATEGORY,
+        "Wt": "Int16",
+        "Experience": "Int8",
+        "Age": "float64",
+        "cm_size": "float64",
+        "salary": "Int32",
+    },
+}
+
+
+# Optional columns of the exports of a dataset, derived from its columns
+EXPORT_COLUMNS: Dict[str, Dict[str, DtypeSpec]] = {
+    # Readable id of the game_key, see src/utils/game_keys.py
+    "gamelog_cleaned": {"id": "object"},
+    "gamelog_schedule_unified": {"id": "object"},
+}
+
+
+def get_schema(name: str) -> Dict[str, DtypeSpec]:
+    """Get the schema of a dataset of SCHEMAS, column name to dtype."""
+    if name not in SCHEMAS:
+        raise ValueError(
+            "schema value provided is not supported. Accepted values are: "
+            + ", ".join("'" + schema_name + "'" for schema_name in SCHEMAS)
+        )
+    return SCHEMAS[name]
+
+
+def _missing(values: pd.Series) -> pd.Series:
+    """Missing values, the empty strings of the scrapped columns included."""
+    if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+        return values.isna() | (values == "")
+    return values.isna()
+
+
+def _invalid(name: str, column: str, dtype: DtypeSpec, values: pd.Series, invalid: pd.Series) -> SchemaError:
+    examples = values[invalid].astype(str).unique()[:5]
+    return SchemaError(
+        name + "." + column + ": " + str(invalid.sum()) + " values cannot be cast to "
+        + str(dtype) + ", e.g. " + ", ".join(repr(example) for example in examples)
+    )
+
+
+def _cast_column(name: str, column: str, values: pd.Series, dtype: DtypeSpec) -> pd.Series:
+    if isinstance(dtype, str) and dtype == TEAM:
+        dtype = team_dtype()
+
+    missing = _missing(values)
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == dtype:
+            return values
+        values = values.astype(object).mask(missing)
+        invalid = ~missing & ~values.isin(dtype.categories)
+        if invalid.any():
+            raise _invalid(name, column, dtype, values, invalid)
+        return values.astype(dtype)
+
+    if dtype == CATEGORY:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if "" in values.cat.categories:
+                return values.cat.remove_categories([""])
+            return values
+        return values.astype(object).mask(missing).astype(CATEGORY)
+
+    if dtype == DATE:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        parsed = pd.to_datetime(values.astype(object).mask(missing), errors="coerce")
+        invalid = ~missing & parsed.isna()
+        if invalid.any():
+            raise _invalid(name, column, dtype, values, invalid)
+        return parsed
+
+    if dtype == "object":
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values.astype(object)
+        return values
+
+    # Numeric dtypes, nullable integers and floats
+    if str(values.dtype) == dtype:
+        return values
+    numeric = pd.to_numeric(values.astype(object).mask(missing), errors="coerce")
+    invalid = ~missing & numeric.isna()
+    if invalid.any():
+        raise _invalid(name, column, dtype, values, invalid)
+    try:
+        return numeric.astype(dtype)
+    except (TypeError, ValueError) as e:
+        # Fractional values or values out of the range of the integer dtype
+        raise SchemaError(name + "." + column + ": values cannot be cast to " + str(dtype) + ", " + str(e)) from e
+
+
+def apply_schema(
+        df: pd.DataFrame,
+        name: str,
+        columns: Optional[List[str]] = None
+        ) -> pd.DataFrame:
+    """
+    Cast the columns of a dataframe to the schema of its dataset.
+
+    Args:
+        df (pd.DataFrame): Dataframe read or about to be written.
+        name (str): Dataset of SCHEMAS, e.g. 'gamelog'.
+        columns (list): Columns expected in df, default to every column of the schema.
+            The columns not in the schema are kept as they are.
+    Returns:
+        pd.DataFrame: New dataframe with the schema dtypes.
+    Raises:
+        SchemaError: When an expected column is missing, or when values cannot be cast,
+            e.g. text in an integer column or a team missing from the reference data.
+    """
+    schema = get_schema(name)
+    expected_columns = [column for column in (columns or schema) if column in schema]
+
+    missing_columns = [column for column in expected_columns if column not in df.columns]
+    if missing_columns:
+        raise SchemaError(name + ": missing columns " + ", ".join(missing_columns))
+
+    export_columns = EXPORT_COLUMNS.get(name, {})
+    unknown_columns = [column for column in df.columns if column not in schema and column not in export_columns]
+    if unknown_columns:
+        logger.warning("%s: columns %s are not in the schema, kept as is", name, ", ".join(map(str, unknown_columns)))
+
+    # Shallow copy, the cast columns replace the original ones
+    df = df.copy(deep=False)
+    for column in expected_columns:
+        df[column] = _cast_column(name, column, df[column], schema[column])
+    for column in export_columns:
+        if column in df.columns:
+            df[column] = _cast_column(name, column, df[column], export_columns[column])
+    return df
+
+
+def categorical_columns(name: str) -> List[str]:
+    """Get the columns of a dataset typed as categoricals, to read them as such."""
+    return [
+        column for column, dtype in get_schema(name).items()
+        if isinstance(dtype, pd.CategoricalDtype) or dtype in (TEAM, CATEGORY)
+    ]
+
+
+def validate_schema(df: pd.DataFrame, name: str) -> None:
+    """
+    Check that a dataframe can be cast to the schema of its dataset, without casting it.
+
+    Raises:
+        SchemaError: See apply_schema.
+    """
+    apply_schema(df, name)
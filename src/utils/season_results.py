@@ -0,0 +1,161 @@
+"""Provides the per-season results of the multi-season unification stages.
+
+A unification keeps the rows it computed for every season under
+``<season_results_dir>/<name>/``, one file per season, with a manifest of the
+fingerprints of the input files each season was computed from. A run only
+reads and recomputes the seasons whose inputs changed since, e.g. the
+current season during the season, and splices them with the stored seasons
+into the unified dataset.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.utils.fingerprints import fingerprint_path
+from src.utils.logs import get_logger
+from src.utils.partitions import season_fingerprints
+from src.utils.storage import file_extension, read_frames, write_frame
+from src.utils.streaming import season_chunks
+
+logger = get_logger(
+    "SEASON_RESULTS", log_level='INFO'
+)
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def source_fingerprint(*paths: Union[str, Path]) -> str:
+    """
+    Fingerprint of the source files of a computation, the version of the results it computes.
+
+    Args:
+        paths (Path): Modules and reference data files the results depend on, in a fixed order.
+    Returns:
+        str: sha256 of the contents of the files, changed by a change to any of them.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(hashlib.sha256(Path(path).read_bytes()).digest())
+    return digest.hexdigest()
+
+
+class SeasonResults:
+    """Rows of a unified dataset stored by season, with the fingerprints of their inputs."""
+
+    def __init__(
+            self,
+            season_results_dir: Union[str, Path],
+            name: str,
+            schema: Optional[str] = None,
+            file_format: str = "parquet"
+            ) -> None:
+        """
+        Args:
+            season_results_dir (Path): Folder of the season results of every unification.
+            name (str): Name of the unified dataset, e.g. "nba_gamelog_schedule_dataset".
+            schema (str): Dataset of src/utils/schemas.py of the unified rows.
+            file_format (str): 'parquet' or 'csv', format of the season files.
+        """
+        self.folder = Path(season_results_dir) / name
+        self.name = name
+        self.schema = schema
+        self.file_format = file_format
+
+    def _season_path(self, season: int) -> Path:
+        return self.folder / (self.name + "_" + str(season) + file_extension(self.file_format))
+
+    def read_manifest(self) -> Dict[int, str]:
+        """Fingerprint of the inputs of every stored season, by season."""
+        manifest_path = self.folder / MANIFEST_FILE_NAME
+        if not manifest_path.exists():
+            return {}
+        return {int(season): fingerprint for season, fingerprint in json.loads(manifest_path.read_text()).items()}
+
+    def _write_manifest(self, manifest: Dict[int, str]) -> None:
+        manifest_path = self.folder / MANIFEST_FILE_NAME
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix="." + MANIFEST_FILE_NAME + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump({str(season): manifest[season] for season in sorted(manifest)}, tmp_file, indent=2)
+            os.replace(tmp_path, manifest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def update(
+            self,
+            compute: Callable[[List[int]], pd.DataFrame],
+            inputs: List[Tuple[Union[str, Path], str]],
+            seasons: Optional[Iterable[int]] = None,
+            version: str = "",
+            chunk_size: Optional[int] = None
+            ) -> List[int]:
+        """
+        Recompute the seasons whose inputs changed since they were stored.
+
+        Args:
+            compute (Callable): Computes the unified rows of a list of seasons, with an id_season column.
+            inputs (list): (folder, name_pattern) of every input dataset, see partitions.read_dataset.
+            seasons (list): Seasons to update, None for every season of the inputs.
+            version (str): Version of the computation, e.g. the fingerprint of the unification code.
+                Changing it recomputes every season.
+            chunk_size (int): Number of seasons computed at a time, each chunk stored before the next one
+                is computed. Default is None, every changed season at once.
+        Returns:
+            list: Seasons recomputed.
+        """
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        input_fingerprints = [season_fingerprints(folder, name_pattern, seasons=seasons) for folder, name_pattern in inputs]
+        input_seasons = sorted(set().union(*input_fingerprints))
+        fingerprints = {
+            season: hashlib.sha256(
+                json.dumps([version] + [fingerprints.get(season) for fingerprints in input_fingerprints]).encode("utf-8")
+            ).hexdigest()
+            for season in input_seasons
+        }
+
+        manifest = self.read_manifest()
+        changed_seasons = [
+            season for season in input_seasons
+            if manifest.get(season) != fingerprints[season] or not self._season_path(season).exists()
+        ]
+
+        for chunk in ([changed_seasons] if chunk_size is None else season_chunks(changed_seasons, chunk_size)):
+            if not chunk:
+                continue
+            df = compute(chunk)
+            season_ids = pd.to_numeric(df["id_season"])
+            for season in chunk:
+                write_frame(df[season_ids == season], self._season_path(season), schema=self.schema)
+                manifest[season] = fingerprints[season]
+            del df
+            # The chunks stored are not computed again when a later chunk fails
+            self._write_manifest(manifest)
+
+        if seasons is None:
+            # The seasons whose inputs were removed are removed from the results
+            for season in set(manifest) - set(input_seasons):
+                self._season_path(season).unlink(missing_ok=True)
+                fingerprint_path(self._season_path(season)).unlink(missing_ok=True)
+                del manifest[season]
+
+        self._write_manifest(manifest)
+        logger.info(
+            "%s: %s seasons recomputed, %s seasons unchanged",
+            self.name,
+            len(changed_seasons),
+            len(input_seasons) - len(changed_seasons),
+        )
+        return changed_seasons
+
+    def read(self, seasons: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """Read the stored rows of the seasons, None for every season."""
+        return read_frames(self.folder, self.name, seasons=seasons, schema=self.schema)
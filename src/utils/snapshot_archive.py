@@ -0,0 +1,136 @@
+"""Provides an archive of the raw html pages fetched by the extract stages.
+
+Every page is stored compressed and content-addressed (sha256 of the raw
+body) under ``<archive_dir>/blobs``, and indexed by url and fetch time in the
+``<archive_dir>/index.sqlite`` SQLite database. The archive can then be
+replayed: the HttpClient serves the pages from the archive instead of the
+network, so a parsing fix can be applied to the whole history offline.
+
+Pages are compressed with zstandard.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import zstandard
+
+def _compress(content: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=10).compress(content)
+
+
+def _decompress(content: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(content)
+
+
+class SnapshotArchive:
+    """Compressed, content-addressed archive of fetched pages indexed in SQLite."""
+
+    def __init__(self, archive_dir: Union[str, Path]) -> None:
+        """
+        Args:
+            archive_dir (Path): Folder of the archive.
+        """
+        self.archive_dir = Path(archive_dir)
+        self.index_path = self.archive_dir / "index.sqlite"
+        self._lock = threading.Lock()
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    url TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS snapshots_url_fetched_at ON snapshots (url, fetched_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.archive_dir / "blobs" / digest[:2] / (digest + ".zst")
+
+    def store(self, url: str, content: bytes, fetched_at: Optional[float] = None) -> str:
+        """
+        Archive the body of a page, unless it is the latest snapshot of its url already.
+
+        Args:
+            url (str): Url of the page.
+            content (bytes): Raw body of the page.
+            fetched_at (float): Fetch timestamp, default to now.
+        Returns:
+            str: sha256 of the body.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=blob_path.parent, prefix=".tmp_")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(_compress(content))
+                os.replace(tmp_path, blob_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        # A page unchanged since its latest snapshot, e.g. served again by the response cache, is not indexed twice
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO snapshots (url, fetched_at, sha256, size)
+                SELECT ?, ?, ?, ?
+                WHERE COALESCE(
+                    (SELECT sha256 FROM snapshots WHERE url = ? ORDER BY fetched_at DESC LIMIT 1), ''
+                ) != ?
+                """,
+                (url, fetched_at or time.time(), digest, len(content), url, digest),
+            )
+
+        return digest
+
+    def load(self, url: str, at: Optional[float] = None) -> Optional[bytes]:
+        """
+        Read the latest archived body of a page.
+
+        Args:
+            url (str): Url of the page.
+            at (float): Only consider the pages fetched before this timestamp.
+        Returns:
+            bytes: Raw body of the page, None when the page was never archived.
+        """
+        query = "SELECT sha256 FROM snapshots WHERE url = ?"
+        params = [url]
+        if at is not None:
+            query += " AND fetched_at <= ?"
+            params.append(at)
+        query += " ORDER BY fetched_at DESC LIMIT 1"
+
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+
+        if row is None:
+            return None
+
+        return _decompress(self._blob_path(row[0]).read_bytes())
@@ -0,0 +1,87 @@
+"""Provides the sort-merge join of the datasets keyed by season, team and date.
+
+The gamelogs and the schedules are read season by season and team by team,
+the games of a team in date order, so both sides are already sorted on
+(id_season, tm, game_date). Each side is keyed by one int64 that keeps this
+order, see game_keys.team_game_keys, and the two sorted keys are walked once
+to match the rows, instead of hashing the three columns. A duplicated key is
+adjacent in a sorted key, so the duplicates are found and dropped on the way
+rather than by separate duplicated and drop_duplicates passes.
+
+Sorting a side costs more than the hash join of pd.merge, so a side that is
+not already sorted, e.g. the rows of a dataframe handed over out of order,
+is joined by hashing its int64 keys instead.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def is_sorted(keys: np.ndarray) -> bool:
+    """Whether the keys are in increasing order, duplicates allowed."""
+    return bool(np.all(keys[1:] >= keys[:-1]))
+
+
+def first_of_keys(keys: np.ndarray) -> np.ndarray:
+    """Mask of the first row of every key of sorted keys."""
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    return first
+
+
+def sort_merge_left_join(
+        left: pd.DataFrame,
+        left_keys: np.ndarray,
+        right: pd.DataFrame,
+        right_keys: np.ndarray,
+        right_columns: List[str]
+        ) -> Tuple[pd.DataFrame, int]:
+    """
+    Left join two datasets on their int64 keys, keeping the first row of every duplicated key.
+
+    When both keys are sorted, they are matched in a single pass. Otherwise they are
+    matched by a hash join, as pd.merge does, rather than sorted first. The negative
+    keys are missing keys: their left rows are kept without a match and their right
+    rows are dropped.
+
+    Args:
+        left (pd.DataFrame): Rows to join, all kept but the duplicates.
+        left_keys (np.ndarray): int64 key of every left row.
+        right (pd.DataFrame): Rows matched to the left ones.
+        right_keys (np.ndarray): int64 key of every right row.
+        right_columns (list): Columns of the right rows added to the left ones.
+    Returns:
+        tuple: Joined rows in the order of the left rows, sorted by key when both sides are, with a new
+            index, and the number of duplicated rows dropped.
+    """
+    sorted_keys = is_sorted(left_keys) and is_sorted(right_keys)
+    if sorted_keys:
+        left_first, right_first = first_of_keys(left_keys), first_of_keys(right_keys)
+    else:
+        left_first = ~pd.Series(left_keys).duplicated().to_numpy()
+        right_first = ~pd.Series(right_keys).duplicated().to_numpy()
+
+    left_first |= left_keys < 0
+    nb_duplicated_rows = int((~left_first).sum() + (~right_first).sum())
+
+    if not left_first.all():
+        left, left_keys = left[left_first], left_keys[left_first]
+    right_first &= right_keys >= 0
+    if not right_first.all():
+        right, right_keys = right[right_first], right_keys[right_first]
+
+    if sorted_keys:
+        # Both keys are now unique and sorted, pandas matches them in a single pass
+        right_indexer = np.full(len(left_keys), -1, dtype=np.intp)
+        has_key = left_keys >= 0
+        _, _, matches = pd.Index(left_keys[has_key]).join(pd.Index(right_keys), how="left", return_indexers=True)
+        right_indexer[has_key] = np.arange(has_key.sum()) if matches is None else matches
+    else:
+        # The right keys are unique and not negative, the missing left keys are not found
+        right_indexer = pd.Index(right_keys).get_indexer(left_keys)
+
+    # -1 is not a label of the range index, the unmatched rows get missing values
+    right_df = right[right_columns].reset_index(drop=True).reindex(right_indexer).reset_index(drop=True)
+    return pd.concat([left.set_axis(right_df.index, copy=False), right_df], axis=1), nb_duplicated_rows
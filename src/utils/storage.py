@@ -0,0 +1,469 @@
+"""Provides helpers to read and write the pipeline datasets safely.
+
+Datasets are written as zstd compressed Parquet by default, which keeps the
+dtypes between the stages and is read much faster than csv, or as csv for
+the deliverables. The format of a file is given by its extension.
+
+The partitioned datasets are in src/utils/partitions.py, the fingerprints
+that keep an unchanged file as is in src/utils/fingerprints.py, the reads
+and writes by chunks of rows in src/utils/streaming.py and the publication
+of the final datasets in src/utils/publish.py.
+"""
+
+import csv
+import glob
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from src.utils.fingerprints import (
+    fingerprint_path,
+    frame_fingerprint,
+    read_fingerprint,
+    write_fingerprint,
+)
+from src.utils.logs import get_logger
+from src.utils.schemas import apply_schema, categorical_columns, get_schema
+
+logger = get_logger(
+    "STORAGE", log_level='INFO'
+)
+
+FILE_EXTENSIONS = {"parquet": ".parquet", "csv": ".csv"}
+
+DEFAULT_FILE_FORMAT = "parquet"
+
+PARQUET_COMPRESSION = "zstd"
+
+# Numeric dtypes of src/utils/schemas.py and the Arrow types they are read as
+NUMERIC_ARROW_TYPES = {
+    "Int8": pa.int8(),
+    "Int16": pa.int16(),
+    "Int32": pa.int32(),
+    "Int64": pa.int64(),
+    "float64": pa.float64(),
+}
+
+# The int64 columns out of the schemas stay numpy integers
+ARROW_NULLABLE_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+}
+
+# Missing values of pd.read_csv, for the csv files parsed by Arrow
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def file_extension(file_format: str = DEFAULT_FILE_FORMAT) -> str:
+    """Get the extension of a file format, '.parquet' or '.csv'."""
+    if file_format not in FILE_EXTENSIONS:
+        raise ValueError(
+            "file_format value provided is not supported. Accepted values are: "
+            + ", ".join("'" + name + "'" for name in FILE_EXTENSIONS)
+        )
+    return FILE_EXTENSIONS[file_format]
+
+
+def _atomic_write(path: Path, write: Callable[[str], None]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix="." + path.name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_to_csv(df: pd.DataFrame, path: Union[str, Path], **kwargs) -> None:
+    """
+    Write a dataframe to csv through a temporary file renamed over ``path``.
+
+    A crash while writing leaves the previous file untouched instead of a
+    truncated csv.
+
+    Args:
+        df (pd.DataFrame): Dataframe to write.
+        path (Path): Destination csv file.
+        **kwargs: Arguments of pd.DataFrame.to_csv.
+    """
+    _atomic_write(Path(path), lambda tmp_path: df.to_csv(tmp_path, **kwargs))
+
+
+def atomic_to_parquet(df: pd.DataFrame, path: Union[str, Path]) -> None:
+    """
+    Write a dataframe to a compressed Parquet file through a temporary file renamed over ``path``.
+
+    Args:
+        df (pd.DataFrame): Dataframe to write, its index is not written.
+        path (Path): Destination Parquet file.
+    """
+    _atomic_write(
+        Path(path),
+        lambda tmp_path: df.to_parquet(tmp_path, index=False, compression=PARQUET_COMPRESSION),
+    )
+
+
+def parse_text_columns(df: pd.DataFrame, skip: Iterable[str] = ()) -> pd.DataFrame:
+    """Type the text columns the way pd.read_csv does: empty strings are missing and numbers are numeric."""
+    skip = set(skip)
+    for column in df.columns[df.dtypes == object]:
+        if column in skip:
+            continue
+        missing = df[column].isna() | (df[column] == "")
+        values = df[column].mask(missing, np.nan) if missing.any() else df[column]
+        try:
+            # Text columns such as the teams fail on their first value, before converting the whole column
+            pd.to_numeric(values[~missing].iloc[:1])
+            df[column] = pd.to_numeric(values)
+        except (ValueError, TypeError):
+            df[column] = values
+    return df
+
+
+def table_to_frame(table: pa.Table, schema: Optional[str] = None) -> pd.DataFrame:
+    """
+    Convert an Arrow table, with the dtypes of the schema where Arrow can convert to them directly.
+
+    The categorical columns are decoded as categoricals and the numeric
+    columns are cast in Arrow, so pandas gets its final nullable integers
+    instead of int64 columns cast again by apply_schema.
+    """
+    if schema is None:
+        return parse_text_columns(table.to_pandas())
+
+    for column, arrow_type in _arrow_types(schema).items():
+        if column not in table.column_names:
+            continue
+        index = table.column_names.index(column)
+        current_type = table.schema.field(index).type
+        if current_type == arrow_type or not (pa.types.is_integer(current_type) or pa.types.is_floating(current_type)):
+            continue
+        try:
+            table = table.set_column(index, column, table.column(index).cast(arrow_type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Fractional or out of range values, left to apply_schema to report
+            continue
+
+    categories = [column for column in categorical_columns(schema) if column in table.column_names]
+    for column in categories:
+        index = table.column_names.index(column)
+        # A category without any value is written as a null column, which Arrow cannot decode as a categorical
+        if pa.types.is_null(table.schema.field(index).type):
+            table = table.set_column(index, column, table.column(index).cast(pa.string()))
+    return parse_text_columns(
+        table.to_pandas(categories=categories, types_mapper=ARROW_NULLABLE_TYPES.get),
+        skip=get_schema(schema),
+    )
+
+
+def _arrow_types(schema: str) -> Dict[str, pa.DataType]:
+    """Arrow types of the numeric columns of a schema."""
+    return {
+        column: NUMERIC_ARROW_TYPES[dtype]
+        for column, dtype in get_schema(schema).items()
+        if isinstance(dtype, str) and dtype in NUMERIC_ARROW_TYPES
+    }
+
+
+def _read_csv_table(path: Union[str, Path], columns: Optional[List[str]], schema: str) -> Optional[pa.Table]:
+    """
+    Parse a csv file with the multi-threaded Arrow reader, the columns of the schema to their types.
+
+    The other columns are read as text, typed afterwards as pd.read_csv would.
+
+    Returns:
+        pa.Table: Columns of the file, None when a value cannot be parsed to the type of its column.
+    """
+    with open(path, newline="") as csv_file:
+        header = next(csv.reader(csv_file), [])
+    if "" in header or len(set(header)) < len(header):
+        # Unnamed or duplicated columns, named by pd.read_csv
+        return None
+
+    dtypes = get_schema(schema)
+    categories = set(categorical_columns(schema))
+    column_types = {}
+    for column in header:
+        dtype = dtypes.get(column)
+        if isinstance(dtype, str) and dtype in NUMERIC_ARROW_TYPES:
+            column_types[column] = NUMERIC_ARROW_TYPES[dtype]
+        elif column in categories:
+            column_types[column] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            column_types[column] = pa.string()
+
+    try:
+        return pa_csv.read_csv(
+            path,
+            convert_options=pa_csv.ConvertOptions(
+                column_types=column_types,
+                include_columns=columns,
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        return None
+
+
+def read_csv_frame(path: Union[str, Path], columns: Optional[List[str]] = None, schema: Optional[str] = None) -> pd.DataFrame:
+    if schema is None:
+        return pd.read_csv(path, usecols=columns)
+
+    table = _read_csv_table(path, columns, schema)
+    if table is not None:
+        return table_to_frame(table, schema=schema)
+    # Text in a numeric column, parsed as is for apply_schema to report
+    return pd.read_csv(path, usecols=columns, dtype={column: "category" for column in categorical_columns(schema)})
+
+
+def read_frame(
+        path: Union[str, Path],
+        columns: Optional[List[str]] = None,
+        schema: Optional[str] = None
+        ) -> pd.DataFrame:
+    """
+    Read a dataset file, Parquet or csv depending on its extension.
+
+    The text columns of Parquet files, such as the raw scrapped values, are
+    typed as pd.read_csv would, so the stages get the same dtypes from both formats.
+
+    Args:
+        path (Path): Dataset file.
+        columns (list): Columns to read, None for every column.
+        schema (str): Dataset of src/utils/schemas.py to type the columns with, None to infer the dtypes.
+    Returns:
+        pd.DataFrame
+    Raises:
+        SchemaError: When the file does not match the schema.
+    """
+    if str(path).endswith(FILE_EXTENSIONS["parquet"]):
+        df = table_to_frame(pq.read_table(path, columns=columns), schema=schema)
+    else:
+        df = read_csv_frame(path, columns=columns, schema=schema)
+
+    if schema is not None:
+        df = apply_schema(df, schema, columns=columns)
+    return df
+
+
+def find_dataset_files(
+        folder: Union[str, Path],
+        name_pattern: str,
+        seasons: Optional[Iterable[int]] = None
+        ) -> List[str]:
+    """
+    Find the files ``<name_pattern>_*`` of a folder, e.g. every season of a dataset.
+
+    When a file exists in both formats, the Parquet one is kept.
+
+    Args:
+        folder (Path): Folder of the dataset.
+        name_pattern (str): Prefix of the files, e.g. 'gamelog' for every gamelog season.
+        seasons (list): Only keep the files of these seasons, ``<name_pattern>_<season>``. None keeps every file.
+    Returns:
+        list: Sorted file paths.
+    """
+    files = {}
+    for file_format in ["csv", "parquet"]:
+        for file_path in glob.glob(os.path.join(folder, name_pattern + "_*" + file_extension(file_format))):
+            files[os.path.splitext(file_path)[0]] = file_path
+
+    if seasons is not None:
+        season_pattern = re.compile(
+            re.escape(name_pattern) + "_(" + "|".join(str(season) for season in seasons) + r")[_.]"
+        )
+        files = {stem: path for stem, path in files.items() if season_pattern.match(os.path.basename(path))}
+
+    return sorted(files.values())
+
+
+def read_frames(
+        folder: Union[str, Path],
+        name_pattern: str,
+        columns: Optional[List[str]] = None,
+        seasons: Optional[Iterable[int]] = None,
+        schema: Optional[str] = None
+        ) -> pd.DataFrame:
+    """
+    Read and concatenate every ``<name_pattern>_*`` file of a folder.
+
+    The files are read with only the columns asked for and the dtypes of the
+    schema, by the Arrow readers that already decode each file on several threads. The files of each format are concatenated as one
+    Arrow table, converted to pandas once. While a folder mixes both formats,
+    the csv rows come first.
+
+    Args:
+        folder (Path): Folder of the dataset.
+        name_pattern (str): Prefix of the files, e.g. 'gamelog' for every gamelog season.
+        columns (list): Columns to read, None for every column.
+        seasons (list): Only read the files of these seasons. None reads every file.
+        schema (str): Dataset of src/utils/schemas.py to type the columns with, None to infer the dtypes.
+    Returns:
+        pd.DataFrame
+    Raises:
+        SchemaError: When a file does not match the schema.
+    """
+    file_paths = find_dataset_files(folder, name_pattern, seasons=seasons)
+    if len(file_paths) == 0:
+        raise FileNotFoundError("No " + name_pattern + " file found in " + str(folder))
+
+    parquet_paths = [path for path in file_paths if path.endswith(FILE_EXTENSIONS["parquet"])]
+    csv_paths = [path for path in file_paths if not path.endswith(FILE_EXTENSIONS["parquet"])]
+
+    def _read_file(file_path: str) -> Union[pa.Table, pd.DataFrame]:
+        if file_path.endswith(FILE_EXTENSIONS["parquet"]):
+            return pq.read_table(file_path, columns=columns)
+        table = None if schema is None else _read_csv_table(file_path, columns, schema)
+        return read_frame(file_path, columns=columns, schema=schema) if table is None else table
+
+    results = [_read_file(file_path) for file_path in csv_paths + parquet_paths]
+    frames = [result for result in results if isinstance(result, pd.DataFrame)]
+    for tables in [results[:len(csv_paths)], results[len(csv_paths):]]:
+        tables = [result for result in tables if isinstance(result, pa.Table)]
+        if tables:
+            # One conversion to pandas for every season of a format instead of one per file,
+            # the seasons with an all-missing column are promoted to the type of the others
+            frames.append(table_to_frame(pa.concat_tables(tables, promote_options="default"), schema=schema))
+            del tables
+
+    return _concat_frames(frames, schema=schema, columns=columns)
+
+
+def _concat_frames(
+        frames: List[pd.DataFrame],
+        schema: Optional[str] = None,
+        columns: Optional[List[str]] = None
+        ) -> pd.DataFrame:
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True)
+
+    if schema is not None:
+        # Also gives back the categoricals whose categories differ between the frames
+        df = apply_schema(df, schema, columns=columns)
+    return df
+
+
+def write_frame(df: pd.DataFrame, path: Union[str, Path], schema: Optional[str] = None) -> bool:
+    """
+    Write a dataframe, to Parquet or csv depending on the extension of ``path``, only when its content changed.
+
+    The fingerprint of the dataframe is compared with the one stored in the
+    sidecar manifest of ``path`` (or computed from the existing file when
+    there is no manifest yet). Unchanged outputs keep their bytes and mtime,
+    so the downstream stages are not invalidated.
+
+    Args:
+        df (pd.DataFrame): Dataframe to write.
+        path (Path): Destination file, '.parquet' or '.csv'. The index is not written.
+        schema (str): Dataset of src/utils/schemas.py the dataframe is cast to before being written.
+    Returns:
+        bool: True when the file was written.
+    Raises:
+        SchemaError: When the dataframe does not match the schema, nothing is written.
+    """
+    path = Path(path)
+    if schema is not None:
+        df = apply_schema(df, schema)
+    fingerprint = frame_fingerprint(df)
+
+    if path.exists():
+        previous_fingerprint = read_fingerprint(path)
+        if previous_fingerprint is None:
+            try:
+                previous_fingerprint = frame_fingerprint(read_frame(path))
+            except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, OSError):
+                previous_fingerprint = None
+
+        if previous_fingerprint == fingerprint:
+            logger.info("%s unchanged, not rewritten", path)
+            if not fingerprint_path(path).exists():
+                write_fingerprint(path, fingerprint, len(df), df.columns)
+            return False
+
+    # A manifest left without its csv must never match, remove it before writing
+    fingerprint_path(path).unlink(missing_ok=True)
+    if str(path).endswith(FILE_EXTENSIONS["parquet"]):
+        atomic_to_parquet(df, path)
+    else:
+        atomic_to_csv(df, path, index=False)
+    write_fingerprint(path, fingerprint, len(df), df.columns)
+    return True
+
+
+def replaced_rows(
+        df: pd.DataFrame,
+        seasons: Optional[Iterable[int]],
+        teams: Optional[Iterable[str]] = None
+        ) -> pd.Series:
+    """Rows of a dataset of the seasons and teams replaced, None for every season or every team."""
+    replaced = pd.Series(True, index=df.index)
+    if seasons is not None:
+        replaced &= pd.to_numeric(df["id_season"]).isin(list(seasons))
+    if teams is not None:
+        replaced &= df["tm"].astype(object).isin(list(teams))
+    return replaced
+
+
+def replace_seasons(
+        df: pd.DataFrame,
+        path: Union[str, Path],
+        seasons: Optional[Iterable[int]],
+        schema: Optional[str] = None,
+        teams: Optional[Iterable[str]] = None
+        ) -> bool:
+    """
+    Write the rows of some seasons into a multi-season dataset file, keeping the rows of its other seasons.
+
+    Args:
+        df (pd.DataFrame): Rows of the seasons, with an id_season column.
+        path (Path): Dataset file, '.parquet' or '.csv'.
+        seasons (list): Seasons replaced, the rows of these seasons missing from df are removed.
+            None replaces every season of the teams.
+        schema (str): Dataset of src/utils/schemas.py of the file.
+        teams (list): Only replace the rows of these teams (tm column) of the seasons, the rows of
+            the other teams are kept. Default is None, every team.
+    Returns:
+        bool: True when the file was written, see write_frame.
+    """
+    if os.path.exists(path):
+        previous_df = read_frame(path, schema=schema)
+        previous_df = previous_df[~replaced_rows(previous_df, seasons, teams=teams)]
+        if not previous_df.empty:
+            df = _concat_frames([previous_df, df], schema=schema)
+    return write_frame(df, path, schema=schema)
+
+
+def count_rows(path: Union[str, Path]) -> int:
+    """
+    Count the rows of a dataset file from its metadata, without reading the data.
+
+    The count is read from the footer of Parquet files, and from the
+    fingerprint manifest of csv files, the csv being only parsed when it has none.
+    """
+    if str(path).endswith(FILE_EXTENSIONS["parquet"]):
+        return pq.ParquetFile(path).metadata.num_rows
+
+    manifest_path = fingerprint_path(path)
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())["rows"]
+    return len(pd.read_csv(path, usecols=[0]))
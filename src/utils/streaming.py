@@ -0,0 +1,244 @@
+"""Provides the helpers of the unifications streamed season by season.
+
+A streamed unification reads, unifies and writes a chunk of seasons at a
+time, so its memory depends on the size of a chunk instead of the length of
+the history. The duplicate check stays global: the keys of the rows written
+are kept as one sorted array of 64 bits hashes, about 8 bytes per row, and
+a row whose key was already written by a previous chunk is dropped. The
+unified file is read and written a chunk of rows at a time, as Parquet row
+groups or csv rows.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.fingerprints import fingerprint_path, frame_row_hashes, read_fingerprint, write_fingerprint
+from src.utils.logs import get_logger
+from src.utils.schemas import apply_schema, categorical_columns
+from src.utils.storage import FILE_EXTENSIONS, PARQUET_COMPRESSION, replaced_rows, table_to_frame
+
+logger = get_logger(
+    "STREAMING", log_level='INFO'
+)
+
+# Rows per chunk of the streamed reads of a dataset file
+DEFAULT_CHUNK_ROWS = 100000
+
+
+def season_chunks(seasons: Iterable[int], chunk_size: int) -> Iterator[List[int]]:
+    """
+    Split seasons into chunks of consecutive seasons.
+
+    Args:
+        seasons (list): Seasons to split, in any order.
+        chunk_size (int): Number of seasons per chunk.
+    Yields:
+        list: Seasons of a chunk, sorted.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1, got " + str(chunk_size))
+    seasons = sorted(set(seasons))
+    for start in range(0, len(seasons), chunk_size):
+        yield seasons[start:start + chunk_size]
+
+
+class KeySet:
+    """Compact set of the keys of the rows written, as sorted 64 bits hashes."""
+
+    def __init__(self, key_columns: List[str]) -> None:
+        """
+        Args:
+            key_columns (list): Columns identifying a row, e.g. ["id_season", "tm", "game_date"].
+        """
+        self.key_columns = key_columns
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def drop_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop the rows whose key is duplicated in the chunk or was added by a previous chunk, and add the others.
+
+        Args:
+            df (pd.DataFrame): Chunk of rows with the key columns.
+        Returns:
+            pd.DataFrame: Rows of the chunk whose key is new, the first one of each key.
+        """
+        hashes = pd.util.hash_pandas_object(df[self.key_columns], index=False).to_numpy()
+        new = ~pd.Series(hashes).duplicated(keep="first").to_numpy()
+        new &= ~np.isin(hashes, self.hashes, assume_unique=False)
+
+        nb_duplicated_rows = len(df) - int(new.sum())
+        if nb_duplicated_rows > 0:
+            logger.info(
+                "%s rows duplicated on %s dropped", nb_duplicated_rows, ", ".join(self.key_columns)
+            )
+            df = df[new]
+
+        self.hashes = np.union1d(self.hashes, hashes[new])
+        return df
+
+
+def read_frame_chunks(
+        path: Union[str, Path],
+        schema: Optional[str] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS
+        ) -> Iterator[pd.DataFrame]:
+    """
+    Read a dataset file by chunks of rows, so only one chunk is held in memory at a time.
+
+    Args:
+        path (Path): Dataset file, '.parquet' or '.csv'.
+        schema (str): Dataset of src/utils/schemas.py to type the columns with, None to infer the dtypes.
+        chunk_rows (int): Maximum number of rows per chunk.
+    Yields:
+        pd.DataFrame: Rows of the file, in the order of the file.
+    """
+    if str(path).endswith(FILE_EXTENSIONS["parquet"]):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            df = table_to_frame(pa.Table.from_batches([batch]), schema=schema)
+            yield df if schema is None else apply_schema(df, schema)
+    else:
+        dtype = None if schema is None else {column: "category" for column in categorical_columns(schema)}
+        # Not typed at parse time, a chunk with text in a numeric column is reported by apply_schema
+        for df in pd.read_csv(path, dtype=dtype, chunksize=chunk_rows):
+            yield df if schema is None else apply_schema(df, schema)
+
+
+def _streamed_field(field: pa.Field) -> pa.Field:
+    """Type of a column of the first chunk that the next chunks can be cast to."""
+    if pa.types.is_null(field.type):
+        # A column missing from every row of the first chunk
+        return field.with_type(pa.string())
+    if pa.types.is_dictionary(field.type):
+        # The categoricals of a chunk are encoded on the fewest bits their categories need
+        return field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+    return field
+
+
+def write_frame_chunks(
+        chunks: Iterable[pd.DataFrame],
+        path: Union[str, Path],
+        schema: Optional[str] = None
+        ) -> bool:
+    """
+    Write chunks of rows into one dataset file, only holding one chunk in memory at a time.
+
+    The chunks are appended to a temporary file renamed over ``path``, as
+    Parquet row groups or csv rows. The fingerprint of the file is computed
+    from the hashes of its rows, 8 bytes per row, so it does not depend on how
+    the rows were chunked, and an unchanged file keeps its bytes and mtime.
+
+    Args:
+        chunks (iterable): Dataframes with the same columns, e.g. the unified rows of some seasons.
+        path (Path): Destination file, '.parquet' or '.csv'. The index is not written.
+        schema (str): Dataset of src/utils/schemas.py the chunks are cast to before being written.
+    Returns:
+        bool: True when the file was written.
+    Raises:
+        ValueError: When there is no chunk to write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    is_parquet = str(path).endswith(FILE_EXTENSIONS["parquet"])
+
+    columns = None
+    row_hashes = []
+    writer = None
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix="." + path.name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        try:
+            for df in chunks:
+                if schema is not None:
+                    df = apply_schema(df, schema)
+                if columns is None:
+                    columns = [str(column) for column in df.columns]
+                elif [str(column) for column in df.columns] != columns:
+                    df = df[columns]
+                row_hashes.append(frame_row_hashes(df))
+
+                if is_parquet:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writer is None:
+                        table = table.cast(pa.schema([_streamed_field(field) for field in table.schema], table.schema.metadata))
+                        writer = pq.ParquetWriter(tmp_path, table.schema, compression=PARQUET_COMPRESSION)
+                    else:
+                        table = table.cast(writer.schema)
+                    writer.write_table(table)
+                else:
+                    df.to_csv(tmp_path, mode="a" if len(row_hashes) > 1 else "w", header=len(row_hashes) == 1, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if columns is None:
+            raise ValueError("No chunk to write to " + str(path))
+
+        digest = hashlib.sha256(json.dumps(sorted(columns)).encode("utf-8"))
+        digest.update(np.sort(np.concatenate(row_hashes)).tobytes())
+        fingerprint = "rows:" + digest.hexdigest()
+        nb_rows = sum(len(hashes) for hashes in row_hashes)
+
+        if path.exists() and read_fingerprint(path) == fingerprint:
+            logger.info("%s unchanged, not rewritten", path)
+            os.remove(tmp_path)
+            return False
+
+        fingerprint_path(path).unlink(missing_ok=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    write_fingerprint(path, fingerprint, nb_rows, columns)
+    logger.info("%s: %s rows written in %s chunks", path, nb_rows, len(row_hashes))
+    return True
+
+
+def replace_season_chunks(
+        chunks: Iterable[pd.DataFrame],
+        path: Union[str, Path],
+        seasons: Optional[Iterable[int]],
+        schema: Optional[str] = None,
+        teams: Optional[Iterable[str]] = None
+        ) -> bool:
+    """
+    Stream the rows of some seasons into a multi-season dataset file, keeping the rows of its other seasons.
+
+    As replace_seasons, with the file read and written by chunks, see write_frame_chunks.
+
+    Args:
+        chunks (iterable): Rows of the seasons, with an id_season column.
+        path (Path): Dataset file, '.parquet' or '.csv'.
+        seasons (list): Seasons replaced, the rows of these seasons missing from the chunks are removed.
+            None replaces every season of the teams.
+        schema (str): Dataset of src/utils/schemas.py of the file.
+        teams (list): Only replace the rows of these teams of the seasons. Default is None, every team.
+    Returns:
+        bool: True when the file was written.
+    """
+    seasons = None if seasons is None else list(seasons)
+    teams = None if teams is None else list(teams)
+
+    def _chunks() -> Iterator[pd.DataFrame]:
+        if os.path.exists(path):
+            # The rows of the other seasons and teams are kept as they are stored
+            for previous_df in read_frame_chunks(path, schema=schema):
+                previous_df = previous_df[~replaced_rows(previous_df, seasons, teams=teams)]
+                if not previous_df.empty:
+                    yield previous_df
+        yield from chunks
+
+    return write_frame_chunks(_chunks(), path, schema=schema)
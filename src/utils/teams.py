@@ -0,0 +1,54 @@
+"""Provides the NBA team reference data."""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+TEAM_CITY_REFDATA_PATH = Path(__file__).resolve().parents[2] / "constants" / "team_city_refdata.csv"
+
+# Seasons played by the abbreviations of the relocated or renamed franchises, first and
+# last season included, None while the team still plays. The other teams play every season.
+TEAM_SEASONS: Dict[str, List[Tuple[int, Optional[int]]]] = {
+    "BRK": [(2013, None)],
+    "CHA": [(2005, 2014)],
+    "CHH": [(1989, 2002)],
+    "CHO": [(2015, None)],
+    "MEM": [(2002, None)],
+    "NJN": [(1978, 2012)],
+    "NOH": [(2003, 2005), (2008, 2013)],
+    "NOK": [(2006, 2007)],
+    "NOP": [(2014, None)],
+    "OKC": [(2009, None)],
+    "SEA": [(1968, 2008)],
+    "VAN": [(1996, 2001)],
+    "WAS": [(1998, None)],
+}
+
+
+def get_team_city_refdata() -> pd.DataFrame:
+    """Read constants/team_city_refdata.csv, one row per team abbreviation."""
+    return pd.read_csv(TEAM_CITY_REFDATA_PATH, sep=";", encoding="utf-8-sig")
+
+
+def team_played(team: str, season: int) -> bool:
+    """Tell whether a team abbreviation played a season, see TEAM_SEASONS."""
+    if team not in TEAM_SEASONS:
+        return True
+    return any(
+        first <= season and (last is None or season <= last)
+        for first, last in TEAM_SEASONS[team]
+    )
+
+
+def get_team_abbreviations(season: Optional[int] = None) -> List[str]:
+    """
+    Get the team abbreviations, in the order of the reference data.
+
+    Args:
+        season (int): Only keep the teams that played this season, None for every team.
+    """
+    teams = list(get_team_city_refdata()["team_abrev"])
+    if season is None:
+        return teams
+    return [team for team in teams if team_played(team, season)]
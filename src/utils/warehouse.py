@@ -0,0 +1,244 @@
+"""Provides the load of the unified datasets into the local SQLite warehouse.
+
+Every unified dataset is a table of ``<warehouse_path>`` keyed by its primary
+key. The rows of the seasons loaded are deleted and the new ones upserted in
+batches inside one transaction, so a reload of some seasons replaces their
+rows, the games removed from them included, and leaves the other seasons
+untouched, and a failed load leaves the previous table as it was. The tables are indexed for
+the queries of the models, which then read the rows they need instead of
+parsing whole csv files.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from src.utils.logs import get_logger
+
+logger = get_logger(
+    "WAREHOUSE", log_level='INFO'
+)
+
+DEFAULT_BATCH_SIZE = 10000
+
+LOADS_TABLE = "_loads"
+
+# Column of the seasons replaced by a load, part of the primary key of every table
+SEASON_COLUMN = "id_season"
+
+# Primary key and secondary indexes of the table of each unified dataset of src/utils/schemas.py
+WAREHOUSE_TABLES: Dict[str, dict] = {
+    "gamelog_schedule_unified": {
+        "primary_key": ["id_season", "tm", "game_date"],
+        # The two rows of a game share its key
+        "indexes": [["game_key"]],
+    },
+    "player_attributes_salaries_unified": {
+        "primary_key": ["id_season", "tm", "Name"],
+        "indexes": [["Name"]],
+    },
+}
+
+
+def _quote(name: str) -> str:
+    # Columns such as 3p_tm are not valid bare identifiers
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _sql_rows(df: pd.DataFrame) -> List[tuple]:
+    """Rows of python values bound by sqlite3, missing values as NULL and dates as ISO strings."""
+    df = df.copy(deep=False)
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            values = df[column]
+            date_format = "%Y-%m-%d" if (values.dropna() == values.dropna().dt.normalize()).all() else "%Y-%m-%d %H:%M:%S"
+            df[column] = values.dt.strftime(date_format)
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+@contextmanager
+def connect(warehouse_path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    """Open the warehouse, committing on success and rolling back on error."""
+    Path(warehouse_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(warehouse_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _create_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame, primary_key: List[str]) -> None:
+    existing_columns = [row[1] for row in conn.execute("PRAGMA table_info(" + _quote(table) + ")")]
+
+    if not existing_columns:
+        columns_sql = [_quote(column) + " " + _sql_type(df[column].dtype) for column in df.columns]
+        conn.execute(
+            "CREATE TABLE " + _quote(table) + " ("
+            + ", ".join(columns_sql)
+            + ", PRIMARY KEY (" + ", ".join(_quote(column) for column in primary_key) + "))"
+        )
+        return
+
+    # New columns of the dataset are added, the rows loaded before get NULL
+    for column in df.columns:
+        if column not in existing_columns:
+            logger.info("%s: adding column %s", table, column)
+            conn.execute(
+                "ALTER TABLE " + _quote(table) + " ADD COLUMN " + _quote(column) + " " + _sql_type(df[column].dtype)
+            )
+
+
+def _create_loads_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS " + LOADS_TABLE
+        + " (table_name TEXT PRIMARY KEY, fingerprint TEXT, loaded_at TEXT)"
+    )
+
+
+def is_loaded(warehouse_path: Union[str, Path], table: str, fingerprint: Optional[str]) -> bool:
+    """Tell whether the last load of a table was the dataset file of this fingerprint."""
+    if fingerprint is None or not Path(warehouse_path).exists():
+        return False
+    with connect(warehouse_path) as conn:
+        _create_loads_table(conn)
+        row = conn.execute("SELECT fingerprint FROM " + LOADS_TABLE + " WHERE table_name = ?", (table,)).fetchone()
+    return row is not None and row[0] == fingerprint
+
+
+def load_table(
+        df: pd.DataFrame,
+        warehouse_path: Union[str, Path],
+        table: str,
+        primary_key: List[str],
+        indexes: List[List[str]] = (),
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fingerprint: Optional[str] = None,
+        seasons: Optional[Iterable[int]] = None
+        ) -> int:
+    """
+    Replace the rows of some seasons of a table of the warehouse with a dataframe.
+
+    The table is created from the dtypes of the dataframe on the first load.
+    The rows of the seasons loaded are deleted, then the rows of the dataframe
+    are upserted in batches of ``batch_size`` rows, inside one transaction.
+
+    Args:
+        df (pd.DataFrame): Rows to load, unique on the primary key.
+        warehouse_path (Path): SQLite database file.
+        table (str): Name of the table.
+        primary_key (list): Columns of the primary key.
+        indexes (list): Columns of every secondary index.
+        batch_size (int): Number of rows per executemany.
+        fingerprint (str): Fingerprint of the dataset file loaded, recorded for is_loaded.
+        seasons (list): Seasons of the rows loaded, their rows missing from df are deleted and the other
+            seasons are kept. None for a full load, which replaces every row of the table.
+    Returns:
+        int: Number of rows of the table after the load.
+    """
+    duplicated = df.duplicated(subset=primary_key).sum()
+    if duplicated > 0:
+        raise ValueError(table + ": " + str(duplicated) + " rows share their primary key " + ", ".join(primary_key))
+
+    columns = [_quote(column) for column in df.columns]
+    updated_columns = [column for column in df.columns if column not in primary_key]
+    upsert_sql = (
+        "INSERT INTO " + _quote(table) + " (" + ", ".join(columns) + ")"
+        + " VALUES (" + ", ".join("?" * len(columns)) + ")"
+        + " ON CONFLICT (" + ", ".join(_quote(column) for column in primary_key) + ")"
+        + (
+            " DO UPDATE SET " + ", ".join(_quote(column) + " = excluded." + _quote(column) for column in updated_columns)
+            if updated_columns else " DO NOTHING"
+        )
+    )
+
+    with connect(warehouse_path) as conn:
+        _create_table(conn, table, df, primary_key)
+
+        # The rows removed from the seasons loaded, e.g. a corrected game, must not stay in the table
+        if seasons is None:
+            nb_deleted = conn.execute("DELETE FROM " + _quote(table)).rowcount
+        else:
+            seasons = [int(season) for season in seasons]
+            nb_deleted = conn.execute(
+                "DELETE FROM " + _quote(table) + " WHERE " + _quote(SEASON_COLUMN)
+                + " IN (" + ", ".join("?" * len(seasons)) + ")",
+                seasons,
+            ).rowcount if seasons else 0
+
+        for start in range(0, len(df), batch_size):
+            conn.executemany(upsert_sql, _sql_rows(df.iloc[start:start + batch_size]))
+
+        for index_columns in indexes:
+            index_name = table + "_" + "_".join(index_columns)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS " + _quote(index_name) + " ON " + _quote(table)
+                + " (" + ", ".join(_quote(column) for column in index_columns) + ")"
+            )
+
+        nb_rows = conn.execute("SELECT COUNT(*) FROM " + _quote(table)).fetchone()[0]
+
+        _create_loads_table(conn)
+        conn.execute(
+            "INSERT INTO " + LOADS_TABLE + " (table_name, fingerprint, loaded_at) VALUES (?, ?, datetime('now'))"
+            " ON CONFLICT (table_name) DO UPDATE SET fingerprint = excluded.fingerprint, loaded_at = excluded.loaded_at",
+            (table, fingerprint),
+        )
+
+    logger.info(
+        "%s: %s rows deleted, %s rows upserted, %s rows in %s", table, nb_deleted, len(df), nb_rows, warehouse_path
+    )
+    return nb_rows
+
+
+def load_dataset(
+        df: pd.DataFrame,
+        warehouse_path: Union[str, Path],
+        schema: str,
+        table: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fingerprint: Optional[str] = None,
+        seasons: Optional[Iterable[int]] = None
+        ) -> int:
+    """
+    Load a unified dataset into its table, with the keys of WAREHOUSE_TABLES, see load_table.
+
+    Args:
+        df (pd.DataFrame): Unified dataset.
+        warehouse_path (Path): SQLite database file.
+        schema (str): Dataset of WAREHOUSE_TABLES, e.g. 'gamelog_schedule_unified'.
+        table (str): Name of the table.
+        batch_size (int): Number of rows per executemany.
+        fingerprint (str): Fingerprint of the dataset file loaded, recorded for is_loaded.
+        seasons (list): Seasons replaced by the load, None to replace the whole table.
+    Returns:
+        int: Number of rows of the table after the load.
+    """
+    if schema not in WAREHOUSE_TABLES:
+        raise ValueError(
+            "schema value provided is not supported. Accepted values are: "
+            + ", ".join("'" + name + "'" for name in WAREHOUSE_TABLES)
+        )
+    return load_table(
+        df,
+        warehouse_path,
+        table,
+        primary_key=WAREHOUSE_TABLES[schema]["primary_key"],
+        indexes=WAREHOUSE_TABLES[schema]["indexes"],
+        batch_size=batch_size,
+        fingerprint=fingerprint,
+        seasons=seasons,
+    )
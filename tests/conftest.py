@@ -0,0 +1,24 @@
+import pytest
+
+from src.utils.http_client import get_http_client
+from tests.replay_server import ORIGINS, ReplayServer
+
+
+@pytest.fixture
+def replay_server():
+    """
+    Start a ReplayServer and send the requests of the shared HttpClient to it.
+
+    Latency and errors can be configured on the yielded server, e.g.
+    replay_server.latency = 0.1 or replay_server.error_every = 3.
+    """
+    client = get_http_client()
+
+    with ReplayServer() as server:
+        for origin in ORIGINS:
+            client.override_host(origin, server.url)
+        try:
+            yield server
+        finally:
+            for origin in ORIGINS:
+                client.override_host(origin, None)
@@ -0,0 +1,152 @@
+"""Local stand-in of the scrapped websites serving the recorded pages of tests/fixtures/pages."""
+
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(__file__), "fixtures", "pages")
+
+# Origins of the scrapped websites, to override in the HttpClient
+ORIGINS = ["http://www.espn.com", "https://www.basketball-reference.com"]
+
+ROUTES = [
+    (re.compile(r"^/nba/salaries/_/year/(?P<season>\d+)/seasontype/?$"), "espn/salaries_{season}_page_1.html"),
+    (re.compile(r"^/nba/salaries/_/year/(?P<season>\d+)/page/(?P<page>\d+)$"), "espn/salaries_{season}_page_{page}.html"),
+    (re.compile(r"^/teams/(?P<team>[A-Z]+)/(?P<season>\d+)/gamelog/?$"), "basketball_reference/{team}_{season}_gamelog.html"),
+    (re.compile(r"^/teams/(?P<team>[A-Z]+)/(?P<season>\d+)_games\.html$"), "basketball_reference/{team}_{season}_schedule.html"),
+    (re.compile(r"^/teams/(?P<team>[A-Z]+)/(?P<season>\d+)\.html$"), "basketball_reference/{team}_{season}_player_attributes.html"),
+]
+
+
+class ReplayServer:
+    """
+    Threaded HTTP server answering the salary, gamelog, schedule and player
+    attributes urls with the recorded pages.
+
+    Attributes, changeable while the server runs:
+        latency (float): Seconds waited before answering each request.
+        error_status (int): Status code of the injected errors.
+        error_every (int): Answer every n-th request with error_status, 0 to disable.
+        fail_first (int): Answer the first n requests with error_status.
+        fallback_team (str): Team whose pages are served for teams without recorded pages, None for a 404.
+        fallback_season (int): Season whose pages are served for seasons without recorded pages, None for a 404.
+    """
+
+    def __init__(
+            self,
+            fixtures_folder: str = FIXTURES_FOLDER,
+            latency: float = 0.0,
+            error_status: int = 503,
+            error_every: int = 0,
+            fail_first: int = 0,
+            fallback_team: str = None,
+            fallback_season: int = None
+            ) -> None:
+        self.fixtures_folder = fixtures_folder
+        self.latency = latency
+        self.error_status = error_status
+        self.error_every = error_every
+        self.fail_first = fail_first
+        self.fallback_team = fallback_team
+        self.fallback_season = fallback_season
+
+        self.nb_requests = 0
+        self.nb_errors = 0
+        self.max_concurrency = 0
+        self._concurrency = 0
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return "http://127.0.0.1:%s" % self._server.server_port
+
+    def start(self) -> "ReplayServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def find_page(self, path: str):
+        for pattern, file_template in ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+
+            params = match.groupdict()
+            candidates = [params]
+            if self.fallback_season is not None:
+                candidates.append(dict(params, season=self.fallback_season))
+            if self.fallback_team is not None and "team" in params:
+                candidates += [dict(candidate, team=self.fallback_team) for candidate in list(candidates)]
+
+            for candidate in candidates:
+                file_name = os.path.join(self.fixtures_folder, file_template.format(**candidate))
+                if os.path.exists(file_name):
+                    return file_name
+            return None
+        return None
+
+    def _answer(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.nb_requests += 1
+            nb_requests = self.nb_requests
+            self._concurrency += 1
+            self.max_concurrency = max(self.max_concurrency, self._concurrency)
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+
+            inject_error = nb_requests <= self.fail_first or (
+                self.error_every and nb_requests % self.error_every == 0
+            )
+            file_name = None if inject_error else self.find_page(handler.path.split("?")[0])
+
+            if inject_error:
+                with self._lock:
+                    self.nb_errors += 1
+                status, body = self.error_status, b"injected error"
+            elif file_name is None:
+                status, body = 404, b"not found"
+            else:
+                with open(file_name, "rb") as page:
+                    status, body = 200, page.read()
+
+            handler.send_response(status)
+            handler.send_header("Content-Type", "text/html; charset=utf-8")
+            handler.send_header("Content-Length", str(len(body)))
+            if status == 429:
+                handler.send_header("Retry-After", "0")
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self._lock:
+                self._concurrency -= 1
+
+    def _handler_class(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._answer(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ReplayHandler
@@ -0,0 +1,137 @@
+from unittest import TestCase
+from unittest.mock import patch
+import os
+import threading
+import time
+import requests
+from src.utils import basketball_reference
+from src.utils.rate_limiter import CircuitOpenError
+
+FIXTURES_FOLDER = 'tests/fixtures/pages/basketball_reference'
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+
+class FixtureHttpClient:
+    """Serve the recorded team pages, ATL slower than the other teams."""
+
+    def __init__(self):
+        self.urls = []
+        self.lock = threading.Lock()
+        # Status code or exception of the teams failing
+        self.errors = {}
+
+    def get(self, url, headers=None):
+        with self.lock:
+            self.urls.append(url)
+        team, season, page = url.replace("_games.html", "/schedule").split("/teams/")[1].split("/")
+        if team == "ATL":
+            time.sleep(0.05)
+        error = self.errors.get(team)
+        if isinstance(error, Exception):
+            raise error
+        if error is not None:
+            return FakeResponse(error)
+        file_name = os.path.join(FIXTURES_FOLDER, team + "_" + season + "_" + page + ".html")
+        if not os.path.exists(file_name):
+            return FakeResponse(404)
+        with open(file_name, "rb") as html:
+            return FakeResponse(200, html.read())
+
+
+class TestBasketballReference(TestCase):
+    def setUp(self) -> None:
+        self.client = FixtureHttpClient()
+
+    def test_fan_out_teams_keeps_team_order(self):
+
+        with patch.object(basketball_reference, "get_http_client", return_value=self.client):
+            gamelog_df = basketball_reference.fan_out_teams(
+                data_type='gamelog',
+                season=2024,
+                team=['ATL', 'BOS', 'SEA'],
+                max_workers=3,
+                requests_per_second=100,
+            )
+
+        config = basketball_reference.get_webscrapper_config()
+
+        assert len(self.client.urls) == 3
+        assert list(gamelog_df.columns) == config['gamelog']['list_columns_to_select']
+        # ATL answers last but stays first, SEA does not exist in 2024
+        assert list(gamelog_df['tm'].unique()) == ['ATL', 'BOS']
+        assert len(gamelog_df) == 24
+
+    def test_fan_out_teams_w_no_data(self):
+
+        with patch.object(basketball_reference, "get_http_client", return_value=self.client):
+            schedule_df = basketball_reference.fan_out_teams(
+                data_type='schedule',
+                season=2024,
+                team='SEA',
+                requests_per_second=100,
+            )
+
+        assert schedule_df.empty
+        assert 'streak_w_l' in schedule_df.columns
+
+    def test_failed_team_fails_the_season(self):
+
+        # A 404 is a team missing that season, the other errors are not skipped
+        for error, expected_exception in [(503, requests.HTTPError), (CircuitOpenError("circuit open"), CircuitOpenError)]:
+            self.client.errors = {"BOS": error}
+
+            with patch.object(basketball_reference, "get_http_client", return_value=self.client):
+                with self.assertRaises(expected_exception):
+                    basketball_reference.fan_out_teams(
+                        data_type='gamelog',
+                        season=2024,
+                        team=['ATL', 'BOS', 'SEA'],
+                        max_workers=3,
+                        requests_per_second=100,
+                    )
+
+    def test_missing_page_of_a_team_that_played_fails_the_season(self):
+
+        # BOS played in 2024, its 404 is e.g. a page missing from an archive
+        self.client.errors = {"BOS": 404}
+
+        with patch.object(basketball_reference, "get_http_client", return_value=self.client):
+            with self.assertRaises(requests.HTTPError):
+                basketball_reference.fan_out_teams(
+                    data_type='schedule',
+                    season=2024,
+                    team=['ATL', 'BOS'],
+                    requests_per_second=100,
+                )
+
+    def test_all_teams_only_requests_the_teams_of_the_season(self):
+
+        self.client.errors = {team: 503 for team in ["CHA", "CHH", "NJN", "NOH", "NOK", "SEA", "VAN"]}
+        self.client.errors.update({team: 404 for team in basketball_reference.get_team_abbreviations(2024)})
+
+        with patch.object(basketball_reference, "get_http_client", return_value=self.client):
+            with self.assertRaises(requests.HTTPError):
+                basketball_reference.fan_out_teams(data_type='gamelog', season=2024, requests_per_second=1000)
+
+        assert len(self.client.urls) == 30
+        assert not any("/SEA/" in url for url in self.client.urls)
+
+    def test_unsupported_request_is_rejected(self):
+
+        for data_type, season, team in [
+            ('boxscore', 2024, 'ATL'),
+            ('gamelog', 1990, 'ATL'),
+            ('gamelog', '2024', 'ATL'),
+            ('gamelog', 2024, 'XYZ'),
+            ('gamelog', 2024, ['ATL', 'all']),
+        ]:
+            with patch.object(basketball_reference, "get_http_client", return_value=self.client):
+                with self.assertRaises(ValueError):
+                    basketball_reference.fan_out_teams(data_type=data_type, season=season, team=team)
+
+        assert self.client.urls == []
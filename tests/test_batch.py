@@ -0,0 +1,43 @@
+from unittest import TestCase
+import threading
+from src.utils import batch
+
+
+class TestBatch(TestCase):
+
+    def test_parse_seasons_w_ranges(self):
+
+        assert batch.parse_seasons(2024) == [2024]
+        assert batch.parse_seasons(["2026", "2023-2025", 2024]) == [2023, 2024, 2025, 2026]
+
+    def test_parse_seasons_w_decreasing_range(self):
+
+        with self.assertRaises(ValueError):
+            batch.parse_seasons("2026-1990")
+
+    def test_run_for_seasons_runs_every_season(self):
+
+        seasons_done = []
+        lock = threading.Lock()
+
+        def acquisition(season, output_folder):
+            with lock:
+                seasons_done.append((season, output_folder))
+
+        batch.run_for_seasons(acquisition, seasons=[2022, 2023, 2024], max_workers=2, output_folder='out')
+
+        assert sorted(seasons_done) == [(2022, 'out'), (2023, 'out'), (2024, 'out')]
+
+    def test_run_for_seasons_reports_failed_seasons(self):
+
+        seasons_done = []
+
+        def acquisition(season):
+            if season == 2023:
+                raise ValueError("no data")
+            seasons_done.append(season)
+
+        with self.assertRaisesRegex(RuntimeError, "2023"):
+            batch.run_for_seasons(acquisition, seasons=[2022, 2023, 2024], max_workers=1)
+
+        assert sorted(seasons_done) == [2022, 2024]
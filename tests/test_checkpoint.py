@@ -0,0 +1,89 @@
+from unittest import TestCase
+from unittest.mock import patch
+import os
+import shutil
+import pandas as pd
+from src.exctract import player_salary_data_acquisition
+from src.utils import checkpoint
+
+
+def fake_scrape_page(url, cache=None, ttl=None):
+    page_number = 1 if url.endswith("/seasontype/") else int(url.rsplit("/", 1)[-1])
+    rank = str(page_number)
+    page = {
+        "RK": [page_number],
+        "NAME": ["Player " + rank + ", PG"],
+        "TEAM": ["Atlanta Hawks"],
+        "SALARY": ["$1,00" + rank],
+    }
+    return page, 4
+
+
+def failing_scrape_page(url, cache=None, ttl=None):
+    if url.endswith("/page/3"):
+        raise ConnectionError("connection reset")
+    return fake_scrape_page(url, cache=cache, ttl=ttl)
+
+
+class TestCheckpoint(TestCase):
+    def setUp(self) -> None:
+        self.checkpoint_dir = 'tests/test_output/checkpoints'
+        self.output_folder = 'tests/test_output/checkpointed/'
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+
+    def test_units_are_only_fetched_once(self):
+
+        season_checkpoint = checkpoint.Checkpoint(self.checkpoint_dir, "gamelog_2024_all")
+        season_checkpoint.run("team_ATL", lambda: pd.DataFrame({"tm": ["ATL"]}))
+        season_checkpoint.run("team_BOS", lambda: pd.DataFrame(), keep=lambda df: not df.empty)
+
+        resumed_checkpoint = checkpoint.Checkpoint(self.checkpoint_dir, "gamelog_2024_all", resume=True)
+
+        assert resumed_checkpoint.is_done("team_ATL")
+        assert not resumed_checkpoint.is_done("team_BOS")
+        assert list(resumed_checkpoint.run("team_ATL", lambda: None)["tm"]) == ["ATL"]
+
+        # Without resume the checkpoints of the previous run are cleared
+        assert not checkpoint.Checkpoint(self.checkpoint_dir, "gamelog_2024_all").is_done("team_ATL")
+
+    def test_resumed_salary_acquisition_only_fetches_missing_pages(self):
+
+        with patch.object(player_salary_data_acquisition, "scrape_page", side_effect=failing_scrape_page):
+            with self.assertRaises(ConnectionError):
+                player_salary_data_acquisition.player_salary_data_acquisition(
+                    season=2019,
+                    output_folder=self.output_folder,
+                    max_workers=1,
+                    requests_per_second=100,
+                    checkpoint_dir=self.checkpoint_dir,
+                )
+
+        # No partial output is left behind by the failed run
+        assert not os.path.exists(self.output_folder + 'player_salary_2019.parquet')
+
+        with patch.object(player_salary_data_acquisition, "scrape_page", side_effect=fake_scrape_page) as scrape_page_mock:
+            player_salary_data_acquisition.player_salary_data_acquisition(
+                season=2019,
+                output_folder=self.output_folder,
+                max_workers=1,
+                requests_per_second=100,
+                checkpoint_dir=self.checkpoint_dir,
+                resume=True,
+            )
+
+            fetched_urls = [call.args[0] for call in scrape_page_mock.call_args_list]
+            assert all(url.endswith("/page/3") or url.endswith("/page/4") for url in fetched_urls)
+
+            player_salary_df = pd.read_parquet(self.output_folder + 'player_salary_2019.parquet')
+            assert list(player_salary_df["RK"]) == [1, 2, 3, 4]
+
+            # The season is complete, a new resumed run skips it
+            scrape_page_mock.reset_mock()
+            player_salary_data_acquisition.player_salary_data_acquisition(
+                season=2019,
+                output_folder=self.output_folder,
+                checkpoint_dir=self.checkpoint_dir,
+                resume=True,
+            )
+            assert scrape_page_mock.call_count == 0
@@ -0,0 +1,76 @@
+from unittest import TestCase
+import threading
+from src.utils.dag import Dag
+
+
+class TestDag(TestCase):
+    def setUp(self) -> None:
+        self.calls = []
+
+        def _task(name, value):
+            def _run(*inputs):
+                self.calls.append(name)
+                return value + sum(inputs)
+            return _run
+
+        self.dag = Dag()
+        # Added before their inputs, as the stages of dvc.yaml are not in the graph order
+        self.dag.add("unification", _task("unification", 100), inputs=["gamelog", "schedule"])
+        self.dag.add("cleaning", _task("cleaning", 10), inputs=["gamelog"])
+        self.dag.add("gamelog", _task("gamelog", 1))
+        self.dag.add("schedule", _task("schedule", 2))
+
+    def test_tasks_run_after_their_inputs_with_their_results(self):
+
+        results = self.dag.run()
+
+        assert self.calls.index("gamelog") < self.calls.index("cleaning")
+        assert self.calls.index("schedule") < self.calls.index("unification")
+        # Only the results no task reads are kept
+        assert results == {"unification": 103, "cleaning": 11}
+
+    def test_targets_only_run_their_dependencies(self):
+
+        assert self.dag.run(targets=["cleaning"]) == {"cleaning": 11}
+        assert self.calls == ["gamelog", "cleaning"]
+
+    def test_cycles_and_unknown_tasks_fail_before_running(self):
+
+        self.dag.add("load", lambda *inputs: None, inputs=["unification", "report"])
+        with self.assertRaisesRegex(ValueError, "report is not in the graph"):
+            self.dag.run()
+
+        self.dag.add("report", lambda *inputs: None, inputs=["load"])
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            self.dag.run()
+        assert self.calls == []
+
+    def test_independent_branches_run_concurrently(self):
+
+        branches = threading.Barrier(2, timeout=5)
+
+        def _acquisition(value):
+            def _run():
+                # Both acquisitions have to be running at the same time to pass the barrier
+                branches.wait()
+                return value
+            return _run
+
+        dag = Dag()
+        dag.add("gamelog", _acquisition(1))
+        dag.add("salary", _acquisition(2))
+        dag.add("gamelog_cleaning", lambda gamelog: gamelog * 10, inputs=["gamelog"])
+
+        assert dag.run(max_workers=4) == {"gamelog_cleaning": 10, "salary": 2}
+
+    def test_failed_task_does_not_stop_the_other_branches(self):
+
+        def _fail():
+            raise ValueError("schedule page changed")
+
+        self.dag.add("failing_schedule", _fail)
+        self.dag.add("schedule_cleaning", lambda schedule: schedule, inputs=["failing_schedule"])
+
+        with self.assertRaisesRegex(RuntimeError, "tasks failed: failing_schedule, not run: schedule_cleaning"):
+            self.dag.run(max_workers=2)
+        assert sorted(self.calls) == ["cleaning", "gamelog", "schedule", "unification"]
@@ -0,0 +1,27 @@
+from unittest import TestCase
+import pandas as pd
+from src.utils import fingerprints
+
+
+class TestFingerprints(TestCase):
+    def setUp(self) -> None:
+        self.gamelog_df = pd.DataFrame(
+            {
+                "game_date": ["2023-10-25", "2023-10-27"],
+                "tm": ["ATL", "ATL"],
+                "pts_tm": ["110", "121"],
+            }
+        )
+
+    def test_fingerprint_ignores_row_order_column_order_and_dtypes(self):
+
+        read_back_df = pd.DataFrame(
+            {
+                "pts_tm": [121, 110],
+                "tm": ["ATL", "ATL"],
+                "game_date": pd.to_datetime(["2023-10-27", "2023-10-25"]),
+            }
+        )
+
+        assert fingerprints.frame_fingerprint(self.gamelog_df) == fingerprints.frame_fingerprint(read_back_df)
+        assert fingerprints.frame_fingerprint(self.gamelog_df) != fingerprints.frame_fingerprint(self.gamelog_df.head(1))
@@ -0,0 +1,36 @@
+from unittest import TestCase
+import pandas as pd
+from src.utils import game_keys
+
+
+class TestGameKeys(TestCase):
+    def setUp(self) -> None:
+        self.gamelog_df = pd.DataFrame(
+            {
+                "game_date": pd.to_datetime(["2023-10-27", "2023-10-27", "2023-10-29", None]),
+                "tm": pd.Categorical(["ATL", "CHO", "ATL", "ATL"]),
+                "opp": pd.Categorical(["CHO", "ATL", "NYK", "BOS"]),
+                "extdom": ["dom", "ext", "ext", "dom"],
+            }
+        )
+
+    def test_both_rows_of_a_game_share_its_key(self):
+
+        keys = game_keys.gamelog_game_keys(self.gamelog_df)
+
+        assert keys.dtype == "Int64"
+        assert keys.iloc[0] == keys.iloc[1]
+        assert keys.iloc[0] != keys.iloc[2]
+        assert keys.isna().tolist() == [False, False, False, True]
+
+        # The key does not depend on the categories of the teams
+        object_df = self.gamelog_df.astype({"tm": object, "opp": object})
+        pd.testing.assert_series_equal(game_keys.gamelog_game_keys(object_df), keys)
+
+    def test_readable_id_is_built_from_the_key(self):
+
+        gamelog_df = self.gamelog_df.assign(game_key=game_keys.gamelog_game_keys(self.gamelog_df))
+
+        assert game_keys.with_game_id(gamelog_df)["id"].tolist() == [
+            "2023-10-27_CHO_ATL", "2023-10-27_CHO_ATL", "2023-10-29_ATL_NYK", None
+        ]
@@ -1,14 +1,20 @@
 from unittest import TestCase
 import os
-from src.exctract import gamelog_data_acquisition
 import shutil
+import pytest
+from src.exctract import gamelog_data_acquisition
 
 class TestGamelogDataAcquisition(TestCase):
+    @pytest.fixture(autouse=True)
+    def _replay_server(self, replay_server):
+        self.replay_server = replay_server
+
     def setUp(self) -> None:
         self.data_type = 'gamelog'
         self.season = 2024
         self.team = 'ATL'
-        self.output_folder = 'tests/test_output'
+        self.output_folder = 'tests/test_output/gamelog_data_acquisition'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
 
     def test_gamelog_data_acquisition_w_all_args(self):
 
@@ -17,6 +23,8 @@ class TestGamelogDataAcquisition(TestCase):
                 season=self.season,
                 team=self.team,
                 output_folder=self.output_folder,
+                team_fan_out=True,
+                requests_per_second=1000,
         )
 
         unified_file_path_name = (
@@ -28,27 +36,21 @@ class TestGamelogDataAcquisition(TestCase):
             + str(self.season)
             + "_"
             + self.team
-            + ".csv"
+            + ".parquet"
         )
 
         assert os.path.exists(unified_file_path_name)
+        assert self.replay_server.nb_requests == 1
 
     def test_gamelog_data_acquisition_w_team_args(self):
 
-        gamelog_data_acquisition.gamelog_data_acquisition(
-            team = 'ATL'
-        )
-
-        unified_file_path_name = (
-            'pipeline_output/gamelog'
-            +
-            '/'
-            + 'gamelog'
-            + "_"
-            + '2024'
-            + "_"
-            + 'ATL'
-            + ".csv"
+        gamelog_df = gamelog_data_acquisition.gamelog_data_acquisition(
+            team = 'ATL',
+            output_folder=None,
+            team_fan_out=True,
+            requests_per_second=1000,
         )
 
-        assert os.path.exists(unified_file_path_name)
\ No newline at end of file
+        assert list(gamelog_df['tm'].unique()) == ['ATL']
+        assert set(gamelog_df['id_season']) == {2024}
+        assert not os.path.exists(self.output_folder)
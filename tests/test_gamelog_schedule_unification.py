@@ -1,8 +1,38 @@
 from unittest import TestCase
 import os
+import pandas as pd
 from src.transform import gamelog_schedule_unification
+from src.utils import schemas, storage
 import shutil
 
+
+def _games(teams, pts):
+    """Gamelog and schedule rows of a home game of ATL against BOS, for some of the two teams."""
+    gamelog_rows = {
+        "ATL": {"extdom": "", "tm": "ATL", "opp": "BOS", "results": "W"},
+        "BOS": {"extdom": "@", "tm": "BOS", "opp": "ATL", "results": "L"},
+    }
+    gamelog_df = pd.DataFrame([gamelog_rows[team] for team in teams])
+    for column, dtype in schemas.GAMELOG_SCHEMA.items():
+        if column not in gamelog_df.columns:
+            gamelog_df[column] = 0.5 if dtype == "float64" else 10
+    gamelog_df = gamelog_df.assign(id_season=2024, game_nb=1, game_date="2023-10-25", pts_tm=pts)
+
+    schedule_df = pd.DataFrame(
+        {
+            "id_season": 2024,
+            "tm": teams,
+            "game_date": "2023-10-25",
+            "time_start": "7:30p",
+            "overtime": "",
+            "w_tot": 1,
+            "l_tot": 0,
+            "streak_w_l": "W 1",
+        }
+    )
+    return gamelog_df, schedule_df
+
+
 class TestGamelogScheduleUnification(TestCase):
     def setUp(self) -> None:
         self.unified_file_path = './tests/test_output/'
@@ -15,11 +45,11 @@ class TestGamelogScheduleUnification(TestCase):
     def test_gamelog_schedule_unification_w_args(self):
 
         # Check if the file exists before attempting to delete it
-        if os.path.exists(self.unified_file_path + self.unified_file_name + '.csv'):
+        if os.path.exists(self.unified_file_path + self.unified_file_name + '.parquet'):
             shutil.rmtree(self.unified_file_path)
-            print(f"The file {self.unified_file_path + self.unified_file_name + '.csv'} has been deleted.")
+            print(f"The file {self.unified_file_path + self.unified_file_name + '.parquet'} has been deleted.")
         else:
-            print(f"The file {self.unified_file_path + self.unified_file_name + '.csv'} does not exist.")
+            print(f"The file {self.unified_file_path + self.unified_file_name + '.parquet'} does not exist.")
 
         gamelog_schedule_unification.gamelog_schedule_unification(
                 unified_file_path=self.unified_file_path,
@@ -37,4 +67,29 @@ class TestGamelogScheduleUnification(TestCase):
         # unified_file_path: Path ='pipeline_output/final/',
         # unified_file_name: str = 'nba_games_training_dataset'
 
-        assert os.path.exists(self.unified_file_path + self.unified_file_name + '.csv') is True
+        assert os.path.exists(self.unified_file_path + self.unified_file_name + '.parquet') is True
+
+    def test_unification_filtered_by_team_keeps_the_other_teams(self):
+
+        output_folder = './tests/test_output/unification_teams/'
+        shutil.rmtree(output_folder, ignore_errors=True)
+
+        gamelog_df, schedule_df = _games(["ATL", "BOS"], pts=100)
+        gamelog_schedule_unification.gamelog_schedule_unification(
+            unified_file_path=output_folder,
+            unified_file_name=self.unified_file_name,
+            gamelog_df=gamelog_df,
+            schedule_df=schedule_df,
+        )
+
+        gamelog_df, schedule_df = _games(["BOS"], pts=120)
+        gamelog_schedule_unification.gamelog_schedule_unification(
+            unified_file_path=output_folder,
+            unified_file_name=self.unified_file_name,
+            teams=["BOS"],
+            gamelog_df=gamelog_df,
+            schedule_df=schedule_df,
+        )
+
+        unified_df = storage.read_frame(output_folder + self.unified_file_name + '.parquet', schema="gamelog_schedule_unified")
+        assert sorted(unified_df[["tm", "pts_tm"]].astype(object).values.tolist()) == [["ATL", 100], ["BOS", 120]]
@@ -0,0 +1,115 @@
+from unittest import TestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import pytest
+from src.utils import http_client, rate_limiter
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    nb_requests = 0
+
+    def do_GET(self):
+        FlakyHandler.nb_requests += 1
+        status, body = (503, b"busy") if FlakyHandler.nb_requests == 1 else (200, b"ok")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FailingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    nb_requests = 0
+    status = 429
+
+    def do_GET(self):
+        FailingHandler.nb_requests += 1
+        body = b"failing"
+        self.send_response(FailingHandler.status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpClient(TestCase):
+    def setUp(self) -> None:
+        FlakyHandler.nb_requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%s/page" % self.server.server_port
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_http_client_retries_and_calls_hook(self):
+
+        retries = []
+
+        with http_client.HttpClient(
+            backoff_factor=0,
+            on_retry=lambda **kwargs: retries.append(kwargs["response"].status),
+        ) as client:
+            response = client.get(self.url)
+
+        assert response.status_code == 200
+        assert response.content == b"ok"
+        assert retries == [503]
+
+    def test_http_client_sends_default_headers(self):
+
+        client = http_client.HttpClient()
+
+        assert "gzip" in client.session.headers["Accept-Encoding"]
+        assert client.session.headers["User-Agent"] == http_client.DEFAULT_HEADERS["User-Agent"]
+
+    def test_shared_http_client_is_a_singleton(self):
+
+        assert http_client.get_http_client() is http_client.get_http_client()
+
+
+class TestHttpClientRateLimiter(TestCase):
+    def setUp(self) -> None:
+        FailingHandler.nb_requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FailingHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%s/page" % self.server.server_port
+        self.limiter = rate_limiter.get_host_rate_limiter(self.url, requests_per_second=1000, burst=10)
+
+    def tearDown(self) -> None:
+        with rate_limiter._HOST_RATE_LIMITERS_LOCK:
+            rate_limiter._HOST_RATE_LIMITERS.pop("127.0.0.1:%s" % self.server.server_port, None)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retries_of_a_throttled_host_wait_for_the_rate_limiter(self):
+
+        FailingHandler.status = 429
+
+        with http_client.HttpClient(max_retries=3, backoff_factor=0, on_retry=None) as client:
+            response = client.get(self.url)
+
+        assert response.status_code == 429
+        assert FailingHandler.nb_requests == 4
+        assert self.limiter.metrics()["requests"] == 4
+        assert self.limiter.metrics()["throttled"] == 4
+
+    def test_retries_stop_when_the_circuit_opens(self):
+
+        FailingHandler.status = 503
+        self.limiter.failure_threshold = 2
+
+        with http_client.HttpClient(max_retries=3, backoff_factor=0, on_retry=None) as client:
+            with pytest.raises(rate_limiter.CircuitOpenError):
+                client.get(self.url)
+
+        assert FailingHandler.nb_requests == 2
@@ -0,0 +1,111 @@
+from unittest import TestCase
+import os
+import pandas as pd
+from src.utils import incremental
+
+
+class TestIncremental(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/incremental'
+        os.makedirs(self.output_folder, exist_ok=True)
+        self.gamelog_path = self.output_folder + '/gamelog_2026_all.csv'
+        self.schedule_path = self.output_folder + '/schedule_2026_all.csv'
+        for path in [self.gamelog_path, self.schedule_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.gamelog_df = pd.DataFrame(
+            {
+                "id_season": [2026, 2026, 2026],
+                "game_date": ["2025-10-22", "2025-10-24", "2025-10-23"],
+                "tm": ["ATL", "ATL", "BOS"],
+                "pts_tm": ["110", "98", "121"],
+            }
+        )
+        self.schedule_df = pd.DataFrame(
+            {
+                "id_season": [2026, 2026, 2026, 2026],
+                "tm": ["ATL", "ATL", "ATL", "BOS"],
+                "game_date": ["Wed, Oct 22, 2025", "Fri, Oct 24, 2025", "Sun, Oct 26, 2025", "Thu, Oct 23, 2025"],
+                "w_l": ["W", "", "", "L"],
+            }
+        )
+
+    def test_incremental_gamelog_appends_new_games_only(self):
+
+        incremental.incremental_write(self.gamelog_df.iloc[[0, 2]], self.gamelog_path, "gamelog")
+        first_bytes = open(self.gamelog_path, 'rb').read()
+
+        incremental.incremental_write(self.gamelog_df, self.gamelog_path, "gamelog")
+
+        gamelog_df = pd.read_csv(self.gamelog_path, dtype=str)
+        assert list(gamelog_df["game_date"]) == ["2025-10-22", "2025-10-23", "2025-10-24"]
+        # Previous rows are kept byte for byte
+        assert open(self.gamelog_path, 'rb').read().startswith(first_bytes)
+
+    def test_incremental_without_new_games_does_not_rewrite(self):
+
+        incremental.incremental_write(self.gamelog_df, self.gamelog_path, "gamelog")
+        mtime = os.stat(self.gamelog_path).st_mtime_ns
+
+        incremental.incremental_write(self.gamelog_df, self.gamelog_path, "gamelog")
+
+        assert os.stat(self.gamelog_path).st_mtime_ns == mtime
+
+    def test_incremental_schedule_replaces_games_not_played(self):
+
+        incremental.incremental_write(self.schedule_df, self.schedule_path, "schedule", completed_column="w_l")
+
+        self.schedule_df.loc[1, "w_l"] = "L"
+        incremental.incremental_write(self.schedule_df, self.schedule_path, "schedule", completed_column="w_l")
+
+        schedule_df = pd.read_csv(self.schedule_path, dtype=str, keep_default_na=False)
+        assert len(schedule_df) == 4
+        assert list(schedule_df.loc[schedule_df["tm"] == "ATL", "w_l"]) == ["W", "L", ""]
+
+    def test_incremental_schema_change_refreshes(self):
+
+        incremental.incremental_write(self.gamelog_df, self.gamelog_path, "gamelog")
+
+        incremental.incremental_write(self.gamelog_df.assign(pts_opp="100"), self.gamelog_path, "gamelog")
+
+        gamelog_df = pd.read_csv(self.gamelog_path)
+        assert "pts_opp" in gamelog_df.columns
+        assert len(gamelog_df) == 3
+
+    def test_incremental_parquet_appends_new_games_only(self):
+
+        parquet_path = self.output_folder + '/gamelog_2026_all.parquet'
+        if os.path.exists(parquet_path):
+            os.remove(parquet_path)
+
+        incremental.incremental_write(self.gamelog_df.iloc[[0, 2]], parquet_path, "gamelog")
+        incremental.incremental_write(self.gamelog_df, parquet_path, "gamelog")
+
+        gamelog_df = pd.read_parquet(parquet_path)
+        assert list(gamelog_df["game_date"].dt.strftime("%Y-%m-%d")) == ["2025-10-22", "2025-10-23", "2025-10-24"]
+
+    def test_incremental_schedule_refetches_future_game_with_missing_values(self):
+
+        parquet_path = self.output_folder + '/schedule_2026_all.parquet'
+        if os.path.exists(parquet_path):
+            os.remove(parquet_path)
+
+        schedule_df = self.schedule_df.assign(
+            w_l=["W", None, None, "L"],
+            pts_tm=[110.0, float("nan"), float("nan"), 98.0],
+        )
+        incremental.incremental_write(schedule_df, parquet_path, "schedule", completed_column="w_l")
+
+        saved_df = pd.read_parquet(parquet_path)
+        assert saved_df["w_l"].isna().sum() == 2
+        assert str(saved_df["pts_tm"].dtype) == "Int16"
+
+        schedule_df.loc[1, ["w_l", "pts_tm"]] = ["L", 101.0]
+        incremental.incremental_write(schedule_df, parquet_path, "schedule", completed_column="w_l")
+
+        saved_df = pd.read_parquet(parquet_path)
+        assert len(saved_df) == 4
+        atl_df = saved_df[saved_df["tm"] == "ATL"]
+        assert list(atl_df["w_l"].astype(object).fillna("")) == ["W", "L", ""]
+        assert list(atl_df["pts_tm"].astype(object).fillna(0)) == [110, 101, 0]
@@ -0,0 +1,64 @@
+from unittest import TestCase
+import os
+import shutil
+import pandas as pd
+from src.utils import partitions, storage
+
+
+class TestPartitions(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/partitions/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        self.gamelog_df = pd.DataFrame(
+            {
+                "game_date": ["2023-10-25", "2023-10-27"],
+                "tm": ["ATL", "ATL"],
+                "pts_tm": ["110", "121"],
+            }
+        )
+
+    def test_partitions_are_pruned_by_season_and_team(self):
+
+        cleaned_df = pd.DataFrame(
+            {
+                "id_season": [2024, 2024, 2025, 2025],
+                "tm": ["ATL", "BOS", "ATL", "BOS"],
+                "game_date": ["2023-10-25", "2023-10-25", "2024-10-23", "2024-10-22"],
+                "pts_tm": [110, 108, 120, 132],
+            }
+        )
+        dataset_folder = self.output_folder + 'gamelog_cleaned/'
+
+        assert partitions.write_partitions(cleaned_df, dataset_folder) == 4
+        assert os.path.exists(dataset_folder + 'id_season=2025/tm=BOS/part-0.parquet')
+        assert partitions.is_partitioned(dataset_folder)
+
+        # Unchanged partitions are not rewritten
+        assert partitions.write_partitions(cleaned_df, dataset_folder) == 0
+
+        bos_df = partitions.read_dataset(dataset_folder, 'gamelog', seasons=[2025], teams=["BOS"])
+        assert bos_df.to_dict("records") == [
+            {"game_date": "2024-10-22", "pts_tm": 132, "id_season": 2025, "tm": "BOS"}
+        ]
+
+        all_df = partitions.read_partitions(dataset_folder, columns=["id_season", "tm", "pts_tm"])
+        pd.testing.assert_frame_equal(all_df, cleaned_df[["id_season", "tm", "pts_tm"]])
+
+        # A team missing from the rewritten season is removed, the other seasons are kept
+        partitions.write_partitions(cleaned_df[cleaned_df["tm"] != "BOS"].iloc[1:], dataset_folder)
+        assert not os.path.exists(dataset_folder + 'id_season=2025/tm=BOS')
+        assert os.path.exists(dataset_folder + 'id_season=2024/tm=BOS')
+
+    def test_season_files_are_pruned_by_name(self):
+
+        for season in [2024, 2025]:
+            storage.write_frame(
+                self.gamelog_df.assign(id_season=season),
+                self.output_folder + 'gamelog_' + str(season) + '_all.parquet',
+            )
+        storage.write_frame(self.gamelog_df, self.output_folder + 'gamelog_20250_all.parquet')
+
+        assert storage.find_dataset_files(self.output_folder, 'gamelog', seasons=[2025]) == [
+            self.output_folder + 'gamelog_2025_all.parquet'
+        ]
+        assert partitions.read_dataset(self.output_folder, 'gamelog', seasons=[2024], teams=["BOS"]).empty
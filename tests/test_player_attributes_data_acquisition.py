@@ -1,13 +1,20 @@
 from unittest import TestCase
 import os
+import shutil
+import pytest
 from src.exctract import player_attributes_data_acquisition
 
 class TestPlayerAttributesDataAcquisition(TestCase):
+    @pytest.fixture(autouse=True)
+    def _replay_server(self, replay_server):
+        self.replay_server = replay_server
+
     def setUp(self) -> None:
         self.data_type = 'player_attributes'
         self.season = 2024
         self.team = 'ATL'
-        self.output_folder = 'tests/test_output'
+        self.output_folder = 'tests/test_output/player_attributes_data_acquisition'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
 
     def test_player_attributes_data_acquisition_w_all_args(self):
 
@@ -16,6 +23,8 @@ class TestPlayerAttributesDataAcquisition(TestCase):
                 season=self.season,
                 team=self.team,
                 output_folder=self.output_folder,
+                team_fan_out=True,
+                requests_per_second=1000,
         )
 
         unified_file_path_name = (
@@ -27,27 +36,21 @@ class TestPlayerAttributesDataAcquisition(TestCase):
             + str(self.season)
             + "_"
             + self.team
-            + ".csv"
+            + ".parquet"
         )
 
         assert os.path.exists(unified_file_path_name)
+        assert self.replay_server.nb_requests == 1
 
     def test_player_attributes_data_acquisition_w_team_args(self):
 
-        player_attributes_data_acquisition.player_attributes_data_acquisition(
-            team = 'ATL'
-        )
-
-        unified_file_path_name = (
-            'pipeline_output/player_attributes'
-            +
-            '/'
-            + 'player_attributes'
-            + "_"
-            + '2024'
-            + "_"
-            + 'ATL'
-            + ".csv"
+        player_attributes_df = player_attributes_data_acquisition.player_attributes_data_acquisition(
+            team = 'ATL',
+            output_folder=None,
+            team_fan_out=True,
+            requests_per_second=1000,
         )
 
-        assert os.path.exists(unified_file_path_name)
\ No newline at end of file
+        assert list(player_attributes_df['tm'].unique()) == ['ATL']
+        assert len(player_attributes_df) > 0
+        assert not os.path.exists(self.output_folder)
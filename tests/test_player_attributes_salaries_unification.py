@@ -17,11 +17,11 @@ class TestPlayerAttributesSalariesUnification(TestCase):
     def test_player_attributes_salaries_unification_w_args(self):
 
         # Check if the file exists before attempting to delete it
-        if os.path.exists(self.output_dest_file_path + self.output_file_name + '.csv'):
+        if os.path.exists(self.output_dest_file_path + self.output_file_name + '.parquet'):
             shutil.rmtree(self.output_dest_file_path)
-            print(f"The file {self.output_dest_file_path + self.output_file_name + '.csv'} has been deleted.")
+            print(f"The file {self.output_dest_file_path + self.output_file_name + '.parquet'} has been deleted.")
         else:
-            print(f"The file {self.output_dest_file_path + self.output_file_name + '.csv'} does not exist.")
+            print(f"The file {self.output_dest_file_path + self.output_file_name + '.parquet'} does not exist.")
 
         player_attributes_salaries_unification.player_attributes_salaries_unification(
             schedule_data_path=self.schedule_data_path,
@@ -34,4 +34,4 @@ class TestPlayerAttributesSalariesUnification(TestCase):
             output_file_name = self.output_file_name
         )
 
-        assert os.path.exists(self.output_dest_file_path + self.output_file_name + '.csv') is True
+        assert os.path.exists(self.output_dest_file_path + self.output_file_name + '.parquet') is True
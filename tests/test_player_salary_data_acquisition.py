@@ -0,0 +1,99 @@
+from unittest import TestCase
+import os
+import shutil
+import pandas as pd
+import pytest
+from src.exctract import player_salary_data_acquisition
+from src.utils import schemas
+
+
+class TestPlayerSalaryDataAcquisition(TestCase):
+    @pytest.fixture(autouse=True)
+    def _replay_server(self, replay_server):
+        self.replay_server = replay_server
+
+    def setUp(self) -> None:
+        self.data_type = 'player_salary'
+        self.season = 2019
+        self.output_folder = 'tests/test_output/player_salary_data_acquisition/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+
+    def test_player_salary_data_acquisition_concurrent_pages(self):
+
+        # The pages complete in any order when they are answered after a delay
+        self.replay_server.latency = 0.05
+
+        player_salary_data_acquisition.player_salary_data_acquisition(
+            data_type=self.data_type,
+            season=self.season,
+            output_folder=self.output_folder,
+            max_workers=3,
+            requests_per_second=100,
+        )
+
+        name_and_path_file = self.output_folder + self.data_type + "_" + str(self.season) + ".parquet"
+
+        assert os.path.exists(name_and_path_file)
+        assert self.replay_server.nb_requests == 3
+
+        player_salary_df = pd.read_parquet(name_and_path_file)
+
+        # Pages are merged in page order whatever their completion order
+        assert list(player_salary_df["RK"]) == list(range(1, 121))
+        assert not player_salary_df["name"].str.contains(",").any()
+        assert player_salary_df["salary"].dtype == "Int64"
+
+    def test_normalize_player_salaries_blank_salary(self):
+
+        player_salary_df = pd.DataFrame(
+            {
+                "NAME": ["Stephen Curry, PG", "D'Angelo Russell, PG"],
+                "SALARY": ["$37,457,154", ""],
+                "year": [2019, 2019],
+            }
+        )
+
+        player_salary_df = player_salary_data_acquisition.normalize_player_salaries(player_salary_df)
+
+        assert player_salary_df["salary"].dtype == "Int64"
+        assert player_salary_df["salary"][0] == 37457154
+        assert pd.isna(player_salary_df["salary"][1])
+        assert schemas.apply_schema(player_salary_df, "player_salary", columns=["salary"])["salary"].isna().sum() == 1
+
+    def test_normalize_player_salaries_text_salary_fails_the_schema(self):
+
+        player_salary_df = player_salary_data_acquisition.normalize_player_salaries(
+            pd.DataFrame({"NAME": ["Stephen Curry, PG"], "SALARY": ["N/A"], "year": [2019]})
+        )
+
+        with pytest.raises(schemas.SchemaError):
+            schemas.apply_schema(player_salary_df, "player_salary", columns=["salary"])
+
+    def test_parse_salary_page_skips_header_rows(self):
+
+        with open('tests/fixtures/pages/espn/salaries_2019_page_1.html', 'rb') as html:
+            data, page_total = player_salary_data_acquisition.parse_salary_page(html.read())
+
+        assert page_total == 3
+        assert list(data) == ["RK", "NAME", "TEAM", "SALARY"]
+        assert data["RK"].dtype == "int64"
+        assert list(data["RK"]) == list(range(1, 41))
+        assert "NAME" not in set(data["NAME"])
+        assert data["SALARY"][0].startswith("$")
+
+    def test_normalize_player_salaries_multi_season(self):
+
+        player_salary_df = pd.DataFrame(
+            {
+                "NAME": ["Stephen Curry, PG", "D'Angelo Russell, PG"],
+                "SALARY": ["$37,457,154", "$7,019,698"],
+                "year": [2019, 2020],
+            },
+            index=[7, 7],
+        )
+
+        player_salary_df = player_salary_data_acquisition.normalize_player_salaries(player_salary_df)
+
+        assert list(player_salary_df["name"]) == ["Stephen Curry", "D'Angelo Russell"]
+        assert list(player_salary_df["salary"]) == [37457154, 7019698]
+        assert player_salary_df["salary"].dtype == "Int64"
@@ -0,0 +1,72 @@
+from unittest import TestCase
+import os
+import shutil
+import pandas as pd
+from src.transform import gamelog_schedule_unification
+from src.utils import fingerprints, publish, schemas, storage
+
+
+class TestPublish(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/publish/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        self.gamelog_df = pd.DataFrame(
+            {
+                "game_date": ["2023-10-25", "2023-10-27"],
+                "tm": ["ATL", "ATL"],
+                "pts_tm": ["110", "121"],
+            }
+        )
+
+    def test_same_format_is_published_by_hardlink(self):
+
+        source_path = self.output_folder + 'unified/nba_gamelog_schedule_dataset.parquet'
+        storage.write_frame(self.gamelog_df, source_path)
+
+        published_path = self.output_folder + 'final/nba_gamelog_schedule_dataset.parquet'
+        assert publish.publish(source_path, published_path) == 2
+        assert os.path.samefile(source_path, published_path)
+        assert fingerprints.read_fingerprint(published_path) == fingerprints.read_fingerprint(source_path)
+
+        # A new unified file replaces the source, the published file keeps its rows until the next publish
+        storage.write_frame(self.gamelog_df.head(1), source_path)
+        assert storage.count_rows(published_path) == 2
+        assert publish.publish(source_path, published_path) == 1
+
+        # Another format is rewritten
+        csv_path = self.output_folder + 'final/nba_gamelog_schedule_dataset.csv'
+        assert publish.publish(source_path, csv_path) == 1
+        assert not os.path.samefile(source_path, csv_path)
+        assert storage.count_rows(csv_path) == 1
+        assert [name for name in os.listdir(self.output_folder + 'final') if name.endswith('.tmp')] == []
+
+    def test_unified_games_are_published_with_their_id(self):
+
+        unified_df = gamelog_schedule_unification.unify_gamelog_schedule(
+            schemas.apply_schema(
+                pd.DataFrame(
+                    {
+                        "id_season": [2024, 2024],
+                        "tm": ["ATL", "CHO"],
+                        "game_date": ["2023-10-27", "2023-10-27"],
+                        "extdom": ["dom", "@"],
+                        "opp": ["CHO", "ATL"],
+                    }
+                ),
+                "gamelog",
+                columns=["id_season", "tm", "game_date", "extdom", "opp"],
+            ),
+            schemas.apply_schema(
+                pd.DataFrame({"id_season": [2024, 2024], "tm": ["ATL", "CHO"], "game_date": ["2023-10-27", "2023-10-27"]}),
+                "schedule",
+                columns=["id_season", "tm", "game_date"],
+            ).reindex(columns=gamelog_schedule_unification.SCHEDULE_COLUMNS),
+        )
+        source_path = self.output_folder + 'unified/nba_gamelog_schedule_dataset.parquet'
+        storage.write_frame(unified_df, source_path)
+
+        # The final dataset is the unified file as is, no export rewrites it
+        published_path = self.output_folder + 'final/nba_gamelog_schedule_dataset.parquet'
+        assert publish.publish(source_path, published_path) == 2
+        assert os.path.samefile(source_path, published_path)
+        assert storage.read_frame(published_path)["id"].tolist() == ["2023-10-27_CHO_ATL", "2023-10-27_CHO_ATL"]
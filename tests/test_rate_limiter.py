@@ -0,0 +1,150 @@
+from unittest import TestCase
+from src.utils import rate_limiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestTokenBucketRateLimiter(TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+
+    def test_requests_are_spaced_by_the_rate(self):
+
+        limiter = rate_limiter.TokenBucketRateLimiter(
+            rate=2.0,
+            capacity=1,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+        for _ in range(5):
+            limiter.acquire()
+
+        # 1 token available at start, then one every 0.5 second
+        assert self.clock.now == 2.0
+
+    def test_burst_is_bounded_by_the_capacity(self):
+
+        limiter = rate_limiter.TokenBucketRateLimiter(
+            rate=1.0,
+            capacity=3,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+        waits = [limiter.acquire() for _ in range(4)]
+
+        assert waits == [0.0, 0.0, 0.0, 1.0]
+
+    def test_host_rate_limiter_is_shared_per_host(self):
+
+        first = rate_limiter.get_host_rate_limiter("http://www.espn.com/nba/salaries/_/year/2019")
+        second = rate_limiter.get_host_rate_limiter("http://www.espn.com/nba/salaries/_/year/2020/page/2")
+        other = rate_limiter.get_host_rate_limiter("https://www.basketball-reference.com/teams/")
+
+        assert first is second
+        assert first is not other
+
+
+class TestAdaptiveRateLimiter(TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.limiter = rate_limiter.AdaptiveRateLimiter(
+            rate=1.0,
+            capacity=1,
+            healthy_window=2,
+            failure_threshold=3,
+            reset_timeout=30.0,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+    def test_rate_grows_while_healthy_and_is_capped(self):
+
+        for _ in range(100):
+            self.limiter.record(200)
+
+        assert self.limiter.rate == 2.0
+
+    def test_rate_is_halved_on_429_and_held_by_retry_after(self):
+
+        self.limiter.acquire()
+        self.limiter.record(429, retry_after=10)
+
+        assert self.limiter.rate == 0.5
+        assert self.limiter.acquire() == 10.0
+
+    def test_circuit_opens_after_repeated_failures(self):
+
+        for _ in range(3):
+            self.limiter.record(503)
+
+        assert self.limiter.state == rate_limiter.OPEN
+        with self.assertRaises(rate_limiter.CircuitOpenError):
+            self.limiter.acquire()
+
+        # Half open after the reset timeout, a failed probe opens it again
+        self.clock.now += 30
+        self.limiter.acquire()
+        self.limiter.record(None)
+        assert self.limiter.state == rate_limiter.OPEN
+
+        self.clock.now += 30
+        self.limiter.acquire()
+        self.limiter.record(200)
+        assert self.limiter.state == rate_limiter.CLOSED
+        assert self.limiter.metrics()["circuit_opened"] == 2
+
+    def test_half_open_circuit_lets_a_single_probe_through(self):
+
+        for _ in range(3):
+            self.limiter.record(503)
+        self.clock.now += 30
+
+        # The first request is the probe, the others fail until its response is recorded
+        self.limiter.acquire()
+        assert self.limiter.state == rate_limiter.HALF_OPEN
+        with self.assertRaises(rate_limiter.CircuitOpenError):
+            self.limiter.acquire()
+
+        self.limiter.record(200)
+        assert self.limiter.state == rate_limiter.CLOSED
+        self.limiter.acquire()
+
+        # A probe whose response is never recorded is replaced after the reset timeout
+        for _ in range(3):
+            self.limiter.record(503)
+        self.clock.now += 30
+        self.limiter.acquire()
+        with self.assertRaises(rate_limiter.CircuitOpenError):
+            self.limiter.acquire()
+        self.clock.now += 30
+        self.limiter.acquire()
+        assert self.limiter.state == rate_limiter.HALF_OPEN
+
+    def test_metrics_report_the_achieved_rate(self):
+
+        for _ in range(5):
+            self.limiter.acquire()
+            self.limiter.record(200)
+
+        metrics = self.limiter.metrics()
+
+        assert metrics["requests"] == 5
+        assert metrics["successes"] == 5
+        assert metrics["achieved_rate"] > 1.0
+
+    def test_parse_retry_after(self):
+
+        assert rate_limiter.parse_retry_after("120") == 120.0
+        assert rate_limiter.parse_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", now=40) == 60.0
+        assert rate_limiter.parse_retry_after(None) is None
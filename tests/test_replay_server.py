@@ -0,0 +1,97 @@
+from unittest import TestCase
+import shutil
+import pandas as pd
+import pytest
+from src.exctract import player_salary_data_acquisition
+from src.exctract import gamelog_data_acquisition
+from src.exctract import schedule_data_acquisition
+from src.utils import http_client, rate_limiter
+from src.utils.teams import get_team_abbreviations
+
+
+class TestReplayServer(TestCase):
+    @pytest.fixture(autouse=True)
+    def _replay_server(self, replay_server):
+        self.replay_server = replay_server
+
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/replay_server/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+
+    def test_salary_acquisition_from_replay_server(self):
+
+        player_salary_data_acquisition.player_salary_data_acquisition(
+            season=2019,
+            output_folder=self.output_folder,
+            requests_per_second=1000,
+        )
+
+        player_salary_df = pd.read_parquet(self.output_folder + 'player_salary_2019.parquet')
+
+        assert len(player_salary_df) == 120
+        assert self.replay_server.nb_requests == 3
+
+    def test_gamelog_and_schedule_acquisition_from_replay_server(self):
+
+        # Only ATL and BOS are recorded, the other teams of the season are served the ATL pages
+        self.replay_server.fallback_team = 'ATL'
+
+        for data_acquisition in [
+            gamelog_data_acquisition.gamelog_data_acquisition,
+            schedule_data_acquisition.schedule_data_acquisition,
+        ]:
+            data_acquisition(
+                season=2024,
+                output_folder=self.output_folder,
+                team_fan_out=True,
+                team_workers=2,
+                requests_per_second=1000,
+            )
+
+        gamelog_df = pd.read_parquet(self.output_folder + 'gamelog_2024_all.parquet')
+        schedule_df = pd.read_parquet(self.output_folder + 'schedule_2024_all.parquet')
+
+        # The teams that did not play in 2024 are not requested
+        assert list(gamelog_df['tm'].unique()) == get_team_abbreviations(2024)
+        assert len(gamelog_df) == 30 * 12
+        assert len(schedule_df) == 30 * 12
+        assert self.replay_server.nb_requests == 2 * 30
+
+    def test_injected_errors_are_retried(self):
+
+        self.replay_server.fail_first = 1
+
+        response = http_client.get_http_client().get(
+            player_salary_data_acquisition.ESPN_SALARY_URL + "2019/seasontype/"
+        )
+
+        assert response.status_code == 200
+        assert self.replay_server.nb_errors == 1
+        assert self.replay_server.nb_requests == 2
+
+    def test_fallback_team_serves_every_team(self):
+
+        self.replay_server.fallback_team = 'ATL'
+
+        response = http_client.get_http_client().get(
+            "https://www.basketball-reference.com/teams/MIA/2024/gamelog"
+        )
+
+        assert response.status_code == 200
+
+    def test_throttled_responses_lower_the_host_rate(self):
+
+        client = http_client.get_http_client()
+        client.override_host("http://throttled.test", self.replay_server.url)
+        limiter = rate_limiter.get_host_rate_limiter("http://throttled.test", requests_per_second=100, burst=1)
+        self.replay_server.error_status = 429
+        self.replay_server.fail_first = 1
+
+        try:
+            response = client.get("http://throttled.test/nba/salaries/_/year/2019/seasontype/")
+        finally:
+            client.override_host("http://throttled.test", None)
+
+        assert response.status_code == 200
+        assert limiter.metrics()["throttled"] == 1
+        assert limiter.rate == 50
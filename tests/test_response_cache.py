@@ -0,0 +1,89 @@
+from unittest import TestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import datetime
+import shutil
+import threading
+import pandas as pd
+from src.utils import response_cache
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    statuses = []
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            ETagHandler.statuses.append(304)
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = b"<html>salaries</html>"
+        ETagHandler.statuses.append(200)
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestResponseCache(TestCase):
+    def setUp(self) -> None:
+        ETagHandler.statuses = []
+        self.cache_dir = 'tests/test_output/response_cache'
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%s/nba/salaries/_/year/2019" % self.server.server_port
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_immutable_entries_are_served_from_disk(self):
+
+        cache = response_cache.ResponseCache(self.cache_dir)
+
+        first = cache.get(self.url, ttl=response_cache.IMMUTABLE)
+        second = cache.get(self.url, ttl=response_cache.IMMUTABLE)
+
+        assert first == second == b"<html>salaries</html>"
+        assert ETagHandler.statuses == [200]
+
+    def test_expired_entries_are_revalidated(self):
+
+        cache = response_cache.ResponseCache(self.cache_dir)
+
+        cache.get(self.url, ttl=0)
+        content = cache.get(self.url, ttl=0)
+
+        assert content == b"<html>salaries</html>"
+        assert ETagHandler.statuses == [200, 304]
+
+    def test_season_ttl(self):
+
+        today = datetime.date(2025, 11, 2)
+
+        assert response_cache.current_nba_season(today) == 2026
+        assert response_cache.season_ttl(2019, today) is response_cache.IMMUTABLE
+        assert response_cache.season_ttl(2026, today) == response_cache.CURRENT_SEASON_TTL
+
+    def test_get_frame_calls_fetch_once(self):
+
+        cache = response_cache.ResponseCache(self.cache_dir)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return pd.DataFrame({"tm": ["ATL"], "id_season": [2019]})
+
+        first = cache.get_frame("gamelog_2019_ATL", fetch, ttl=response_cache.IMMUTABLE)
+        second = cache.get_frame("gamelog_2019_ATL", fetch, ttl=response_cache.IMMUTABLE)
+
+        pd.testing.assert_frame_equal(first, second)
+        assert len(calls) == 1
@@ -0,0 +1,111 @@
+from unittest import TestCase
+import shutil
+import pandas as pd
+from src.utils import schemas, storage
+
+
+class TestSchemas(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/schemas/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        self.schedule_df = pd.DataFrame(
+            {
+                "id_season": ["2024", "2024", "2024"],
+                "tm": ["ATL", "ATL", "BOS"],
+                "game_date": ["Fri, Oct 27, 2023", "Sun, Oct 29, 2023", "Wed, Oct 25, 2023"],
+                "time_start": ["7:30p", "7:30p", "7:30p"],
+                "extdom": ["", "@", "@"],
+                "opponent": ["Charlotte Hornets", "New York Knicks", "New York Knicks"],
+                "w_l": ["L", "L", ""],
+                "overtime": ["", "OT", ""],
+                "pts_tm": ["115", "121", ""],
+                "pts_opp": ["169", "129", ""],
+                "w_tot": ["0", "0", "0"],
+                "l_tot": ["1", "2", "0"],
+                "streak_w_l": ["L 1", "L 2", ""],
+            }
+        )
+
+    def test_scrapped_values_are_typed(self):
+
+        schedule_df = schemas.apply_schema(self.schedule_df, "schedule")
+
+        assert schedule_df["id_season"].dtype == "Int16"
+        assert schedule_df["tm"].dtype == schemas.team_dtype()
+        assert schedule_df["game_date"].min() == pd.Timestamp("2023-10-25")
+        assert schedule_df["pts_tm"].isna().sum() == 1
+        assert schedule_df["overtime"].isna().sum() == 2
+
+        # A few seasons of games
+        seasons_df = pd.concat([self.schedule_df] * 1000, ignore_index=True)
+        typed_df = schemas.apply_schema(seasons_df, "schedule")
+        assert typed_df.memory_usage(deep=True).sum() < seasons_df.memory_usage(deep=True).sum() / 5
+
+        # Typing twice gives the same frame
+        pd.testing.assert_frame_equal(schemas.apply_schema(schedule_df, "schedule"), schedule_df)
+
+    def test_drift_fails_fast(self):
+
+        with self.assertRaisesRegex(schemas.SchemaError, "schedule.pts_tm: 1 values"):
+            schemas.validate_schema(self.schedule_df.assign(pts_tm=["115", "DNP", ""]), "schedule")
+
+        with self.assertRaisesRegex(schemas.SchemaError, "schedule.tm"):
+            schemas.validate_schema(self.schedule_df.assign(tm=["ATL", "ATL", "XXX"]), "schedule")
+
+        with self.assertRaisesRegex(schemas.SchemaError, "missing columns w_l"):
+            schemas.validate_schema(self.schedule_df.drop(columns=["w_l"]), "schedule")
+
+    def test_seasons_are_read_with_the_schema_dtypes(self):
+
+        for file_format, season in [("csv", 2023), ("parquet", 2024)]:
+            storage.write_frame(
+                self.schedule_df.assign(id_season=str(season)),
+                self.output_folder + 'schedule_' + str(season) + '_all' + storage.file_extension(file_format),
+            )
+
+        schedule_df = storage.read_frames(self.output_folder, 'schedule', schema="schedule")
+
+        assert list(schedule_df["id_season"].unique()) == [2023, 2024]
+        assert schedule_df["streak_w_l"].dtype == "category"
+        assert schedule_df["tm"].dtype == schemas.team_dtype()
+        assert schedule_df["w_l"].isna().sum() == 2
+
+    def test_all_missing_category_round_trips_through_parquet(self):
+
+        # No overtime game yet in the season
+        path = self.output_folder + 'schedule_2024_all.parquet'
+        storage.write_frame(self.schedule_df.assign(overtime=""), path, schema="schedule")
+
+        schedule_df = storage.read_frame(path, schema="schedule")
+
+        assert schedule_df["overtime"].dtype == "category"
+        assert schedule_df["overtime"].isna().all()
+        assert len(schedule_df) == 3
+
+    def test_seasons_are_read_with_the_projected_columns(self):
+
+        for season in range(2020, 2025):
+            storage.write_frame(
+                self.schedule_df.assign(id_season=str(season)),
+                self.output_folder + 'schedule_' + str(season) + '_all.csv',
+            )
+        columns = ["id_season", "tm", "pts_tm", "streak_w_l"]
+
+        schedule_df = storage.read_frames(self.output_folder, 'schedule', columns=columns, schema="schedule")
+
+        assert list(schedule_df.columns) == columns
+        assert list(schedule_df["id_season"].unique()) == [2020, 2021, 2022, 2023, 2024]
+        assert schedule_df["pts_tm"].dtype == "Int16"
+        assert schedule_df["streak_w_l"].dtype == "category"
+        pd.testing.assert_frame_equal(
+            schedule_df.head(3),
+            storage.read_frames(self.output_folder, 'schedule', columns=columns, seasons=[2020], schema="schedule"),
+        )
+
+        # A season with text in a numeric column is still reported
+        storage.write_frame(
+            self.schedule_df.assign(id_season="2025", pts_tm=["115", "DNP", ""]),
+            self.output_folder + 'schedule_2025_all.csv',
+        )
+        with self.assertRaisesRegex(schemas.SchemaError, "schedule.pts_tm: 1 values"):
+            storage.read_frames(self.output_folder, 'schedule', columns=columns, schema="schedule")
@@ -0,0 +1,71 @@
+from unittest import TestCase
+import shutil
+import pandas as pd
+from src.utils import storage
+from src.utils.season_results import SeasonResults, source_fingerprint
+
+
+class TestSeasonResults(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/season_results/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        self.input_folder = self.output_folder + 'gamelog/'
+        self.season_results = SeasonResults(self.output_folder + 'results/', 'unified', file_format='csv')
+        for season in [2023, 2024]:
+            self._write_season(season, ["110", "121"])
+        self.computed_seasons = []
+
+    def _write_season(self, season, points):
+        storage.write_frame(
+            pd.DataFrame({"id_season": [season] * len(points), "tm": ["ATL"] * len(points), "pts_tm": points}),
+            self.input_folder + 'gamelog_' + str(season) + '_all.csv',
+        )
+
+    def _compute(self, seasons):
+        self.computed_seasons.append(list(seasons))
+        df = storage.read_frames(self.input_folder, 'gamelog', seasons=seasons)
+        return df.assign(pts_tm=pd.to_numeric(df["pts_tm"]) * 2)
+
+    def _update(self, version="v1", seasons=None):
+        return self.season_results.update(
+            self._compute, inputs=[(self.input_folder, 'gamelog')], seasons=seasons, version=version
+        )
+
+    def test_only_the_changed_seasons_are_recomputed(self):
+
+        assert self._update() == [2023, 2024]
+        assert self._update() == []
+
+        self._write_season(2024, ["110", "121", "99"])
+        assert self._update() == [2024]
+        assert self.computed_seasons == [[2023, 2024], [2024]]
+
+        df = self.season_results.read()
+        assert len(df) == 5
+        assert sorted(pd.to_numeric(df["pts_tm"]).tolist()) == [198, 220, 220, 242, 242]
+
+    def test_new_version_recomputes_every_season(self):
+
+        self._update()
+        assert self._update(version="v2") == [2023, 2024]
+
+    def test_version_changes_with_any_source_file(self):
+
+        sources = [self.output_folder + 'module.py', self.output_folder + 'refdata.csv']
+        for path, content in zip(sources, ["x = 1\n", "ATL,Atlanta\n"]):
+            with open(path, 'w') as f:
+                f.write(content)
+        version = source_fingerprint(*sources)
+
+        with open(sources[1], 'a') as f:
+            f.write("BOS,Boston\n")
+
+        assert source_fingerprint(*sources) != version
+        assert source_fingerprint(*sources[:1]) != source_fingerprint(*sources)
+
+    def test_missing_season_file_is_recomputed(self):
+
+        self._update()
+        self.season_results._season_path(2023).unlink()
+        assert self._update(seasons=[2023]) == [2023]
+        assert len(self.season_results.read([2023])) == 2
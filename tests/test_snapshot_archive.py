@@ -0,0 +1,134 @@
+from unittest import TestCase
+import os
+import shutil
+import sqlite3
+import pandas as pd
+import pytest
+import requests
+from src.exctract import player_salary_data_acquisition
+from src.utils import http_client, response_cache, snapshot_archive
+
+
+class TestSnapshotArchive(TestCase):
+    def setUp(self) -> None:
+        self.archive_dir = 'tests/test_output/snapshot_archive'
+        self.output_folder = 'tests/test_output/replay/'
+        self.cache_dir = 'tests/test_output/replay_cache'
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.url = player_salary_data_acquisition.ESPN_SALARY_URL + "2019/seasontype/"
+
+    def tearDown(self) -> None:
+        http_client.get_http_client().use_archive(None)
+
+    def test_archive_returns_latest_snapshot(self):
+
+        archive = snapshot_archive.SnapshotArchive(self.archive_dir)
+        archive.store(self.url, b"<html>v1</html>", fetched_at=100)
+        archive.store(self.url, b"<html>v2</html>", fetched_at=200)
+
+        assert archive.load(self.url) == b"<html>v2</html>"
+        assert archive.load(self.url, at=150) == b"<html>v1</html>"
+        assert archive.load(self.url + "page/2") is None
+        assert len(list((archive.archive_dir / "blobs").glob("*/*.zst"))) == 2
+
+    def test_archive_indexes_an_unchanged_page_once(self):
+
+        archive = snapshot_archive.SnapshotArchive(self.archive_dir)
+        archive.store(self.url, b"<html>v1</html>", fetched_at=100)
+        archive.store(self.url, b"<html>v1</html>", fetched_at=200)
+        archive.store(self.url, b"<html>v2</html>", fetched_at=300)
+        archive.store(self.url, b"<html>v1</html>", fetched_at=400)
+
+        assert self._count_snapshots(archive) == 3
+        assert archive.load(self.url) == b"<html>v1</html>"
+
+    def test_replay_salary_acquisition_offline(self):
+
+        archive = snapshot_archive.SnapshotArchive(self.archive_dir)
+        for page in range(1, 4):
+            url = self.url if page == 1 else player_salary_data_acquisition.ESPN_SALARY_URL + "2019/page/" + str(page)
+            with open('tests/fixtures/pages/espn/salaries_2019_page_' + str(page) + '.html', 'rb') as html:
+                archive.store(url, html.read())
+
+        player_salary_data_acquisition.player_salary_data_acquisition(
+            season=2019,
+            output_folder=self.output_folder,
+            requests_per_second=1000,
+            archive_dir=self.archive_dir,
+            replay=True,
+        )
+
+        player_salary_df = pd.read_parquet(self.output_folder + 'player_salary_2019.parquet')
+
+        assert len(player_salary_df) == 120
+        assert list(player_salary_df["RK"]) == list(range(1, 121))
+
+        # The replay ends with the season, the stages run after it use the network again
+        client = http_client.get_http_client()
+        assert client.archive is None
+        assert not client.replay
+
+    @staticmethod
+    def _count_snapshots(archive):
+        conn = sqlite3.connect(archive.index_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_archive_is_shared_by_the_same_archive_only(self):
+
+        with http_client.snapshot_archive_scope(self.archive_dir):
+            with http_client.snapshot_archive_scope(self.archive_dir):
+                pass
+            assert http_client.get_http_client().archive is not None
+
+            with pytest.raises(ValueError):
+                with http_client.snapshot_archive_scope(self.archive_dir, replay=True):
+                    pass
+
+        assert http_client.get_http_client().archive is None
+
+    def test_replay_missing_page_is_not_found(self):
+
+        with http_client.snapshot_archive_scope(self.archive_dir, replay=True):
+            response = http_client.get_http_client().get(self.url)
+
+        assert response.status_code == 404
+
+    @pytest.mark.usefixtures("replay_server")
+    def test_replay_skips_the_response_cache(self):
+
+        cache = response_cache.ResponseCache(self.cache_dir)
+        assert len(cache.get(self.url, ttl=response_cache.IMMUTABLE)) > 0
+
+        # The page is cached but not archived
+        with http_client.snapshot_archive_scope(self.archive_dir, replay=True):
+            with pytest.raises(requests.HTTPError):
+                cache.get(self.url, ttl=response_cache.IMMUTABLE)
+
+    @pytest.mark.usefixtures("replay_server")
+    def test_archive_through_a_warm_cache_is_replayed(self):
+
+        cache = response_cache.ResponseCache(self.cache_dir)
+        content = cache.get(self.url, ttl=response_cache.IMMUTABLE)
+
+        # The page is served from the cache, it is archived all the same
+        with http_client.snapshot_archive_scope(self.archive_dir):
+            assert cache.get(self.url, ttl=response_cache.IMMUTABLE) == content
+
+        with http_client.snapshot_archive_scope(self.archive_dir, replay=True):
+            assert cache.get(self.url, ttl=response_cache.IMMUTABLE) == content
+
+    @pytest.mark.usefixtures("replay_server")
+    def test_cache_hits_are_archived_once(self):
+
+        cache = response_cache.ResponseCache(self.cache_dir)
+        content = cache.get(self.url, ttl=response_cache.IMMUTABLE)
+
+        with http_client.snapshot_archive_scope(self.archive_dir):
+            assert cache.get(self.url, ttl=response_cache.IMMUTABLE) == content
+            assert cache.get(self.url, ttl=response_cache.IMMUTABLE) == content
+
+        assert self._count_snapshots(snapshot_archive.SnapshotArchive(self.archive_dir)) == 1
@@ -0,0 +1,79 @@
+from unittest import TestCase
+import pandas as pd
+from src.utils.game_keys import team_game_keys
+from src.utils.sorted_join import sort_merge_left_join
+
+
+class TestSortedJoin(TestCase):
+    def setUp(self) -> None:
+        self.gamelog_df = pd.DataFrame(
+            {
+                "id_season": [2024, 2024, 2024, 2024, 2023],
+                "tm": ["BOS", "ATL", "ATL", "ATL", "BOS"],
+                "game_date": pd.to_datetime(["2023-10-25", "2023-10-27", "2023-10-25", "2023-10-27", "2023-04-09"]),
+                "pts_tm": [108, 115, 110, 116, 120],
+            }
+        )
+        self.schedule_df = pd.DataFrame(
+            {
+                "id_season": [2024, 2024, 2024, 2024],
+                "tm": ["ATL", "ATL", "ATL", "BOS"],
+                "game_date": pd.to_datetime(["2023-10-25", "2023-10-27", "2023-10-27", "2023-10-25"]),
+                "w_tot": [1, 1, 2, 1],
+            }
+        )
+
+    def _join(self, gamelog_df, schedule_df):
+        return sort_merge_left_join(
+            gamelog_df,
+            team_game_keys(gamelog_df["id_season"], gamelog_df["tm"], gamelog_df["game_date"]),
+            schedule_df,
+            team_game_keys(schedule_df["id_season"], schedule_df["tm"], schedule_df["game_date"]),
+            right_columns=["w_tot"],
+        )
+
+    def test_rows_are_joined_in_key_order_without_duplicates(self):
+
+        # The gamelogs and schedules arrive sorted, duplicates included
+        joined_df, nb_duplicated_rows = self._join(
+            self.gamelog_df.iloc[[4, 2, 1, 3, 0]], self.schedule_df.iloc[[0, 1, 2, 3]]
+        )
+
+        # The first row of every duplicated key is kept on both sides
+        assert nb_duplicated_rows == 2
+        assert joined_df["tm"].tolist() == ["BOS", "ATL", "ATL", "BOS"]
+        assert joined_df["pts_tm"].tolist() == [120, 110, 115, 108]
+        assert joined_df["w_tot"].isna().tolist() == [True, False, False, False]
+        assert joined_df["w_tot"].tolist()[1:] == [1, 1, 1]
+        assert joined_df.index.tolist() == [0, 1, 2, 3]
+
+    def test_unsorted_rows_are_joined_in_their_order(self):
+
+        joined_df, nb_duplicated_rows = self._join(self.gamelog_df, self.schedule_df.iloc[[3, 0, 2, 1]])
+
+        # The first row of every duplicated key in the order of the rows is kept, as drop_duplicates does
+        assert nb_duplicated_rows == 2
+        assert joined_df["pts_tm"].tolist() == [108, 115, 110, 120]
+        assert joined_df["w_tot"].tolist()[:3] == [1, 2, 1]
+        assert joined_df["w_tot"].isna().tolist() == [False, False, False, True]
+        assert joined_df.index.tolist() == [0, 1, 2, 3]
+
+    def test_join_matches_pandas_merge(self):
+
+        gamelog_df = self.gamelog_df.drop_duplicates(subset=["id_season", "tm", "game_date"])
+        schedule_df = self.schedule_df.drop_duplicates(subset=["id_season", "tm", "game_date"])
+
+        joined_df, nb_duplicated_rows = self._join(gamelog_df, schedule_df)
+        merged_df = pd.merge(gamelog_df, schedule_df, how="left", on=["id_season", "tm", "game_date"])
+
+        assert nb_duplicated_rows == 0
+        # Unsorted, the rows keep the order of the gamelogs as in pd.merge
+        pd.testing.assert_frame_equal(joined_df, merged_df, check_dtype=False)
+
+        sorted_gamelog_df = gamelog_df.sort_values(["id_season", "tm", "game_date"])
+        joined_df, _ = self._join(sorted_gamelog_df, schedule_df.sort_values(["id_season", "tm", "game_date"]))
+        pd.testing.assert_frame_equal(
+            joined_df,
+            merged_df.sort_values(["id_season", "tm", "game_date"]).reset_index(drop=True),
+            check_dtype=False,
+        )
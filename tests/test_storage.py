@@ -0,0 +1,117 @@
+from unittest import TestCase
+import os
+import shutil
+import pandas as pd
+from src.utils import fingerprints, storage, streaming
+
+
+class TestStorage(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/storage/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        self.path = self.output_folder + 'gamelog_2024_all.csv'
+        self.gamelog_df = pd.DataFrame(
+            {
+                "game_date": ["2023-10-25", "2023-10-27"],
+                "tm": ["ATL", "ATL"],
+                "pts_tm": ["110", "121"],
+            }
+        )
+
+    def test_unchanged_frame_is_not_rewritten(self):
+
+        assert storage.write_frame(self.gamelog_df, self.path)
+        assert os.path.exists(fingerprints.fingerprint_path(self.path))
+        mtime = os.stat(self.path).st_mtime_ns
+
+        assert not storage.write_frame(self.gamelog_df.iloc[::-1], self.path)
+        assert os.stat(self.path).st_mtime_ns == mtime
+
+        new_games_df = pd.concat(
+            [self.gamelog_df, pd.DataFrame({"game_date": ["2023-10-29"], "tm": ["ATL"], "pts_tm": ["99"]})]
+        )
+        assert storage.write_frame(new_games_df, self.path)
+        assert len(pd.read_csv(self.path)) == 3
+
+    def test_existing_output_without_manifest_is_fingerprinted(self):
+
+        os.makedirs(self.output_folder)
+        self.gamelog_df.to_csv(self.path, index=False)
+
+        assert not storage.write_frame(self.gamelog_df, self.path)
+        assert fingerprints.read_fingerprint(self.path) == fingerprints.frame_fingerprint(self.gamelog_df)
+
+    def test_parquet_and_csv_are_read_with_the_same_dtypes(self):
+
+        raw_df = self.gamelog_df.assign(w_l=["W", ""])
+        storage.write_frame(raw_df, self.output_folder + 'gamelog_2024_all.parquet')
+        storage.write_frame(raw_df, self.output_folder + 'gamelog_2024_all.csv')
+
+        parquet_df = storage.read_frame(self.output_folder + 'gamelog_2024_all.parquet')
+        csv_df = storage.read_frame(self.output_folder + 'gamelog_2024_all.csv')
+
+        pd.testing.assert_frame_equal(parquet_df, csv_df)
+        assert parquet_df["pts_tm"].dtype == "int64"
+
+        # Parquet is preferred when a season exists in both formats
+        assert storage.find_dataset_files(self.output_folder, 'gamelog') == [
+            self.output_folder + 'gamelog_2024_all.parquet'
+        ]
+        assert list(storage.read_frames(self.output_folder, 'gamelog', columns=["tm"]).columns) == ["tm"]
+
+    def test_replaced_seasons_keep_the_other_seasons(self):
+
+        path = self.output_folder + 'unified/nba_gamelog_schedule_dataset.parquet'
+        history_df = pd.DataFrame({"id_season": [2023, 2024, 2024], "tm": ["ATL", "ATL", "BOS"], "pts_tm": [99, 110, 121]})
+        storage.write_frame(history_df, path)
+
+        storage.replace_seasons(
+            pd.DataFrame({"id_season": [2024], "tm": ["ATL"], "pts_tm": [112]}), path, seasons=[2024, 2025]
+        )
+
+        assert storage.read_frame(path).values.tolist() == [[2023, "ATL", 99], [2024, "ATL", 112]]
+
+    def test_replaced_teams_keep_the_other_teams(self):
+
+        path = self.output_folder + 'unified/nba_gamelog_schedule_dataset.parquet'
+        history_df = pd.DataFrame({"id_season": [2023, 2024, 2024], "tm": ["BOS", "ATL", "BOS"], "pts_tm": [99, 110, 121]})
+        storage.write_frame(history_df, path)
+
+        storage.replace_seasons(pd.DataFrame({"id_season": [2024], "tm": ["BOS"], "pts_tm": [125]}), path, seasons=[2024], teams=["BOS"])
+        assert storage.read_frame(path).values.tolist() == [[2023, "BOS", 99], [2024, "ATL", 110], [2024, "BOS", 125]]
+
+        # Every season of the teams
+        streaming.replace_season_chunks([pd.DataFrame({"id_season": [2024], "tm": ["BOS"], "pts_tm": [130]})], path, None, teams=["BOS"])
+        assert storage.read_frame(path).values.tolist() == [[2024, "ATL", 110], [2024, "BOS", 130]]
+
+    def test_chunks_are_streamed_into_one_file(self):
+
+        path = self.output_folder + 'unified/nba_gamelog_schedule_dataset.parquet'
+        chunks = [
+            pd.DataFrame({"id_season": [2023], "tm": ["ATL"], "streak_w_l": pd.Categorical(["W 1"]), "overtime": [None]}),
+            pd.DataFrame(
+                {
+                    "id_season": [2024, 2024],
+                    "tm": ["ATL", "BOS"],
+                    "streak_w_l": pd.Categorical(["L 1", "W 2"]),
+                    "overtime": [None, "OT"],
+                }
+            ),
+        ]
+
+        assert streaming.write_frame_chunks(iter(chunks), path)
+        assert storage.count_rows(path) == 3
+        assert storage.read_frame(path)["overtime"].isna().tolist() == [True, True, False]
+
+        # The fingerprint does not depend on the chunks, the same rows are not rewritten
+        mtime = os.stat(path).st_mtime_ns
+        assert not streaming.write_frame_chunks([pd.concat(chunks[::-1], ignore_index=True)], path)
+        assert os.stat(path).st_mtime_ns == mtime
+
+        streaming.replace_season_chunks(
+            [pd.DataFrame({"id_season": [2024], "tm": ["ATL"], "streak_w_l": pd.Categorical(["W 3"]), "overtime": [None]})],
+            path,
+            seasons=[2024],
+        )
+        assert storage.read_frame(path)[["id_season", "streak_w_l"]].values.tolist() == [[2023, "W 1"], [2024, "W 3"]]
+        assert [name for name in os.listdir(self.output_folder + 'unified') if name.endswith('.tmp')] == []
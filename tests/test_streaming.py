@@ -0,0 +1,26 @@
+from unittest import TestCase
+import pandas as pd
+from src.utils.streaming import KeySet, season_chunks
+
+
+class TestStreaming(TestCase):
+    def test_seasons_are_split_into_sorted_chunks(self):
+
+        assert list(season_chunks([2026, 2024, 2025, 2023, 2024], 2)) == [[2023, 2024], [2025, 2026]]
+
+        with self.assertRaises(ValueError):
+            list(season_chunks([2024], 0))
+
+    def test_duplicates_are_dropped_across_chunks(self):
+
+        key_set = KeySet(["id_season", "tm", "game_date"])
+        first_chunk = pd.DataFrame(
+            {"id_season": [2024, 2024, 2024], "tm": ["ATL", "ATL", "BOS"], "game_date": ["2023-10-25"] * 3, "pts_tm": [110, 111, 99]}
+        )
+        second_chunk = pd.DataFrame(
+            {"id_season": [2024, 2025], "tm": ["BOS", "BOS"], "game_date": ["2023-10-25", "2024-10-22"], "pts_tm": [98, 120]}
+        )
+
+        assert key_set.drop_duplicates(first_chunk)["pts_tm"].tolist() == [110, 99]
+        assert key_set.drop_duplicates(second_chunk)["pts_tm"].tolist() == [120]
+        assert len(key_set) == 3
@@ -0,0 +1,112 @@
+from unittest import TestCase
+import shutil
+import sqlite3
+import pandas as pd
+from src.utils import game_keys, schemas, warehouse
+
+
+class TestWarehouse(TestCase):
+    def setUp(self) -> None:
+        self.output_folder = 'tests/test_output/warehouse/'
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        self.warehouse_path = self.output_folder + 'nba.sqlite'
+        self.unified_df = schemas.apply_schema(
+            pd.DataFrame(
+                {
+                    "id_season": [2024, 2024, 2024],
+                    "tm": ["ATL", "CHO", "ATL"],
+                    "game_date": ["2023-10-27", "2023-10-27", "2023-10-29"],
+                    "3p_tm": [15, 31, None],
+                    "game_key": game_keys.game_keys(
+                        pd.Series(["2023-10-27", "2023-10-27", "2023-10-29"]),
+                        home=pd.Series(["ATL", "ATL", "NYK"]),
+                        away=pd.Series(["CHO", "CHO", "ATL"]),
+                    ),
+                }
+            ),
+            "gamelog_schedule_unified",
+            columns=["id_season", "tm", "game_date", "3p_tm", "game_key"],
+        )
+
+    def _query(self, sql):
+        with sqlite3.connect(self.warehouse_path) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_load_creates_an_indexed_table(self):
+
+        nb_rows = warehouse.load_dataset(
+            self.unified_df, self.warehouse_path, "gamelog_schedule_unified", "nba", batch_size=2
+        )
+
+        assert nb_rows == 3
+        game_key = int(self.unified_df["game_key"].iloc[2])
+        assert self._query('SELECT tm, game_date, "3p_tm" FROM nba WHERE game_key = ' + str(game_key)) == [
+            ("ATL", "2023-10-29", None)
+        ]
+        assert "nba_game_key" in [row[1] for row in self._query("PRAGMA index_list(nba)")]
+        plan = self._query("EXPLAIN QUERY PLAN SELECT * FROM nba WHERE id_season = 2024 AND tm = 'ATL'")
+        assert "USING INDEX" in plan[0][-1]
+
+    def _season_2023_df(self):
+        return self.unified_df.iloc[[0]].assign(id_season=pd.array([2023], dtype=self.unified_df["id_season"].dtype))
+
+    def test_reload_upserts_on_the_primary_key(self):
+
+        warehouse.load_dataset(
+            pd.concat([self._season_2023_df(), self.unified_df]), self.warehouse_path, "gamelog_schedule_unified", "nba"
+        )
+
+        # The last game is completed and a new season column is added
+        reloaded_df = self.unified_df.assign(**{"3p_tm": pd.array([15, 31, 12], dtype="Int16"), "w_tot": 1})
+        nb_rows = warehouse.load_dataset(
+            reloaded_df, self.warehouse_path, "gamelog_schedule_unified", "nba", seasons=[2024]
+        )
+
+        assert nb_rows == 4
+        assert self._query('SELECT id_season, "3p_tm", w_tot FROM nba ORDER BY id_season, game_date, tm') == [
+            (2023, 15, None), (2024, 15, 1), (2024, 31, 1), (2024, 12, 1)
+        ]
+
+    def test_reload_deletes_the_rows_removed_from_the_seasons(self):
+
+        warehouse.load_dataset(
+            pd.concat([self._season_2023_df(), self.unified_df]), self.warehouse_path, "gamelog_schedule_unified", "nba"
+        )
+
+        # The last game of 2024 was removed from the source
+        nb_rows = warehouse.load_dataset(
+            self.unified_df.iloc[:2], self.warehouse_path, "gamelog_schedule_unified", "nba", seasons=[2024]
+        )
+
+        assert nb_rows == 3
+        assert self._query("SELECT id_season, tm, game_date FROM nba ORDER BY id_season, game_date, tm") == [
+            (2023, "ATL", "2023-10-27"), (2024, "ATL", "2023-10-27"), (2024, "CHO", "2023-10-27")
+        ]
+
+        # A full load replaces every season
+        nb_rows = warehouse.load_dataset(self.unified_df.iloc[:2], self.warehouse_path, "gamelog_schedule_unified", "nba")
+
+        assert nb_rows == 2
+        assert self._query("SELECT DISTINCT id_season FROM nba") == [(2024,)]
+
+    def test_load_records_the_fingerprint_of_the_dataset(self):
+
+        assert not warehouse.is_loaded(self.warehouse_path, "nba", "abc")
+
+        warehouse.load_dataset(
+            self.unified_df, self.warehouse_path, "gamelog_schedule_unified", "nba", fingerprint="abc"
+        )
+
+        assert warehouse.is_loaded(self.warehouse_path, "nba", "abc")
+        assert not warehouse.is_loaded(self.warehouse_path, "nba", "def")
+        assert not warehouse.is_loaded(self.warehouse_path, "nba", None)
+
+    def test_duplicated_primary_key_fails_before_loading(self):
+
+        with self.assertRaisesRegex(ValueError, "share their primary key"):
+            warehouse.load_dataset(
+                pd.concat([self.unified_df, self.unified_df.iloc[[0]]]),
+                self.warehouse_path,
+                "gamelog_schedule_unified",
+                "nba",
+            )